@@ -7,14 +7,23 @@ Runs on port 5001 (separate from the breakable app on 5000).
 import os
 import sys
 import time
-import json
-import random
+import atexit
+import bisect
 import threading
-from collections import deque
 from datetime import datetime
-from flask import Flask, Response, jsonify, request
+from flask import Flask, Response, request
 from flask_cors import CORS
 import requests
+from prober import get_prober
+from broadcaster import EventLog
+from state_store import StateStore, append_bounded, freeze, to_json
+from heartbeat_store import HeartbeatStore
+import log_store
+from fluctuations import FluctuationEngine
+from metrics import Registry, EventMetrics, negotiate
+import event_channel
+import wire
+from scheduling import ProbeSchedule
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -33,14 +42,14 @@ CORS(app, origins=[
 # STATE MANAGEMENT
 # ============================================================================
 
-LOG_BUFFER = deque(maxlen=100)
-HEARTBEAT_BUFFER = deque(maxlen=120)
-CHAOS_EVENTS = deque(maxlen=50)
+LOG_LIMIT = 100
+HEARTBEAT_LIMIT = 120
+CHAOS_EVENTS_LIMIT = 50
 
-# Active fluctuations - stores events that should cause visual spikes
-ACTIVE_FLUCTUATIONS = []
+# Active fluctuations - events that should cause visual spikes (see fluctuations.py)
+FLUCTUATIONS = FluctuationEngine()
 
-SYSTEM_STATUS = {
+INITIAL_STATUS = {
     "status": "UNKNOWN",
     "last_check": None,
     "uptime_start": datetime.now().isoformat(),
@@ -51,14 +60,71 @@ SYSTEM_STATUS = {
     "last_event": None,
     "latency_ms": 0,
     "memory_mb": 0,
-    "cpu_percent": 0
+    "cpu_percent": 0,
+    "healer": freeze({})  # Per-target view reported by the healer over the event channel
 }
 
-status_lock = threading.Lock()
+# Push pipeline: every status/heartbeat/log change is serialized once here
+# and fanned out to all SSE subscribers (see broadcaster.py)
+EVENTS = EventLog(capacity=2048)
+SSE_KEEPALIVE = 15  # Seconds between comment frames on an idle stream
+
+# Telemetry state lives in immutable snapshots (see state_store.py).
+# Readers never lock; writers go through STATE.write().
+STATE = StateStore(
+    EVENTS,
+    status=freeze(INITIAL_STATUS),
+    published_status=freeze(INITIAL_STATUS),  # As of the last status event; deltas are against it
+    heartbeat=(),
+    logs=(),
+    chaos_events=(),
+)
+
+# Long-term heartbeat history on disk (see heartbeat_store.py); opened at startup
+HEARTBEAT_STORE_DIR = os.environ.get("HEARTBEAT_STORE_DIR", "heartbeat_data")
+HEARTBEAT_STORE = None
+
+# Every log line, searchable beyond the in-memory LOG_LIMIT (see log_store.py); opened at startup
+LOG_STORE_PATH = os.environ.get("LOG_STORE_PATH", "logs.db")
+LOG_STORE = None
 
 TARGET_URL = os.environ.get("TARGET_APP_URL", "http://localhost:5000") + "/health"
 TARGET_STATUS_URL = os.environ.get("TARGET_APP_URL", "http://localhost:5000") + "/status"
 HEALTH_CHECK_TIMEOUT = 1.0  # Increased for cloud latency
+STATUS_CHECK_TIMEOUT = 0.5
+# The healer target whose resource samples stand for the app above
+TARGET_NAME = os.environ.get("TARGET_APP_NAME", "app")
+SAMPLE_STALE_SECONDS = 5  # Older healer samples don't count as current
+
+# Prometheus/OpenMetrics exposition at /metrics (see metrics.py): our own
+# checks of the app, plus what the healer reports over the event channel
+METRICS = Registry()
+PROBE_LATENCY = METRICS.histogram(
+    "axolot_probe_latency_seconds", "Latency of Mission Control's health checks of the app",
+    0.0005, 2 ** 0.5, 24)  # 0.5ms to ~2s, four buckets per 4x
+PROBES = METRICS.counter("axolot_probes", "Health checks of the app, by result", ("result",))
+CRASHES = METRICS.counter("axolot_crashes", "Times the app went from healthy to unreachable")
+DOWNTIME = METRICS.histogram(
+    "axolot_downtime_seconds", "Outages as Mission Control saw them: first failed check to first good one",
+    0.1, 2, 12)
+HEALER_METRICS = EventMetrics(METRICS)
+
+def status_gauge(read):
+    return lambda: {(): read(STATE.current()["status"])}
+
+METRICS.gauge("axolot_app_up", "1 if the app's last health check passed",
+              function=status_gauge(lambda status: int(status["status"] == "HEALTHY")))
+METRICS.gauge("axolot_app_latency_seconds", "Latency of the last good health check",
+              function=status_gauge(lambda status: status["latency_ms"] / 1000))
+METRICS.gauge("axolot_app_memory_bytes", "Memory of the app's process tree (or what it says it leaked)",
+              function=status_gauge(lambda status: status["memory_mb"] * 1024 * 1024))
+METRICS.gauge("axolot_app_cpu_percent", "CPU of the app's process tree (100 = one core)",
+              function=status_gauge(lambda status: status["cpu_percent"]))
+
+# Both probes share one keep-alive pool instead of a new connection per request
+prober = get_prober()
+prober.set_timeout(TARGET_URL, HEALTH_CHECK_TIMEOUT)
+prober.set_timeout(TARGET_STATUS_URL, STATUS_CHECK_TIMEOUT)
 
 # ============================================================================
 # FLUCTUATION SYSTEM
@@ -67,237 +133,493 @@ HEALTH_CHECK_TIMEOUT = 1.0  # Increased for cloud latency
 def add_fluctuation(event_type: str, label: str):
     """Add a fluctuation effect that will show in the graph for several seconds."""
     print(f"[EVENT] Adding fluctuation for: {event_type} - {label}")
-    
-    # Define spike patterns - values are in ms added to base latency
-    # Made MUCH larger to be clearly visible
-    patterns = {
-        'crash': {'base': 750, 'duration': 10, 'decay': True},  # Heavier!
-        'hard-crash': {'base': 800, 'duration': 10, 'decay': True},
-        'nuclear': {'base': 1200, 'duration': 12, 'decay': True},
-        'chaos': {'base': 900, 'duration': 10, 'decay': True},  # Heavier!
-        'leak': {'base': 300, 'duration': 6, 'decay': False, 'wave': True},
-        'leak-massive': {'base': 500, 'duration': 8, 'decay': False, 'wave': True},
-        'cpu-burn': {'base': 400, 'duration': 6, 'decay': False, 'wave': True},
-        'error': {'base': 250, 'duration': 4, 'decay': True},
-        'timeout': {'base': 200, 'duration': 5, 'decay': False},
-        'slow': {'base': 150, 'duration': 4, 'decay': False},
-    }
-    
-    pattern = patterns.get(event_type, {'base': 50, 'duration': 3, 'decay': True})
-    
-    fluctuation = {
-        'start_time': time.time(),
-        'end_time': time.time() + pattern['duration'],
-        'base_spike': pattern['base'],
-        'decay': pattern.get('decay', True),
-        'wave': pattern.get('wave', False),
-        'event_type': event_type,
-        'label': label
-    }
-    
-    with status_lock:
-        ACTIVE_FLUCTUATIONS.append(fluctuation)
+    FLUCTUATIONS.add(event_type)
 
 def get_current_spike():
     """Calculate the current spike value based on active fluctuations."""
-    current_time = time.time()
-    total_spike = 0
-    
-    with status_lock:
-        # Remove expired fluctuations
-        expired = []
-        for i, f in enumerate(ACTIVE_FLUCTUATIONS):
-            if current_time > f['end_time']:
-                expired.append(i)
-        
-        for i in reversed(expired):
-            ACTIVE_FLUCTUATIONS.pop(i)
-        
-        # Calculate spike from active fluctuations
-        for f in ACTIVE_FLUCTUATIONS:
-            elapsed = current_time - f['start_time']
-            duration = f['end_time'] - f['start_time']
-            progress = elapsed / duration
-            
-            if f['decay']:
-                # Decaying spike - starts high, goes down
-                spike = f['base_spike'] * (1 - progress * 0.8)  # Keep at least 20%
-            elif f['wave']:
-                # Wave pattern - oscillates between 50% and 100% of base
-                import math
-                wave = math.sin(elapsed * 4) * 0.25 + 0.75  # 0.5 to 1.0
-                spike = f['base_spike'] * wave * (1 - progress * 0.3)
-            else:
-                # Constant spike that slowly fades
-                spike = f['base_spike'] * (1 - progress * 0.5)
-            
-            # Add some randomness for visual interest
-            spike *= (0.8 + random.random() * 0.4)
-            total_spike += spike
-    
-    return max(0, int(total_spike))
+    return FLUCTUATIONS.spike()
 
 # ============================================================================
 # BACKGROUND HEALTH CHECKER
 # ============================================================================
 
+# Probe every 500ms at first, stretching to 5s while the target is stable;
+# burst while it looks unwell, or when the healer or a chaos event says so
+HEALTH_SCHEDULE = ProbeSchedule(base_interval=0.5, max_interval=5)
+PROBE_NOW = threading.Event()
+
+# Called by probe_soon, e.g. to wake the health check task of asgi_server.py
+PROBE_LISTENERS = []
+
+def probe_soon(reason):
+    """Switch to burst probing and run the next check right away."""
+    HEALTH_SCHEDULE.burst(reason)
+    PROBE_NOW.set()
+    for listener in PROBE_LISTENERS:
+        listener()
+
 def health_check_loop():
-    """Background thread that checks health every 500ms."""
-    global SYSTEM_STATUS
-    
+    """Background thread that checks health on HEALTH_SCHEDULE."""
     while True:
-        start_time = time.time()
+        PROBE_NOW.clear()
+        check_health()
+        PROBE_NOW.wait(HEALTH_SCHEDULE.interval)
+
+def check_health():
+    """One health check of the app (blocking)."""
+    start_time = time.time()
+    
+    try:
+        response = prober.get(TARGET_URL)
+        latency = (time.time() - start_time) * 1000
         
-        try:
-            response = requests.get(TARGET_URL, timeout=HEALTH_CHECK_TIMEOUT)
-            latency = (time.time() - start_time) * 1000
-            
-            memory_mb = 0
-            cpu_percent = 0
+        # What the OS says the app's process tree uses, as sampled by the
+        # healer; without a healer, only what the app says it leaked
+        memory_mb, cpu_percent = current_resources()
+        if memory_mb is None:
+            memory_mb, cpu_percent = 0, 0
             try:
-                status_res = requests.get(TARGET_STATUS_URL, timeout=0.5)
+                status_res = prober.get(TARGET_STATUS_URL)
                 if status_res.ok:
-                    status_data = status_res.json()
-                    memory_mb = status_data.get("memory_leaked_mb", 0)
-                    if status_data.get("cpu_stress_active"):
-                        cpu_percent = 100
+                    memory_mb = status_res.json().get("memory_leaked_mb", 0)
             except:
                 pass
+        
+        record_check(response.status_code, latency, memory_mb, cpu_percent)
+    except requests.RequestException:
+        record_unreachable()
+
+OUTAGE_STARTED = None  # When the current outage began (time.monotonic())
+
+def record_check(status_code, latency, memory_mb, cpu_percent):
+    """Fold one answered health check into state, metrics and history."""
+    global OUTAGE_STARTED
+    
+    # Get current spike from active fluctuations
+    event_spike = get_current_spike()
+    actual_latency = round(latency, 2) if status_code == 200 else 0
+    display_latency = actual_latency + event_spike
+    
+    up = status_code == 200
+    PROBE_LATENCY.observe(latency / 1000)
+    PROBES.inc("up" if up else "down")
+    if up and OUTAGE_STARTED is not None:
+        DOWNTIME.observe(time.monotonic() - OUTAGE_STARTED)
+        OUTAGE_STARTED = None
+    elif not up and OUTAGE_STARTED is None:
+        OUTAGE_STARTED = time.monotonic()
+    
+    with STATE.write() as w:
+        if up:
+            if w.get("status")["status"] in ["CRITICAL", "HEALING", "QUARANTINED"]:
+                w.update("status", status="HEALTHY", last_heal=datetime.now().isoformat())
+                add_log("HEAL", "[HEALED] System recovered successfully!", writer=w)
+            else:
+                w.update("status", status="HEALTHY")
             
-            with status_lock:
-                if response.status_code == 200:
-                    if SYSTEM_STATUS["status"] in ["CRITICAL", "HEALING"]:
-                        SYSTEM_STATUS["status"] = "HEALTHY"
-                        SYSTEM_STATUS["last_heal"] = datetime.now().isoformat()
-                        add_log("HEAL", "[HEALED] System recovered successfully!")
-                    else:
-                        SYSTEM_STATUS["status"] = "HEALTHY"
-                    
-                    SYSTEM_STATUS["latency_ms"] = round(latency, 2)
-                    SYSTEM_STATUS["memory_mb"] = memory_mb
-                    SYSTEM_STATUS["cpu_percent"] = cpu_percent
-                else:
-                    SYSTEM_STATUS["status"] = "CRITICAL"
-                    SYSTEM_STATUS["latency_ms"] = 0
-                    
-                SYSTEM_STATUS["last_check"] = datetime.now().isoformat()
-            
-            # Get current spike from active fluctuations
-            event_spike = get_current_spike()
-            actual_latency = round(latency, 2) if response.status_code == 200 else 0
-            display_latency = actual_latency + event_spike
-            
-            with status_lock:
-                HEARTBEAT_BUFFER.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "latency": display_latency,
-                    "actual_latency": actual_latency,
-                    "memory_mb": memory_mb,
-                    "cpu_percent": cpu_percent,
-                    "status": "up" if response.status_code == 200 else "down",
-                    "event_spike": event_spike > 0
-                })
-                
-        except requests.RequestException:
-            event_spike = get_current_spike()
+            w.update("status", latency_ms=round(latency, 2), memory_mb=memory_mb, cpu_percent=cpu_percent)
+        else:
+            w.update("status", status="CRITICAL", latency_ms=0)
             
-            with status_lock:
-                if SYSTEM_STATUS["status"] == "HEALTHY":
-                    SYSTEM_STATUS["total_crashes"] += 1
-                    SYSTEM_STATUS["last_crash"] = datetime.now().isoformat()
-                    add_log("CRASH", "[CRASH] Target application crashed!")
-                    SYSTEM_STATUS["status"] = "HEALING"
-                elif SYSTEM_STATUS["status"] != "HEALING":
-                    SYSTEM_STATUS["status"] = "CRITICAL"
-                
-                SYSTEM_STATUS["latency_ms"] = 0
-                SYSTEM_STATUS["last_check"] = datetime.now().isoformat()
-                
-                HEARTBEAT_BUFFER.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "latency": event_spike,  # Show spike even when down
-                    "actual_latency": 0,
-                    "memory_mb": 0,
-                    "cpu_percent": 0,
-                    "status": "down",
-                    "event_spike": event_spike > 0
-                })
+        w.update("status", last_check=datetime.now().isoformat())
         
-        time.sleep(0.5)
+        record_heartbeat(w, {
+            "timestamp": datetime.now().isoformat(),
+            "latency": display_latency,
+            "actual_latency": actual_latency,
+            "memory_mb": memory_mb,
+            "cpu_percent": cpu_percent,
+            "status": "up" if up else "down",
+            "event_spike": event_spike > 0
+        })
+    persist_heartbeat(actual_latency, memory_mb, cpu_percent, up)
+    HEALTH_SCHEDULE.observe(up, actual_latency or None, memory_mb)
+    if event_spike > 0:
+        HEALTH_SCHEDULE.burst("chaos event")  # Keep the chart fine-grained while it plays out
 
-def add_log(log_type, message):
-    """Add a log entry to the buffer."""
-    LOG_BUFFER.append({
-        "timestamp": datetime.now().isoformat(),
+def record_unreachable():
+    """Fold one health check that got no answer into state, metrics and history."""
+    global OUTAGE_STARTED
+    event_spike = get_current_spike()
+    PROBES.inc("error")
+    if OUTAGE_STARTED is None:
+        OUTAGE_STARTED = time.monotonic()
+    
+    with STATE.write() as w:
+        status = w.get("status")
+        if status["status"] == "HEALTHY":
+            w.update("status",
+                     total_crashes=status["total_crashes"] + 1,
+                     last_crash=datetime.now().isoformat())
+            add_log("CRASH", "[CRASH] Target application crashed!", writer=w)
+            CRASHES.inc()
+            w.update("status", status="HEALING")
+        elif status["status"] not in ("HEALING", "QUARANTINED"):
+            w.update("status", status="CRITICAL")
+        
+        w.update("status", latency_ms=0, last_check=datetime.now().isoformat())
+        
+        record_heartbeat(w, {
+            "timestamp": datetime.now().isoformat(),
+            "latency": event_spike,  # Show spike even when down
+            "actual_latency": 0,
+            "memory_mb": 0,
+            "cpu_percent": 0,
+            "status": "down",
+            "event_spike": event_spike > 0
+        })
+    persist_heartbeat(0, 0, 0, False)
+    HEALTH_SCHEDULE.observe(False)
+
+def current_resources():
+    """(memory_mb, cpu_percent) from the healer's latest sample of the app, or (None, None)."""
+    target = STATE.current()["status"]["healer"].get(TARGET_NAME)
+    if not target or "resources" not in target or time.time() - target["sampled_at"] > SAMPLE_STALE_SECONDS:
+        return None, None
+    resources = target["resources"]
+    return resources["rss_mb"], resources["cpu_percent"]
+
+def persist_heartbeat(latency, memory_mb, cpu_percent, up):
+    """Append the real (spike-free) measurement to the on-disk history."""
+    if HEARTBEAT_STORE is None:
+        return
+    try:
+        HEARTBEAT_STORE.append(time.time() * 1000, latency, memory_mb, cpu_percent, up)
+    except OSError as e:
+        print(f"[HEARTBEAT] Failed to persist sample: {e}")
+
+def record_heartbeat(writer, point):
+    """Append a heartbeat and push it, with the status it produced."""
+    writer.set("heartbeat", append_bounded(writer.get("heartbeat"), point, HEARTBEAT_LIMIT))
+    writer.publish("heartbeat", wire.heartbeat_row(point))
+    publish_status(writer)
+
+def publish_status(writer):
+    """Push the status fields that changed since the last status event (see wire.diff)."""
+    status = writer.get("status")
+    delta = wire.diff(writer.get("published_status"), status)
+    if delta:
+        writer.publish("status", delta)
+        writer.set("published_status", status)
+
+def add_log(log_type, message, writer=None):
+    """Add a log entry to the buffer. Pass writer when already inside STATE.write()."""
+    if writer is None:
+        with STATE.write() as w:
+            return add_log(log_type, message, writer=w)
+
+    now = datetime.now()
+    entry = {
+        "timestamp": now.isoformat(),
         "type": log_type,
         "message": message
-    })
+    }
+    writer.set("logs", append_bounded(writer.get("logs"), entry, LOG_LIMIT))
+    writer.publish("log", entry)
+    if LOG_STORE is not None:
+        LOG_STORE.append(now.timestamp() * 1000, log_type, message)  # Queued, never blocks
 
 # ============================================================================
 # LOG FILE WATCHER
 # ============================================================================
 
+HEALER_LOG = os.environ.get("HEALER_LOG", "healer.log")
+# Byte offset + inode of the last ingested line, so restarts resume exactly
+HEALER_LOG_CHECKPOINT = HEALER_LOG + ".offset"
+
+def ingest_healer_lines(lines):
+    """Classify a batch of healer.log lines and add them in one state write."""
+    # Anything older than the newest LOG_LIMIT lines would fall straight out
+    # of the buffer, so it only goes to the log store (if there is one)
+    from log_tailer import classify  # Only needed by the healer.log fallback
+    entries, older = [], []
+    for line in reversed(lines):
+        line = line.strip()
+        if not line:
+            continue
+        if len(entries) < LOG_LIMIT:
+            entries.append((classify(line), line))
+        elif LOG_STORE is not None:
+            older.append((classify(line), line))
+        else:
+            break
+    if not entries:
+        return
+    ts_ms = time.time() * 1000
+    for log_type, message in reversed(older):
+        LOG_STORE.append(ts_ms, log_type, message)
+    with STATE.write() as w:
+        for log_type, message in reversed(entries):
+            add_log(log_type, message, writer=w)
+
 def watch_healer_log():
-    """Watch healer.log for new entries."""
-    log_file = "healer.log"
-    
-    while not os.path.exists(log_file):
-        time.sleep(1)
-    
-    with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-        f.seek(0, 2)
-        
-        while True:
-            line = f.readline()
-            if line:
-                line = line.strip()
-                if line:
-                    log_type = "INFO"
-                    if "HEALER ACTIVATED" in line or "Issue Detected" in line:
-                        log_type = "WARN"
-                    elif "Error" in line or "error" in line:
-                        log_type = "ERROR"
-                    elif "Starting" in line or "started" in line:
-                        log_type = "INFO"
-                    
-                    add_log(log_type, line)
+    """Tail healer.log (inotify, with polling fallback), surviving rotation and restarts."""
+    from log_tailer import LogTailer
+    LogTailer(HEALER_LOG, ingest_healer_lines, state_path=HEALER_LOG_CHECKPOINT).run()
+
+# ============================================================================
+# HEALER EVENT CHANNEL
+# ============================================================================
+
+def quarantine_status(status, healer):
+    """
+    The global status given each healer target's quarantine state: QUARANTINED
+    only while every target is; one coming out of it means HEALING.
+    """
+    if healer and all(target.get("quarantined") for target in healer.values()):
+        return "QUARANTINED"
+    if status == "QUARANTINED":
+        return "HEALING"
+    return status
+
+def handle_healer_event(event):
+    """Fold one structured healer event into state and push it to dashboards."""
+    HEALER_METRICS.record(event)
+    with STATE.write() as w:
+        healer = dict(w.get("status")["healer"])
+        target = dict(healer.get(event.target, {}))
+        target["pid"] = event.pid
+        target["updated"] = event.timestamp
+
+        if event.type == event_channel.PROBE:
+            target["ok"] = event.ok
+            target["probe_ms"] = round(event.duration_ms, 2)
+            target["reason"] = event.reason
+            if not event.ok:
+                add_log("WARN", f"[HEALER] {event.target}: check failed ({event.reason})", writer=w)
+            if len(event.values) == len(event_channel.PROBE_VALUES):
+                memory_mb, leak_mb_per_s, leak_eta_s = event.values
+                if leak_eta_s >= 0 and target.get("leak_eta_s") is None:
+                    add_log("WARN", f"[HEALER] {event.target}: memory leak +{leak_mb_per_s:.2f}MB/s, "
+                                    f"limit in {leak_eta_s:.0f}s", writer=w)
+                target["memory_mb"] = round(memory_mb, 2)
+                target["leak_mb_per_s"] = round(leak_mb_per_s, 3)
+                target["leak_eta_s"] = round(leak_eta_s, 1) if leak_eta_s >= 0 else None
+        elif event.type == event_channel.EXIT:
+            target["ok"] = False
+            add_log("CRASH", f"[HEALER] {event.target}: PID {event.pid} exited with code {event.code}"
+                             + (f" ({event.reason})" if event.reason else ""), writer=w)
+        elif event.type == event_channel.RESTART_START:
+            target["healing"] = True
+            add_log("WARN", f"[HEALER] {event.target}: HEALER ACTIVATED ({event.reason})", writer=w)
+        elif event.type == event_channel.RESTART_FINISH:
+            target["healing"] = False
+            target["restarts"] = event.code
+            add_log("HEAL", f"[HEALER] {event.target}: restarted as PID {event.pid} "
+                            f"in {event.duration_ms:.0f}ms", writer=w)
+        elif event.type == event_channel.STARTUP:
+            target["ready"] = event.ok
+            if not event.ok:
+                add_log("WARN", f"[HEALER] {event.target}: {event.reason}", writer=w)
+            elif len(event.values) == len(event_channel.STARTUP_VALUES):
+                # Boot phases of the process now serving, for tracking cold-start time
+                phases = {name[:-3]: round(ms, 1)
+                          for name, ms in zip(event_channel.STARTUP_VALUES, event.values) if ms >= 0}
+                target["startup"] = freeze(phases)
+                target["startup_ms"] = round(sum(phases.values()), 1)
+                target["ready_ms"] = round(event.duration_ms, 1)
+                if not event.code:
+                    add_log("INFO", f"[HEALER] {event.target}: PID {event.pid} ready, "
+                                    f"cold start {target['startup_ms']:.0f}ms", writer=w)
+        elif event.type == event_channel.QUARANTINE:
+            target["quarantined"] = not event.ok
+            target["healing"] = event.ok
+            if event.ok:
+                add_log("WARN", f"[HEALER] {event.target}: quarantine over, probation restart", writer=w)
+            else:
+                target["probation_in_s"] = round(event.duration_ms / 1000)
+                add_log("ERROR", f"[HEALER] {event.target}: QUARANTINED for "
+                                 f"{event.duration_ms / 1000:.0f}s ({event.reason})", writer=w)
+        elif event.type == event_channel.SAMPLE:
+            if len(event.values) == len(event_channel.SAMPLE_VALUES):
+                target["resources"] = freeze({name: round(value, 2) for name, value
+                                              in zip(event_channel.SAMPLE_VALUES, event.values)})
+                target["sampled_at"] = event.timestamp
+        elif event.type == event_channel.HANG:
+            target["hung"] = bool(event.code)
+            if event.code:
+                add_log("ERROR", f"[HEALER] {event.target}: PID {event.pid} hung ({event.reason})", writer=w)
             else:
-                time.sleep(0.5)
+                add_log("WARN", f"[HEALER] {event.target}: PID {event.pid} stalled ({event.reason})", writer=w)
+        elif event.type == event_channel.WORKER_RECYCLE:
+            target["workers_recycled"] = event.code
+            add_log("HEAL", f"[HEALER] {event.target}: recycled worker PID {event.pid} "
+                            f"({event.reason}), the other workers kept serving", writer=w)
+        elif event.type == event_channel.BACKOFF:
+            target["backoff_s"] = round(event.duration_ms / 1000, 1)
+            add_log("WARN", f"[HEALER] {event.target}: failure {event.code} in a row, "
+                            f"restarting in {event.duration_ms / 1000:.1f}s ({event.reason})", writer=w)
+        elif event.type == event_channel.CONTROL:
+            if event.reason in ("paused", "resumed"):
+                target["paused"] = event.reason == "paused"
+            if event.target:
+                add_log("WARN" if event.reason in ("paused", "removed") else "INFO",
+                        f"[HEALER] {event.target}: {event.reason} through the control plane", writer=w)
+            else:
+                add_log("INFO", f"[HEALER] Settings {event.reason}", writer=w)
+
+        if not (event.type in (event_channel.PROBE, event_channel.SAMPLE) and event.ok):
+            probe_soon(f"healer: {event.type_name}")
+
+        if event.type == event_channel.CONTROL and event.reason == "removed":
+            healer.pop(event.target, None)
+        elif event.target:
+            healer[event.target] = freeze(target)
+        w.update("status", healer=freeze(healer))
+        if event.type in (event_channel.QUARANTINE, event_channel.CONTROL):
+            w.update("status", status=quarantine_status(w.get("status")["status"], healer))
+        w.publish("healer", event.to_dict())
+        publish_status(w)
+
+def start_event_receiver():
+    """Listen for healer events. Returns False if the channel can't be opened."""
+    try:
+        event_channel.EventReceiver(handle_healer_event).start()
+        return True
+    except OSError as e:
+        print(f"[EVENTS] Event channel unavailable ({e}); falling back to healer.log")
+        return False
 
 # ============================================================================
 # API ENDPOINTS
 # ============================================================================
 
+def encode(value, accept, accept_encoding, snapshot=None, key=None):
+    """
+    (body, content type, content encoding) of value in the format the client
+    asked for: JSON or MessagePack, compressed if it accepts that. With a
+    snapshot, each variant is built once per state version under key.
+    """
+    content_type = wire.content_type(accept)
+    encoding = wire.content_encoding(accept_encoding)
+
+    def build():
+        if content_type == wire.MSGPACK:
+            body = wire.pack(value)
+        elif snapshot is not None and key in ("status", "heartbeat", "logs"):
+            body = snapshot.json(key)
+        else:
+            body = to_json(value)
+        return wire.compress(body, encoding)
+
+    body, used = build() if snapshot is None else snapshot.cached(("wire", key, content_type, encoding), build)
+    return body, content_type, used
+
+def encoded_response(value, status_code=200, snapshot=None, key=None):
+    body, content_type, encoding = encode(value, request.headers.get("Accept"),
+                                          request.headers.get("Accept-Encoding"), snapshot, key)
+    response = Response(body, status=status_code, content_type=content_type)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    return response
+
 @app.route('/api/status')
 def get_status():
-    with status_lock:
-        return jsonify(SYSTEM_STATUS)
+    snapshot = STATE.current()
+    return encoded_response(snapshot["status"], snapshot=snapshot, key="status")
+
+def parse_time_ms(value, default):
+    """Accepts epoch milliseconds or an ISO-8601 timestamp."""
+    if value is None:
+        return default
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
 
 @app.route('/api/heartbeat')
 def get_heartbeat():
-    with status_lock:
-        return jsonify(list(HEARTBEAT_BUFFER))
+    """
+    Without parameters: the live in-memory window (last 120 samples).
+    format=columns sends it as one list per column (see wire.py), and
+    after=<epoch ms> only the samples newer than that.
+    With from/to/resolution: a columnar range query over the on-disk history.
+    resolution is raw, 1s, 1m, 1h or auto (default).
+    """
+    args = request.args
+    if not any(k in args for k in ('from', 'to', 'resolution')):
+        snapshot = STATE.current()
+        body, key = live_heartbeat(snapshot, args)
+        return encoded_response(body, snapshot=snapshot if key else None, key=key)
+    body, status_code = query_heartbeat(args)
+    return encoded_response(body, status_code)
+
+def live_heartbeat(snapshot, args):
+    """(body, snapshot cache key or None) for the in-memory window."""
+    if args.get('format') != 'columns':
+        return snapshot["heartbeat"], "heartbeat"
+    columns = snapshot.cached("heartbeat_columns", lambda: wire.heartbeat_columns(snapshot["heartbeat"]))
+    if not args.get('after', '').isdigit():
+        return columns, "heartbeat_columns"
+    start = bisect.bisect_right(columns["ts"], int(args['after']))
+    return {name: values[start:] for name, values in columns.items()}, None
+
+def query_heartbeat(args):
+    """(body, status code) for a range query over the on-disk history."""
+    if HEARTBEAT_STORE is None:
+        return {"error": "Heartbeat history is not enabled"}, 503
+
+    try:
+        end_ms = parse_time_ms(args.get('to'), int(time.time() * 1000))
+        start_ms = parse_time_ms(args.get('from'), end_ms - 60 * 60 * 1000)
+        return HEARTBEAT_STORE.query(start_ms, end_ms, args.get('resolution', 'auto')), 200
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+LOG_QUERY_ARGS = ('type', 'from', 'to', 'q', 'before', 'limit')
 
 @app.route('/api/logs')
 def get_logs():
-    log_type = request.args.get('type')
-    with status_lock:
-        logs = list(LOG_BUFFER)
-        if log_type:
-            logs = [l for l in logs if l['type'] == log_type]
-        return jsonify(logs)
+    """
+    Without parameters: the live in-memory buffer (last 100 entries).
+    With type, from/to (epoch ms or ISO-8601), q (words, all must match),
+    limit and before: one page of the persistent log store, newest first,
+    as {"logs": [...], "next": ...}; pass next as before for the page after.
+    """
+    snapshot = STATE.current()
+    if not any(k in request.args for k in LOG_QUERY_ARGS):
+        return encoded_response(snapshot["logs"], snapshot=snapshot, key="logs")
+    body, status_code = query_logs(request.args)
+    return encoded_response(body, status_code)
+
+def query_logs(args):
+    """(body, status code) for a paged search of the log store."""
+    try:
+        before = args.get('before')
+        limit = int(args.get('limit', log_store.PAGE_LIMIT))
+        start_ms = parse_time_ms(args.get('from'), None)
+        end_ms = parse_time_ms(args.get('to'), None)
+        if before is not None:
+            before = int(before)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    if LOG_STORE is None:
+        # No store (e.g. imported by a benchmark): search what's in memory
+        logs = [l for l in reversed(STATE.current()["logs"])
+                if args.get('type') in (None, l['type'])
+                and all(word.lower() in l['message'].lower() for word in args.get('q', '').split())]
+        return {"logs": logs[:max(1, min(limit, log_store.MAX_PAGE_LIMIT))], "next": None}, 200
+
+    return LOG_STORE.query(args.get('type'), start_ms, end_ms, args.get('q'), before, limit), 200
 
 @app.route('/api/event', methods=['POST'])
 def record_event():
     """Record a chaos event and trigger fluctuations."""
-    global SYSTEM_STATUS
-    
     data = request.get_json() or {}
+    if not isinstance(data, dict):
+        return encoded_response({"error": "An event must be a JSON object"}, 400)
+    event = record_chaos_event(data)
+    return encoded_response({"status": "recorded", "event": event})
+
+def record_chaos_event(data):
+    """Adds a chaos event (and its fluctuation) to state. Returns the event."""
     event_type = data.get('type', 'unknown')
     event_label = data.get('label', 'Unknown Event')
     
     # Add fluctuation effect
     add_fluctuation(event_type, event_label)
+    probe_soon("chaos event")
     
     event = {
         "timestamp": datetime.now().isoformat(),
@@ -305,44 +627,111 @@ def record_event():
         "label": event_label
     }
     
-    with status_lock:
-        CHAOS_EVENTS.append(event)
-        SYSTEM_STATUS["total_events"] += 1
-        SYSTEM_STATUS["last_event"] = event_label
-        add_log("EVENT", f"[CHAOS] {event_label} triggered!")
+    with STATE.write() as w:
+        w.set("chaos_events", append_bounded(w.get("chaos_events"), event, CHAOS_EVENTS_LIMIT))
+        w.update("status",
+                 total_events=w.get("status")["total_events"] + 1,
+                 last_event=event_label)
+        add_log("EVENT", f"[CHAOS] {event_label} triggered!", writer=w)
+        publish_status(w)
     
-    return jsonify({"status": "recorded", "event": event})
+    return event
 
-@app.route('/api/logs/stream')
-def stream_logs():
+# ============================================================================
+# PUSH STREAMS
+# ============================================================================
+
+def last_event_id():
+    """Cursor a reconnecting client wants to resume from, or None."""
+    return parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+
+def parse_event_id(raw):
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return None
+
+def snapshot_frame(snapshot):
+    """`snapshot` SSE frame for one state version, built once and shared."""
+    def build():
+        data = to_json({
+            "status": snapshot["status"],
+            "heartbeat": snapshot.cached("heartbeat_columns", lambda: wire.heartbeat_columns(snapshot["heartbeat"])),
+            "logs": snapshot["logs"],
+        })
+        return b"id: %d\nevent: snapshot\ndata: %s\n\n" % (snapshot.seq, data)
+    return snapshot.cached("sse_snapshot", build)
+
+def sse_response(cursor, events=None, named=True, preamble=b""):
+    """Streams every frame after cursor to one subscriber."""
     def generate():
-        last_count = 0
+        nonlocal cursor
+        yield b"retry: 1000\n\n" + preamble
         while True:
-            with status_lock:
-                current_count = len(LOG_BUFFER)
-                if current_count > last_count:
-                    new_logs = list(LOG_BUFFER)[last_count:]
-                    for log in new_logs:
-                        yield f"data: {json.dumps(log)}\n\n"
-                    last_count = current_count
-            time.sleep(0.5)
-    
-    return Response(generate(), mimetype='text/event-stream')
+            frames, cursor = EVENTS.wait(cursor, timeout=SSE_KEEPALIVE, events=events, named=named)
+            if frames:
+                yield b"".join(frames)
+            else:
+                yield b": keep-alive\n\n"
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/stream')
+def stream_all():
+    """
+    Unified push stream for Mission Control.
+    New clients get a `snapshot` event, then `status`, `heartbeat` and `log`
+    events as they happen. Reconnects resume from Last-Event-ID.
+    Heartbeats are in wire.py's compact form (columns in the snapshot, one
+    row per event), and `status` events only carry the fields that changed.
+    """
+    cursor = last_event_id()
+    if cursor is not None and EVENTS.covers(cursor):
+        return sse_response(cursor)
+
+    snapshot = STATE.current()
+    return sse_response(snapshot.seq, preamble=snapshot_frame(snapshot))
+
+@app.route('/api/logs/stream')
+def stream_logs():
+    cursor = last_event_id()
+    if cursor is None or not EVENTS.covers(cursor):
+        cursor = 0 if EVENTS.covers(0) else EVENTS.last_seq
+    return sse_response(cursor, events={"log"}, named=False)
+
+def status_frame(snapshot):
+    """Legacy combined frame: status plus the last 10 heartbeats."""
+    def build():
+        data = {**snapshot["status"], "heartbeat": snapshot["heartbeat"][-10:]}
+        return b"data: %s\n\n" % to_json(data)
+    return snapshot.cached("sse_status", build)
 
 @app.route('/api/status/stream')
 def stream_status():
     def generate():
+        snapshot = STATE.current()
+        cursor = snapshot.seq
+        yield status_frame(snapshot)
         while True:
-            with status_lock:
-                data = {
-                    **SYSTEM_STATUS,
-                    "heartbeat": list(HEARTBEAT_BUFFER)[-10:] if HEARTBEAT_BUFFER else []
-                }
-                yield f"data: {json.dumps(data)}\n\n"
-            time.sleep(1)
-    
+            frames, cursor = EVENTS.wait(cursor, timeout=SSE_KEEPALIVE, events={"status"})
+            yield status_frame(STATE.current()) if frames else b": keep-alive\n\n"
+
     return Response(generate(), mimetype='text/event-stream')
 
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus/OpenMetrics scrape endpoint."""
+    openmetrics, content_type = negotiate(request.headers.get("Accept"))
+    body, encoding = wire.compress(METRICS.render(openmetrics).encode(),
+                                   wire.content_encoding(request.headers.get("Accept-Encoding")))
+    response = Response(body, content_type=content_type)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
+
 @app.route('/health')
 def health():
     return "OK", 200
@@ -352,13 +741,21 @@ def health():
 # ============================================================================
 
 if __name__ == "__main__":
+    LOG_STORE = log_store.LogStore(LOG_STORE_PATH)
+    atexit.register(LOG_STORE.close)  # Commit what's still queued
     add_log("INFO", "[STARTUP] Mission Control API Server starting...")
     
+    HEARTBEAT_STORE = HeartbeatStore(HEARTBEAT_STORE_DIR)
+    atexit.register(HEARTBEAT_STORE.close)  # Write out the rollup buckets still open
+    
     health_thread = threading.Thread(target=health_check_loop, daemon=True)
     health_thread.start()
     
-    log_thread = threading.Thread(target=watch_healer_log, daemon=True)
-    log_thread.start()
+    # Structured events replace scraping healer.log; tail the file only as a
+    # fallback, or when asked to (e.g. for a healer that predates the channel)
+    if not start_event_receiver() or os.environ.get("HEALER_LOG_TAIL") == "1":
+        log_thread = threading.Thread(target=watch_healer_log, daemon=True)
+        log_thread.start()
     
     print("=" * 50)
     print("  MISSION CONTROL API SERVER")
@@ -367,11 +764,6 @@ if __name__ == "__main__":
     print("  Active Fluctuation System: ENABLED")
     print("=" * 50)
     
-<<<<<<< HEAD
-    port = int(os.environ.get("PORT", 5001)) # Different default for local
-    app.run(host="0.0.0.0", port=port)
-=======
     port = int(os.environ.get("PORT", 5001))
     print(f"  Running on port: {port}")
     app.run(host="0.0.0.0", port=port, threaded=True)
->>>>>>> 9d78598 (fix: replace hardcoded localhost URLs with env vars)
@@ -0,0 +1,401 @@
+"""
+Mission Control API Server (asyncio)
+The same API as api_server.py, for when hundreds or thousands of dashboards
+hold push streams open at once. Flask gives every connection an OS thread
+for as long as it lasts; here one event loop serves them all:
+
+- a stream subscriber is a coroutine parked on a future that every publish
+  resolves (broadcaster.EventLog.add_listener), not a thread in a Condition
+- the health checker, the healer event receiver and the healer.log
+  fallback are tasks on the same loop
+
+State, serialization and what each endpoint returns are shared with
+api_server.py. This is a plain ASGI app with no framework; uvicorn is an
+optional dependency that serves it:
+
+    pip install uvicorn
+    python asgi_server.py
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import asyncio
+from urllib.parse import parse_qs
+
+import api_server as api
+from api_server import STATE, EVENTS, SSE_KEEPALIVE, HEALTH_SCHEDULE
+from metrics import negotiate
+from prober import AsyncProber, httpx_installed
+from state_store import to_json
+from heartbeat_store import HeartbeatStore
+import log_store
+import event_channel
+import wire
+
+# Same origins flask-cors allows in api_server.py
+ALLOWED_ORIGINS = {os.environ.get("FRONTEND_URL", "http://localhost:3000"), "http://localhost:3000"}
+SHUTDOWN_GRACE = 2  # Seconds open streams get before the server closes them
+
+# ============================================================================
+# PUSH FEED
+# ============================================================================
+
+class Feed:
+    """Wakes every stream waiting on this loop whenever the EventLog publishes."""
+
+    def __init__(self, log, loop):
+        self.log = log
+        self._loop = loop
+        self._published = loop.create_future()
+        self._listener = lambda: loop.call_soon_threadsafe(self._wake)
+        log.add_listener(self._listener)
+
+    def _wake(self):
+        published, self._published = self._published, self._loop.create_future()
+        published.set_result(None)
+
+    async def wait(self, cursor, timeout, events=None, named=True, cancel=None):
+        """EventLog.wait() for coroutines. Also returns early once cancel is done."""
+        deadline = self._loop.time() + timeout
+        while True:
+            published = self._published  # Before reading, so no publish slips between
+            frames, cursor = self.log.read_since(cursor, events, named)
+            remaining = deadline - self._loop.time()
+            if frames or remaining <= 0 or (cancel is not None and cancel.done()):
+                return frames, cursor
+            waiting = {published} if cancel is None else {published, cancel}
+            await asyncio.wait(waiting, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+
+    def close(self):
+        self.log.remove_listener(self._listener)
+
+FEED = None  # Created at startup, on the serving loop
+
+# ============================================================================
+# BACKGROUND TASKS
+# ============================================================================
+
+async def health_check_task():
+    """health_check_loop() as a task: probes over httpx, or in a worker thread without it."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    listener = lambda: loop.call_soon_threadsafe(wake.set)
+    api.PROBE_LISTENERS.append(listener)
+    prober = None
+    if httpx_installed():
+        prober = AsyncProber()
+        prober.set_timeout(api.TARGET_URL, api.HEALTH_CHECK_TIMEOUT)
+        prober.set_timeout(api.TARGET_STATUS_URL, api.STATUS_CHECK_TIMEOUT)
+    try:
+        while True:
+            wake.clear()
+            if prober is not None:
+                await check_health(prober)
+            else:
+                await asyncio.to_thread(api.check_health)
+            try:
+                await asyncio.wait_for(wake.wait(), HEALTH_SCHEDULE.interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        api.PROBE_LISTENERS.remove(listener)
+        if prober is not None:
+            await prober.close()
+
+async def check_health(prober):
+    """api_server.check_health(), without blocking the loop."""
+    import httpx
+    start_time = time.time()
+    try:
+        response = await prober.get(api.TARGET_URL)
+        latency = (time.time() - start_time) * 1000
+        memory_mb, cpu_percent = api.current_resources()
+        if memory_mb is None:
+            memory_mb, cpu_percent = 0, 0
+            try:
+                status_res = await prober.get(api.TARGET_STATUS_URL)
+                if status_res.is_success:
+                    memory_mb = status_res.json().get("memory_leaked_mb", 0)
+            except (httpx.HTTPError, ValueError):
+                pass
+    except httpx.HTTPError:
+        await asyncio.to_thread(api.record_unreachable)
+        return
+    # Takes the state lock and writes the heartbeat store: off the loop, like api.check_health
+    await asyncio.to_thread(api.record_check, response.status_code, latency, memory_mb, cpu_percent)
+
+async def watch_healer_log_task():
+    from log_tailer import LogTailer
+    await LogTailer(api.HEALER_LOG, api.ingest_healer_lines, state_path=api.HEALER_LOG_CHECKPOINT).run_async()
+
+TASKS = []
+RECEIVER = None
+
+async def startup():
+    global FEED, RECEIVER
+    loop = asyncio.get_running_loop()
+    api.LOG_STORE = log_store.LogStore(api.LOG_STORE_PATH)
+    api.add_log("INFO", "[STARTUP] Mission Control API Server starting (asyncio)...")
+    api.HEARTBEAT_STORE = HeartbeatStore(api.HEARTBEAT_STORE_DIR)
+    atexit.register(api.HEARTBEAT_STORE.close)  # Also when shutdown() never runs
+    FEED = Feed(EVENTS, loop)
+    TASKS.append(asyncio.create_task(health_check_task()))
+
+    # Structured events replace scraping healer.log, as in api_server.py
+    try:
+        RECEIVER = event_channel.EventReceiver(api.handle_healer_event)
+        RECEIVER.attach(loop)
+    except OSError as e:
+        RECEIVER = None
+        print(f"[EVENTS] Event channel unavailable ({e}); falling back to healer.log")
+    if RECEIVER is None or os.environ.get("HEALER_LOG_TAIL") == "1":
+        TASKS.append(asyncio.create_task(watch_healer_log_task()))
+
+async def shutdown():
+    for task in TASKS:
+        task.cancel()
+    await asyncio.gather(*TASKS, return_exceptions=True)
+    TASKS.clear()
+    if RECEIVER is not None:
+        RECEIVER.close()
+    if FEED is not None:
+        FEED.close()
+    if api.HEARTBEAT_STORE is not None:
+        api.HEARTBEAT_STORE.close()
+    if api.LOG_STORE is not None:
+        api.LOG_STORE.close()
+
+# ============================================================================
+# HTTP PLUMBING
+# ============================================================================
+
+class Request:
+    def __init__(self, scope, receive):
+        self.scope = scope
+        self.receive = receive
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1")
+                        for name, value in scope["headers"]}
+        self.args = {key: values[0] for key, values
+                     in parse_qs(scope["query_string"].decode("latin-1")).items()}
+
+    async def body(self):
+        chunks = []
+        while True:
+            message = await self.receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+def cors_headers(request):
+    origin = request.headers.get("origin")
+    if origin in ALLOWED_ORIGINS:
+        return [(b"access-control-allow-origin", origin.encode("latin-1")), (b"vary", b"Origin")]
+    return []
+
+async def respond(request, send, body, status=200, content_type=b"application/json", headers=()):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type),
+                            (b"content-length", str(len(body)).encode())] + list(headers) + cors_headers(request)})
+    await send({"type": "http.response.body", "body": body})
+
+async def respond_encoded(request, send, value, status=200, snapshot=None, key=None):
+    """value as JSON or MessagePack, compressed if accepted; see api_server.encode."""
+    body, content_type, encoding = api.encode(value, request.headers.get("accept"),
+                                              request.headers.get("accept-encoding"), snapshot, key)
+    headers = [(b"vary", b"Accept, Accept-Encoding")]
+    if encoding:
+        headers.append((b"content-encoding", encoding.encode()))
+    await respond(request, send, body, status, content_type.encode(), headers)
+
+class HeadSent(Exception):
+    """A HEAD response is complete once its headers are out; stops the handler."""
+
+def head_only(send):
+    """send for a HEAD request: the headers a GET would get, and an empty body."""
+    async def send_head(message):
+        if message["type"] != "http.response.body":
+            await send(message)
+            return
+        await send({"type": "http.response.body", "body": b""})
+        raise HeadSent()
+    return send_head
+
+async def wait_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+async def sse(request, send, cursor, first, frame, events=None, named=True):
+    """Streams first, then frame(frames) for every matching batch after cursor, until the client goes."""
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream; charset=utf-8"),
+                            (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no")] + cors_headers(request)})
+    disconnected = asyncio.ensure_future(wait_disconnect(request.receive))
+    try:
+        await send({"type": "http.response.body", "body": first, "more_body": True})
+        while True:
+            frames, cursor = await FEED.wait(cursor, SSE_KEEPALIVE, events, named, cancel=disconnected)
+            if disconnected.done():
+                return
+            body = frame(frames) if frames else b": keep-alive\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    except OSError:
+        pass  # Gone mid-write
+    except asyncio.CancelledError:
+        pass  # Server shutting down past SHUTDOWN_GRACE; the stream just ends
+    finally:
+        disconnected.cancel()
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+async def get_status(request, send):
+    snapshot = STATE.current()
+    await respond_encoded(request, send, snapshot["status"], snapshot=snapshot, key="status")
+
+async def get_heartbeat(request, send):
+    if not any(k in request.args for k in ('from', 'to', 'resolution')):
+        snapshot = STATE.current()
+        body, key = api.live_heartbeat(snapshot, request.args)
+        await respond_encoded(request, send, body, snapshot=snapshot if key else None, key=key)
+        return
+    body, status = await asyncio.to_thread(api.query_heartbeat, request.args)  # Disk reads
+    await respond_encoded(request, send, body, status)
+
+async def get_logs(request, send):
+    snapshot = STATE.current()
+    if not any(k in request.args for k in api.LOG_QUERY_ARGS):
+        await respond_encoded(request, send, snapshot["logs"], snapshot=snapshot, key="logs")
+        return
+    body, status = await asyncio.to_thread(api.query_logs, request.args)  # SQLite reads
+    await respond_encoded(request, send, body, status)
+
+async def record_event(request, send):
+    try:
+        data = json.loads(await request.body() or b"null") or {}
+    except ValueError:
+        await respond(request, send, to_json({"error": "Invalid JSON"}), 400)
+        return
+    if not isinstance(data, dict):
+        await respond(request, send, to_json({"error": "An event must be a JSON object"}), 400)
+        return
+    event = api.record_chaos_event(data)
+    await respond_encoded(request, send, {"status": "recorded", "event": event})
+
+async def stream_all(request, send):
+    """Unified push stream; see api_server.stream_all."""
+    cursor = api.parse_event_id(request.headers.get('last-event-id') or request.args.get('last_event_id'))
+    preamble = b""
+    if cursor is None or not EVENTS.covers(cursor):
+        snapshot = STATE.current()
+        cursor, preamble = snapshot.seq, api.snapshot_frame(snapshot)
+    await sse(request, send, cursor, b"retry: 1000\n\n" + preamble, b"".join)
+
+async def stream_logs(request, send):
+    cursor = api.parse_event_id(request.headers.get('last-event-id') or request.args.get('last_event_id'))
+    if cursor is None or not EVENTS.covers(cursor):
+        cursor = 0 if EVENTS.covers(0) else EVENTS.last_seq
+    await sse(request, send, cursor, b"retry: 1000\n\n", b"".join, events={"log"}, named=False)
+
+async def stream_status(request, send):
+    snapshot = STATE.current()
+    await sse(request, send, snapshot.seq, api.status_frame(snapshot),
+              lambda frames: api.status_frame(STATE.current()), events={"status"})
+
+async def get_metrics(request, send):
+    openmetrics, content_type = negotiate(request.headers.get("accept"))
+    body, encoding = wire.compress(api.METRICS.render(openmetrics).encode(),
+                                   wire.content_encoding(request.headers.get("accept-encoding")))
+    await respond(request, send, body, content_type=content_type.encode(),
+                  headers=[(b"content-encoding", encoding.encode())] if encoding else ())
+
+async def health(request, send):
+    await respond(request, send, b"OK", content_type=b"text/plain; charset=utf-8")
+
+ROUTES = {
+    "/api/status": ("GET", get_status),
+    "/api/heartbeat": ("GET", get_heartbeat),
+    "/api/logs": ("GET", get_logs),
+    "/api/event": ("POST", record_event),
+    "/api/stream": ("GET", stream_all),
+    "/api/logs/stream": ("GET", stream_logs),
+    "/api/status/stream": ("GET", stream_status),
+    "/metrics": ("GET", get_metrics),
+    "/health": ("GET", health),
+}
+
+# ============================================================================
+# ASGI APP
+# ============================================================================
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    request = Request(scope, receive)
+    route = ROUTES.get(request.path)
+    if route is None:
+        await respond(request, send, to_json({"error": "Not Found"}), 404)
+        return
+    method, handler = route
+    if request.method == "OPTIONS":  # CORS preflight
+        await send({"type": "http.response.start", "status": 204,
+                    "headers": [(b"access-control-allow-methods", f"{method}, OPTIONS".encode()),
+                                (b"access-control-allow-headers", b"Content-Type")] + cors_headers(request)})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    if request.method not in (method, "HEAD" if method == "GET" else method):
+        await respond(request, send, to_json({"error": "Method Not Allowed"}), 405)
+        return
+    if request.method == "HEAD":
+        try:
+            await handler(request, head_only(send))
+        except HeadSent:
+            pass
+        return
+    await handler(request, send)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await startup()
+            except Exception as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await shutdown()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+# ============================================================================
+# STARTUP
+# ============================================================================
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError:
+        print("[ASGI] uvicorn is not installed (pip install uvicorn); api_server.py serves the same API")
+        sys.exit(1)
+
+    port = int(os.environ.get("PORT", 5001))
+    print("=" * 50)
+    print("  MISSION CONTROL API SERVER (asyncio)")
+    print("=" * 50)
+    print(f"  Running on port: {port}")
+    print(f"  Health probes: {'httpx' if httpx_installed() else 'requests, in a worker thread'}")
+    print("=" * 50)
+    uvicorn.run(app, host="0.0.0.0", port=port, log_level="warning", backlog=4096,
+                timeout_graceful_shutdown=SHUTDOWN_GRACE)
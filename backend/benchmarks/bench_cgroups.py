@@ -0,0 +1,101 @@
+"""
+Cgroup Accounting Benchmark
+Starts an app-like process tree (a root with --children children, each
+holding some memory), puts it in a cgroup (cgroups.py), and reports what one
+resource sample costs each way:
+
+- psutil    sampler.ProcessSampler walking the tree, a oneshot() per process
+- cgroup    cpu.stat, memory.stat and memory.events, one pread() each,
+            however many processes there are (memory.* needs the memory
+            controller delegated to the healer's cgroup)
+
+Then a child double-forks out of the tree, as a daemonizing subprocess
+would, and both are asked again how much CPU the app is burning.
+
+Linux with a writable cgroup v2 hierarchy only.
+
+Usage:
+    python benchmarks/bench_cgroups.py --children 20 --repeat 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from cgroups import Cgroups
+from sampler import ProcessSampler
+
+# Waits for the tree to be in its cgroup, then spawns the children
+ROOT = """
+import sys, time, subprocess
+time.sleep(0.5)
+for _ in range({children}):
+    subprocess.Popen([sys.executable, "-c", "x = bytearray(8 * 1024 * 1024); import time; time.sleep(3600)"])
+time.sleep(3600)
+"""
+# Waits to be in the cgroup, then leaves the tree (double fork) and burns a core
+ESCAPEE = """
+import os, time
+time.sleep(0.3)
+if os.fork() == 0:
+    os.setsid()
+    end = time.time() + 30
+    while time.time() < end:
+        pass
+"""
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(durations)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cgroups = Cgroups()
+    root = subprocess.Popen([sys.executable, "-c", ROOT.format(children=args.children)])
+    try:
+        group = cgroups.place(root.pid, "bench", memory_limit_mb=1024)
+        sampler = ProcessSampler()
+        while len(sampler.sample(root.pid).processes) < args.children + 1:
+            time.sleep(0.1)
+        print(f"processes: {args.children + 1}, controllers: {', '.join(sorted(cgroups.controllers)) or 'none'}")
+
+        def kernel():
+            group.cpu_stat()
+            group.memory_mb()
+            group.memory_events()
+
+        print(f"{'sample':<8} {'us':>8}")
+        print(f"{'psutil':<8} {timed(lambda: sampler.sample(root.pid), args.repeat):>8.0f}")
+        print(f"{'cgroup':<8} {timed(kernel, args.repeat):>8.0f}")
+
+        launcher = subprocess.Popen([sys.executable, "-c", ESCAPEE])
+        group.add(launcher.pid)  # As if the app had started it
+        launcher.wait()
+        sampler.sample(root.pid)
+        group.cpu_percent()
+        time.sleep(2)
+        tree = sampler.sample(root.pid).cpu_percent
+        print()
+        print(f"with a process burning a core outside the tree: psutil sees {tree:.0f}% CPU, "
+              f"the cgroup {group.cpu_percent():.0f}%")
+    finally:
+        root.kill()
+        root.wait()
+        cgroups.close()  # Kills what's left in the group, the escapee included
+
+if __name__ == "__main__":
+    main()
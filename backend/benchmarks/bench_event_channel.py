@@ -0,0 +1,134 @@
+"""
+Event Channel Benchmark
+Measures healer -> API delivery over the structured event channel: the
+latency from emit() to the receiver's callback, and sustained throughput.
+Compared against the old path, where an event had to be written to
+healer.log and picked up by the tailer.
+
+Usage:
+    python benchmarks/bench_event_channel.py --events 20000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import event_channel
+from log_tailer import LogTailer
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def channel_latency(address, count):
+    """One event in flight at a time; returns per-event latencies (ms)."""
+    arrived = threading.Event()
+    latencies = []
+
+    def on_event(event):
+        latencies.append((time.perf_counter() - event.values[0]) * 1000)
+        arrived.set()
+
+    receiver = event_channel.EventReceiver(on_event, address)
+    receiver.start()
+    emitter = event_channel.EventEmitter(address)
+    try:
+        for _ in range(count):
+            arrived.clear()
+            emitter.emit(event_channel.PROBE, "app", pid=4242, duration_ms=3.2,
+                         reason="Status Code: 200", values=(time.perf_counter(),))
+            arrived.wait(1)
+    finally:
+        emitter.close()
+        receiver.close()
+    return latencies
+
+def channel_throughput(address, count):
+    """Emit as fast as possible; returns (received, dropped, seconds)."""
+    done = threading.Event()
+    received = [0]
+
+    def on_event(event):
+        received[0] += 1
+        if received[0] == count:
+            done.set()
+
+    receiver = event_channel.EventReceiver(on_event, address)
+    receiver.start()
+    emitter = event_channel.EventEmitter(address)
+    started = time.perf_counter()
+    try:
+        for _ in range(count):
+            emitter.emit(event_channel.PROBE, "app", pid=4242, duration_ms=3.2, reason="Status Code: 200")
+        done.wait(2)
+        elapsed = time.perf_counter() - started
+    finally:
+        emitter.close()
+        receiver.close()
+    return received[0], emitter.dropped, elapsed
+
+def log_latency(directory, count):
+    """The old path: logging to healer.log, picked up by the inotify tailer."""
+    path = os.path.join(directory, "healer.log")
+    open(path, "w").close()
+    logger = logging.getLogger("bench-healer")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter('%(asctime)s - [HEALER] - %(message)s'))
+    logger.addHandler(handler)
+
+    arrived = threading.Event()
+    latencies = []
+
+    def on_lines(lines):
+        for line in lines:
+            sent = float(line.rsplit(" ", 1)[1])
+            latencies.append((time.perf_counter() - sent) * 1000)
+        arrived.set()
+
+    tailer = LogTailer(path, on_lines)
+    thread = threading.Thread(target=tailer.run, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    try:
+        for _ in range(count):
+            arrived.clear()
+            logger.info(f"✅ [app] probe ok {time.perf_counter()}")
+            arrived.wait(6)
+    finally:
+        tailer.stop()
+        logger.removeHandler(handler)
+        handler.close()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--latency-samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        address = (os.path.join(tmp, "events.sock") if event_channel.USE_UNIX
+                   else ("127.0.0.1", 5099))
+
+        print(f"{'path':<22} {'p50_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+        for name, latencies in (
+            ("event channel", channel_latency(address, args.latency_samples)),
+            ("healer.log + tailer", log_latency(tmp, min(args.latency_samples, 500))),
+        ):
+            print(f"{name:<22} {percentile(latencies, 50):>8.3f} "
+                  f"{percentile(latencies, 99):>8.3f} {max(latencies):>8.3f}")
+
+        received, dropped, elapsed = channel_throughput(address, args.events)
+        print(f"\nthroughput: {received}/{args.events} events in {elapsed:.2f}s "
+              f"({received / elapsed:.0f}/s), {dropped} dropped by sender")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Fluctuation Engine Benchmark
+Measures one health-loop tick of the latency overlay (expire finished
+events, sum the spikes of the rest) with N chaos events in play:
+
+- list:   the original engine, a list of dicts scanned under a lock, with
+          expired events popped out of it one by one
+- engine: fluctuations.FluctuationEngine (NumPy arrays, expiry heap)
+
+A few events are added and a few expire on every tick, like during a
+/chaos storm.
+
+Usage:
+    python benchmarks/bench_fluctuations.py --events 10000 --ticks 200
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from fluctuations import FluctuationEngine, PATTERNS, DEFAULT_PATTERN, DECAY, WAVE
+
+class ListEngine:
+    """The pre-NumPy implementation, kept for comparison."""
+
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+
+    def add(self, event_type, now):
+        pattern = PATTERNS.get(event_type, DEFAULT_PATTERN)
+        with self.lock:
+            self.events.append({'start_time': now, 'end_time': now + pattern.duration,
+                                'base_spike': pattern.base, 'decay': pattern.shape == DECAY,
+                                'wave': pattern.shape == WAVE})
+
+    def spike(self, now):
+        total = 0
+        with self.lock:
+            expired = [i for i, f in enumerate(self.events) if now > f['end_time']]
+            for i in reversed(expired):
+                self.events.pop(i)
+            for f in self.events:
+                elapsed = now - f['start_time']
+                progress = elapsed / (f['end_time'] - f['start_time'])
+                if f['decay']:
+                    spike = f['base_spike'] * (1 - progress * 0.8)
+                elif f['wave']:
+                    spike = f['base_spike'] * (math.sin(elapsed * 4) * 0.25 + 0.75) * (1 - progress * 0.3)
+                else:
+                    spike = f['base_spike'] * (1 - progress * 0.5)
+                total += spike * (0.8 + random.random() * 0.4)
+        return max(0, int(total))
+
+def run(engine, events, ticks):
+    types = list(PATTERNS)
+    # Spread the events' start times so some expire on every tick
+    for i in range(events):
+        engine.add(types[i % len(types)], now=-random.random() * 3)
+    durations = []
+    for tick in range(ticks):
+        now = tick * 0.005
+        for _ in range(events // 500):
+            engine.add(random.choice(types), now=now)
+        started = time.perf_counter()
+        engine.spike(now=now)
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.99) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"events: {args.events}")
+    print(f"{'engine':<8} {'p50_ms':>8} {'p99_ms':>8}")
+    for name, engine in (("list", ListEngine()), ("engine", FluctuationEngine())):
+        p50, p99 = run(engine, args.events, args.ticks)
+        print(f"{name:<8} {p50:>8.3f} {p99:>8.3f}")
+
+if __name__ == "__main__":
+    main()
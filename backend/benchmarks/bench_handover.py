@@ -0,0 +1,104 @@
+"""
+Handover Benchmark
+Keeps client traffic flowing at a supervised breakable_app while it is
+crashed repeatedly, and counts the requests that failed during heals,
+with hot-spare restarts on and off.
+
+Usage:
+    python benchmarks/bench_handover.py --port 5055 --crashes 5 --clients 4
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests
+from supervisor import Supervisor, Target
+from recovery_policy import RecoveryPolicy
+
+def client(url, stop, stats):
+    """Fresh connection per request, like independent users hitting the app."""
+    while not stop.is_set():
+        try:
+            ok = requests.get(url, timeout=5).status_code == 200
+        except requests.RequestException:
+            ok = False
+        stats["ok" if ok else "failed"] += 1
+        if not ok:
+            time.sleep(0.01)  # Don't spin on refusals
+
+def wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def healthy(url):
+    try:
+        return requests.get(url, timeout=0.5).ok
+    except requests.RequestException:
+        return False
+
+def run(hot_spare, args):
+    target = Target(name="handover", script=os.path.join(BACKEND_DIR, "breakable_app.py"),
+                    port=args.port, hot_spare=hot_spare,
+                    # Crashing every second is the point here: no backoff or budget
+                    policy=RecoveryPolicy(budget=10_000, stable_after=0))
+    supervisor = Supervisor([target], verbose=False)
+    supervisor.start()
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+
+    base = f"http://127.0.0.1:{args.port}"
+    stats = {"ok": 0, "failed": 0}
+    stop = threading.Event()
+    try:
+        wait_for(lambda: healthy(base + "/health"), 30)
+        clients = [threading.Thread(target=client, args=(base + "/health", stop, stats), daemon=True)
+                   for _ in range(args.clients)]
+        for t in clients:
+            t.start()
+
+        for _ in range(args.crashes):
+            if hot_spare:
+                wait_for(lambda: target.standby is not None, 30)
+            old_pid = target.process.pid
+            try:
+                requests.get(base + args.endpoint, timeout=1)
+            except requests.RequestException:
+                pass
+            wait_for(lambda: target.process.pid != old_pid and target.restart_finished_at > 0, 30)
+            time.sleep(args.settle)
+
+        stop.set()
+        for t in clients:
+            t.join()
+    finally:
+        supervisor.shutdown()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--crashes", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--endpoint", default="/crash")
+    parser.add_argument("--settle", type=float, default=1.0, help="Seconds of traffic after each heal")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"{'mode':<12} {'requests':>9} {'failed':>7} {'failed/heal':>12}")
+    for name, hot in (("cold", False), ("hot-spare", True)):
+        stats = run(hot, args)
+        total = stats["ok"] + stats["failed"]
+        print(f"{name:<12} {total:>9} {stats['failed']:>7} {stats['failed'] / args.crashes:>12.1f}")
+
+if __name__ == "__main__":
+    main()
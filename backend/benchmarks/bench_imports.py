@@ -0,0 +1,59 @@
+"""
+Import-Time Benchmark
+Runs `python -X importtime` over each app script (the same profile the
+healer logs with AXOLOT_IMPORT_PROFILE=1) and reports the total import time
+and the slowest direct imports, median of --runs fresh interpreters.
+
+Usage:
+    python benchmarks/bench_imports.py --runs 5 --top 5
+    python benchmarks/bench_imports.py --json > imports.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from readiness import import_profile
+
+SCRIPTS = ["breakable_app.py", "api_server.py", "supervisor.py"]
+
+def measure(script, runs):
+    totals, modules = [], {}
+    for _ in range(runs):
+        total_ms, direct = import_profile(os.path.join(BACKEND_DIR, script))
+        totals.append(total_ms)
+        for name, ms in direct:
+            modules.setdefault(name, []).append(ms)
+    return {
+        "total_ms": statistics.median(totals),
+        "modules": sorted(((name, statistics.median(ms)) for name, ms in modules.items()),
+                          key=lambda item: item[1], reverse=True),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="*", default=SCRIPTS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = {script: measure(script, args.runs) for script in args.scripts}
+    if args.json:
+        print(json.dumps({script: {"total_ms": round(r["total_ms"], 2),
+                                   "modules": {name: round(ms, 2) for name, ms in r["modules"][:args.top]}}
+                          for script, r in results.items()}, indent=2))
+        return
+
+    for script, result in results.items():
+        print(f"{script:<20} {result['total_ms']:>8.1f} ms")
+        for name, ms in result["modules"][:args.top]:
+            print(f"  {name:<18} {ms:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()
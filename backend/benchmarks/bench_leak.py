@@ -0,0 +1,92 @@
+"""
+Leak Prediction Benchmark
+Leaks memory into a real breakable_app at a steady rate (/leak = +10 MB)
+and reports how high RSS climbed before the healer restarted it, with
+leak prediction on (proactive restart) and off (hard threshold only).
+
+Usage:
+    python benchmarks/bench_leak.py --every 1.5 --port 5055
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+import psutil
+import requests
+
+import config
+from supervisor import Supervisor, Target
+
+class RecordingSupervisor(Supervisor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.healed = threading.Event()
+        self.reason = None
+
+    def heal(self, target, reason):
+        self.reason = reason
+        super().heal(target, reason)
+        self.healed.set()
+
+def run(predict, args):
+    target = Target(name="leaky", script=os.path.join(BACKEND, "breakable_app.py"), port=args.port)
+    supervisor = RecordingSupervisor([target], verbose=False)
+    if not predict:
+        target.leak.projection = lambda: None  # Hard threshold only
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+
+    base = f"http://127.0.0.1:{args.port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{base}/health", timeout=0.5)
+            break
+        except requests.RequestException:
+            time.sleep(0.1)
+
+    process = psutil.Process(target.process.pid)
+    peak = 0.0
+    started = time.monotonic()
+    next_leak = started
+    try:
+        while not supervisor.healed.is_set() and time.monotonic() - started < args.timeout:
+            if time.monotonic() >= next_leak:
+                try:
+                    requests.get(f"{base}/leak", timeout=2)
+                except requests.RequestException:
+                    pass
+                next_leak += args.every
+            try:
+                peak = max(peak, process.memory_info().rss / (1024 * 1024))
+            except psutil.NoSuchProcess:
+                break
+            time.sleep(0.05)
+        elapsed = time.monotonic() - started
+    finally:
+        supervisor.shutdown()
+    return peak, elapsed, supervisor.reason
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--every", type=float, default=1.5, help="Seconds between /leak calls")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    os.chdir(BACKEND)
+
+    print(f"limit {config.MEMORY_THRESHOLD_MB}MB, leaking 10MB every {args.every:g}s")
+    print(f"{'mode':<12} {'peak_rss_mb':>12} {'restart_after_s':>16}  reason")
+    for name, predict in (("threshold", False), ("predictive", True)):
+        peak, elapsed, reason = run(predict, args)
+        print(f"{name:<12} {peak:>12.1f} {elapsed:>16.1f}  {reason}")
+
+if __name__ == "__main__":
+    main()
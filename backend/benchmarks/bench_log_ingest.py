@@ -0,0 +1,115 @@
+"""
+Log Ingestion Benchmark
+Generates a multi-GB healer.log and measures how fast it can be ingested:
+the chunked LogTailer (classifying every line, and feeding api_server's log
+state) against the old readline() + substring loop.
+
+Usage:
+    python benchmarks/bench_log_ingest.py --size-gb 2
+    python benchmarks/bench_log_ingest.py --file /var/log/healer.log --skip-legacy
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_tailer import LogTailer, classify
+
+SAMPLE_LINES = [
+    "2026-01-01 12:00:00,000 - [HEALER] - 🔧 Starting breakable_app.py [app] on port 5000...",
+    "2026-01-01 12:00:00,120 - [HEALER] - ✅ [app] App started with PID: 4242",
+    "2026-01-01 12:00:03,001 - [HEALER] - 🚨 HEALER ACTIVATED! Issue Detected. [app] Reason: Connection Refused",
+    "2026-01-01 12:00:03,002 - [HEALER] - 🛑 Stopping process 4242...",
+    "2026-01-01 12:00:06,500 - [HEALER] - ❌ [app] Error during check: timed out",
+    "2026-01-01 12:00:09,000 - [MONITOR] - probe ok latency=3.2ms memory=31.6MB",
+]
+
+def generate(path, size_bytes):
+    block = ("\n".join(SAMPLE_LINES * 2000) + "\n").encode("utf-8")
+    written = 0
+    with open(path, "wb") as f:
+        while written < size_bytes:
+            f.write(block)
+            written += len(block)
+    return written
+
+def ingest_tailer(path):
+    counts = {}
+
+    def on_lines(lines):
+        for line in lines:
+            line = line.strip()
+            if line:
+                kind = classify(line)
+                counts[kind] = counts.get(kind, 0) + 1
+
+    tailer = LogTailer(path, on_lines, start_at_end=False)
+    started = time.perf_counter()
+    lines = tailer.read_available()
+    return lines, time.perf_counter() - started
+
+def ingest_api(path):
+    """Full Mission Control path: tailer batches into api_server's log state."""
+    import api_server
+    tailer = LogTailer(path, api_server.ingest_healer_lines, start_at_end=False)
+    started = time.perf_counter()
+    lines = tailer.read_available()
+    return lines, time.perf_counter() - started
+
+def ingest_legacy(path):
+    """The old api_server.watch_healer_log inner loop, minus the sleeps."""
+    counts = {}
+    lines = 0
+    started = time.perf_counter()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                log_type = "INFO"
+                if "HEALER ACTIVATED" in line or "Issue Detected" in line:
+                    log_type = "WARN"
+                elif "Error" in line or "error" in line:
+                    log_type = "ERROR"
+                elif "Starting" in line or "started" in line:
+                    log_type = "INFO"
+                counts[log_type] = counts.get(log_type, 0) + 1
+                lines += 1
+    return lines, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-gb", type=float, default=2)
+    parser.add_argument("--file", help="Ingest an existing file instead of generating one")
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    tmpdir = None
+    path = args.file
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, "healer.log")
+        print(f"Generating {args.size_gb:g} GB at {path}...")
+        generate(path, int(args.size_gb * 1024 ** 3))
+
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"{'reader':<18} {'lines':>12} {'seconds':>9} {'MB/s':>8} {'lines/s':>12}")
+    runs = [("LogTailer", ingest_tailer), ("LogTailer -> API", ingest_api)]
+    if not args.skip_legacy:
+        runs.append(("readline (old)", ingest_legacy))
+    try:
+        for name, ingest in runs:
+            lines, elapsed = ingest(path)
+            print(f"{name:<18} {lines:>12} {elapsed:>9.2f} {size_mb / elapsed:>8.0f} {lines / elapsed:>12.0f}")
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Log Store Benchmark
+Fills a scratch log_store.LogStore with --rows lines spread over --days
+(healer/API style messages, mixed types), then reports:
+
+- append       what add_log() pays per line (a queue put), p50/p99 in us,
+               and the writer thread's sustained commit rate
+- queries      p50/p99 ms of a page of 100, newest first, for each filter:
+               type, time range, text (rare and common words), all three,
+               and a page deep in the results via its `before` cursor
+- scan         the same type filter as a list comprehension over all rows
+               in memory, which is what /api/logs?type= used to do over
+               its 100-entry buffer
+
+Usage:
+    python benchmarks/bench_log_store.py --rows 1000000 --days 21
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from log_store import LogStore
+
+TYPES = ("INFO", "INFO", "INFO", "WARN", "WARN", "ERROR", "CRASH", "HEAL", "EVENT")
+TARGETS = ("app", "api", "worker")
+
+def message(log_type, i):
+    target = random.choice(TARGETS)
+    if log_type == "CRASH":
+        return f"[HEALER] {target}: PID {1000 + i % 50000} exited with code {random.choice((1, 137, 139))}"
+    if log_type == "HEAL":
+        return f"[HEALER] {target}: restarted as PID {1000 + i % 50000} in {random.randint(80, 900)}ms"
+    if log_type == "WARN":
+        return f"[HEALER] {target}: check failed (Request Timed Out)"
+    if log_type == "EVENT":
+        return f"[CHAOS] {random.choice(('Memory leak', 'CPU burn', 'Hard crash'))} triggered!"
+    if log_type == "ERROR":
+        return f"[HEALER] {target}: PID {1000 + i % 50000} hung (no heartbeat for 5s)"
+    return f"[HEALER] {target}: PID {1000 + i % 50000} ready, cold start {random.randint(200, 900)}ms"
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.99) - 1] if repeat >= 100 else durations[-1], result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=float, default=21)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(1)
+    workdir = tempfile.mkdtemp(prefix="axolot-logs-")
+    store = LogStore(os.path.join(workdir, "logs.db"))
+    try:
+        end_ms = int(time.time() * 1000)
+        start_ms = end_ms - int(args.days * 86400 * 1000)
+        step = (end_ms - start_ms) / args.rows
+        lines = []
+        for i in range(args.rows):
+            log_type = random.choice(TYPES)
+            lines.append((start_ms + int(i * step), log_type, message(log_type, i)))
+
+        append_us = []
+        started = time.perf_counter()
+        for ts, log_type, text in lines:
+            t = time.perf_counter()
+            store.append(ts, log_type, text)
+            append_us.append((time.perf_counter() - t) * 1e6)
+        store.flush(timeout=3600)
+        elapsed = time.perf_counter() - started
+        append_us.sort()
+        print(f"rows: {args.rows:,} over {args.days:g} days, FTS5: {'yes' if store.fts else 'no'}")
+        print(f"append: p50 {statistics.median(append_us):.1f}us, p99 {append_us[int(len(append_us) * 0.99)]:.1f}us; "
+              f"committed {args.rows / elapsed:,.0f} rows/s, "
+              f"{os.path.getsize(store.path) / (1024 * 1024):.0f} MB on disk")
+
+        day_ms = 86400 * 1000
+        middle = start_ms + (end_ms - start_ms) // 2
+        deep = store.query(log_type="CRASH", limit=1000)
+        for _ in range(20):
+            deep = store.query(log_type="CRASH", before=deep["next"], limit=1000)
+        queries = {
+            "type=CRASH": lambda: store.query(log_type="CRASH"),
+            "1 day range": lambda: store.query(start_ms=middle, end_ms=middle + day_ms),
+            "q=hung (rare)": lambda: store.query(text="hung 1234"),
+            "q=healer (common)": lambda: store.query(text="healer"),
+            "type+range+q": lambda: store.query(log_type="HEAL", start_ms=middle, end_ms=middle + day_ms,
+                                                text="worker"),
+            "page 21k deep": lambda: store.query(log_type="CRASH", before=deep["next"]),
+        }
+        print()
+        print(f"{'query':<18} {'p50_ms':>8} {'p99_ms':>8} {'rows':>5}")
+        for name, query in queries.items():
+            p50, p99, page = timed(query, args.repeat)
+            print(f"{name:<18} {p50:>8.2f} {p99:>8.2f} {len(page['logs']):>5}")
+
+        rows = [{"timestamp": ts, "type": log_type, "message": text} for ts, log_type, text in lines]
+        p50, p99, _ = timed(lambda: [l for l in rows if l["type"] == "CRASH"][-100:], max(3, args.repeat // 10))
+        print(f"{'scan type=CRASH':<18} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
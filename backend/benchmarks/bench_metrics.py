@@ -0,0 +1,102 @@
+"""
+Metrics Recording Benchmark
+Measures what recording a histogram observation costs the thread doing it,
+and whether scrapes hold writers up:
+
+- metrics: metrics.Histogram (labels, bucket found outside its lock)
+- bare:    one unlabelled histogram, the whole record under its lock
+
+Each runs --threads writers, alone and then with a scraper rendering the
+whole thing in a loop.
+
+Usage:
+    python benchmarks/bench_metrics.py --threads 4 --seconds 2
+"""
+
+import os
+import sys
+import time
+import bisect
+import random
+import argparse
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from metrics import Registry
+
+class LockedHistogram:
+    """The straightforward version: one lock around one set of buckets."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.sum += value
+
+    def render(self):
+        with self.lock:
+            counts, total = list(self.counts), self.sum
+        cumulative, out = 0, []
+        for bound, count in zip(self.bounds + [float("inf")], counts):
+            cumulative += count
+            out.append(f'x_bucket{{le="{bound}"}} {cumulative}')
+        out.append(f"x_sum {total}")
+        return "\n".join(out)
+
+def run(observe, render, threads, seconds, scrape):
+    values = [random.lognormvariate(-5, 1.5) for _ in range(4096)]
+    stop = threading.Event()
+    counts = [0] * threads
+    scrapes = [0]
+
+    def writer(i):
+        n = 0
+        while not stop.is_set():
+            for value in values:
+                observe(value)
+            n += len(values)
+        counts[i] = n
+
+    def scraper():
+        while not stop.is_set():
+            render()
+            scrapes[0] += 1
+
+    workers = [threading.Thread(target=writer, args=(i,)) for i in range(threads)]
+    if scrape:
+        workers.append(threading.Thread(target=scraper))
+    for t in workers:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in workers:
+        t.join()
+    total = sum(counts)
+    return total / seconds, seconds * threads / max(total, 1) * 1e9, scrapes[0] / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    registry = Registry()
+    histogram = registry.histogram("x", "benchmark", 0.0005, 2 ** 0.5, 24)
+    locked = LockedHistogram(histogram.bounds)
+
+    print(f"{'method':<8} {'scraping':<9} {'records/s':>12} {'ns/record':>10} {'scrapes/s':>10}")
+    for name, observe, render in (("metrics", histogram.observe, registry.render),
+                                  ("bare", locked.observe, locked.render)):
+        for scrape in (False, True):
+            rate, ns, scrapes = run(observe, render, args.threads, args.seconds, scrape)
+            print(f"{name:<8} {'yes' if scrape else 'no':<9} {rate:>12,.0f} {ns:>10.0f} {scrapes:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+MTTR Benchmark
+Fires each crash endpoint of breakable_app.py at a supervised instance and
+reports how long the healer took to detect the exit, restart the app, and
+see it answer /health again (all measured from the moment of the request).
+
+Usage:
+    python benchmarks/bench_mttr.py --port 5055 --rounds 3
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests
+from supervisor import Supervisor, Target
+from recovery_policy import RecoveryPolicy
+
+CHAOS_ENDPOINTS = ["/crash", "/hard-crash", "/nuclear"]
+
+def wait_healthy(url, after_pid, timeout=30):
+    """Polls /status until a *new* process answers. Returns time.monotonic() of success."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            res = requests.get(url, timeout=0.5)
+            if res.ok and res.json().get("pid") != after_pid:
+                return time.monotonic()
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not recover within {timeout}s")
+
+def measure(supervisor, target, endpoint):
+    base = f"http://127.0.0.1:{target.port}"
+    old_pid = target.process.pid
+
+    fired = time.monotonic()
+    try:
+        requests.get(base + endpoint, timeout=1)
+    except requests.RequestException:
+        pass  # The app may die before it answers
+    healthy = wait_healthy(base + "/status", old_pid)
+    # A promoted standby can answer before heal() has finished its bookkeeping
+    deadline = time.monotonic() + 30
+    while target.restart_finished_at < fired and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # A probe can spot the dead process before the exit watcher reaps it
+    detected = target.exited_at if target.exited_at >= fired else target.restart_started_at
+
+    return {
+        "detect_ms": (detected - fired) * 1000,
+        "restart_ms": (target.restart_finished_at - fired) * 1000,
+        "healthy_ms": (healthy - fired) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--endpoints", nargs="+", default=CHAOS_ENDPOINTS)
+    args = parser.parse_args()
+
+    target = Target(name="mttr", script=os.path.join(BACKEND_DIR, "breakable_app.py"), port=args.port,
+                    # Crashing every second is the point here: no backoff or budget
+                    policy=RecoveryPolicy(budget=10_000, stable_after=0))
+    supervisor = Supervisor([target], verbose=False)
+    supervisor.start()
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+
+    try:
+        wait_healthy(f"http://127.0.0.1:{args.port}/status", after_pid=None)
+        print(f"{'endpoint':<12} {'detect_ms':>10} {'restart_ms':>11} {'healthy_ms':>11}")
+        for endpoint in args.endpoints:
+            runs = []
+            for _ in range(args.rounds):
+                # Measure the hot-spare path, not a cold start while the next spare boots
+                deadline = time.monotonic() + 30
+                while target.hot_spare and target.standby is None and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                runs.append(measure(supervisor, target, endpoint))
+                time.sleep(0.5)
+            row = {k: statistics.mean(r[k] for r in runs) for k in runs[0]}
+            print(f"{endpoint:<12} {row['detect_ms']:>10.1f} {row['restart_ms']:>11.1f} {row['healthy_ms']:>11.1f}")
+    finally:
+        supervisor.shutdown()
+
+if __name__ == "__main__":
+    main()
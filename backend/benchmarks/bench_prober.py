@@ -0,0 +1,115 @@
+"""
+Prober Benchmark
+Compares probes/sec and p99 probe latency of the old one-shot
+requests.get() against the pooled keep-alive Prober (and AsyncProber when
+httpx is installed).
+
+By default a local HTTP/1.1 stub answers the probes; pass --url to aim at a
+running breakable_app instead.
+
+Usage:
+    python benchmarks/bench_prober.py --probes 2000 --concurrency 8
+    python benchmarks/bench_prober.py --url http://127.0.0.1:5000/health
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from prober import Prober, AsyncProber, httpx_installed
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Otherwise delayed ACKs dominate keep-alive latency
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def run_sync(probe, probes, concurrency):
+    latencies = []
+
+    def one(_):
+        started = time.perf_counter()
+        probe()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(probes)))
+    return probes / (time.perf_counter() - started), latencies
+
+def run_async(url, probes, concurrency):
+    async def go():
+        prober = AsyncProber()
+        latencies = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                _, _, latency = await prober.probe(url)
+                latencies.append(latency)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(probes)))
+        elapsed = time.perf_counter() - started
+        await prober.close()
+        return probes / elapsed, latencies
+
+    return asyncio.run(go())
+
+def report(name, rate, latencies):
+    print(f"{name:<22} {rate:>10.0f} {percentile(latencies, 50):>9.2f} {percentile(latencies, 99):>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Probe this URL instead of the built-in stub")
+    parser.add_argument("--probes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    url = args.url
+    if url is None:
+        server = StubServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/health"
+
+    print(f"{'client':<22} {'probes/s':>10} {'p50_ms':>9} {'p99_ms':>9}")
+
+    rate, latencies = run_sync(lambda: requests.get(url, timeout=2), args.probes, args.concurrency)
+    report("requests.get (old)", rate, latencies)
+
+    prober = Prober()
+    rate, latencies = run_sync(lambda: prober.probe(url), args.probes, args.concurrency)
+    report("Prober (pooled)", rate, latencies)
+    prober.close()
+
+    if httpx_installed():
+        rate, latencies = run_async(url, args.probes, args.concurrency)
+        report("AsyncProber (httpx)", rate, latencies)
+    else:
+        print("AsyncProber (httpx)    skipped: httpx not installed")
+
+if __name__ == "__main__":
+    main()
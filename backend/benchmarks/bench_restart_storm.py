@@ -0,0 +1,86 @@
+"""
+Restart Storm Benchmark
+Supervises an app that dies at boot, as a bad deploy would, and reports how
+many restarts the healer attempted and how much host CPU went on them in
+--duration seconds. Once with the recovery policy (budget, backoff,
+crash-loop quarantine) and once without it (restart every failure at once).
+
+Boot failures:
+- exit:     sys.exit(1) before serving (deterministic, e.g. bad config)
+- segfault: SIGSEGV before serving (native crash)
+
+Usage:
+    python benchmarks/bench_restart_storm.py --duration 20
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import psutil
+
+from supervisor import Supervisor, Target
+from recovery_policy import RecoveryPolicy, QUARANTINED
+
+FAILURES = {
+    "exit": "import sys\n\ndef main():\n    sys.exit(1)\n",
+    "segfault": "import ctypes\n\ndef main():\n    ctypes.string_at(0)\n",
+}
+BOILERPLATE = "\nif __name__ == '__main__':\n    main()\n"
+
+class CountingSupervisor(Supervisor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restarts = 0
+        self.quarantined_after = None
+        self.started = time.monotonic()
+
+    def heal(self, target, reason):
+        self.restarts += 1
+        super().heal(target, reason)
+
+    def _quarantine(self, target, reason, decision):
+        if self.quarantined_after is None:
+            self.quarantined_after = time.monotonic() - self.started
+        super()._quarantine(target, reason, decision)
+
+def run(script, policy, args):
+    target = Target(name="storm", script=script, port=args.port, policy=policy)
+    supervisor = CountingSupervisor([target], verbose=False)
+    cpu_before = sum(psutil.cpu_times()[:3])  # user + nice + system, whole host
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+    time.sleep(args.duration)
+    supervisor.shutdown()
+    cpu = sum(psutil.cpu_times()[:3]) - cpu_before
+    return supervisor.restarts, cpu, supervisor.quarantined_after, target.policy.state == QUARANTINED
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    print(f"{'failure':<9} {'policy':<9} {'restarts':>9} {'cpu_s':>7} {'quarantined_after_s':>20}")
+    with tempfile.TemporaryDirectory() as directory:
+        for failure, body in FAILURES.items():
+            script = os.path.join(directory, f"boot_{failure}.py")
+            with open(script, "w", encoding="utf-8") as f:
+                f.write(body + BOILERPLATE)
+            for name, policy in (
+                ("none", RecoveryPolicy(budget=10_000, backoff_base=0, crash_loop_limit=10_000)),
+                ("default", RecoveryPolicy()),
+            ):
+                restarts, cpu, after, quarantined = run(script, policy, args)
+                after = f"{after:.1f}" if quarantined else "-"
+                print(f"{failure:<9} {name:<9} {restarts:>9} {cpu:>7.1f} {after:>20}")
+
+if __name__ == "__main__":
+    main()
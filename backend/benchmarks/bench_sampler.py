@@ -0,0 +1,72 @@
+"""
+Sampler Benchmark
+Measures what one resource sample of a process tree costs the healer:
+the sampler (cached handles, one oneshot() pass per process), with and
+without USS, vs reading the same metrics through fresh psutil.Process
+objects one call at a time.
+
+Usage:
+    python benchmarks/bench_sampler.py --children 8 --samples 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import psutil
+from sampler import ProcessSampler
+
+def naive(pid):
+    """The same metrics, with no handle reuse and no oneshot()."""
+    root = psutil.Process(pid)
+    for process in [root] + root.children(recursive=True):
+        process = psutil.Process(process.pid)
+        process.cpu_times()
+        process.memory_full_info()
+        process.num_threads()
+        process.num_fds()
+        process.io_counters()
+        process.name()
+
+def timed(sample, pid, samples):
+    sample(pid)  # Warm up: the sampler's first pass fills its handle cache
+    durations = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        sample(pid)
+        durations.append((time.perf_counter() - started) * 1000)
+    durations.sort()
+    return statistics.median(durations), durations[int(len(durations) * 0.99) - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=8)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    children = [subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+                for _ in range(args.children)]
+    try:
+        pid = os.getpid()
+        print(f"tree: {args.children + 1} processes")
+        print(f"{'method':<16} {'p50_ms':>8} {'p99_ms':>8}")
+        for name, sample in (
+            ("sampler", ProcessSampler(uss=True).sample),
+            ("sampler no-uss", ProcessSampler(uss=False).sample),
+            ("naive", naive),
+        ):
+            p50, p99 = timed(sample, pid, args.samples)
+            print(f"{name:<16} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+if __name__ == "__main__":
+    main()
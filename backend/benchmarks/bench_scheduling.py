@@ -0,0 +1,140 @@
+"""
+Probe Scheduling Benchmark
+Runs two Supervisors side by side against the same stub target: one on the
+old fixed schedule (probe every CHECK_INTERVAL, act on the first failure)
+and one on the adaptive ProbeSchedule. Reports steady-state probe load and
+how long each takes to confirm a failure, for:
+
+- degrade: latency creeps up for a while before /health starts failing
+- sudden:  /health starts failing with no warning
+
+Intervals are scaled down by --scale so a run takes seconds, not minutes;
+reported numbers are scaled back up to real-schedule time.
+
+Usage:
+    python benchmarks/bench_scheduling.py --scale 0.1 --trials 3
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from scheduling import ProbeSchedule
+from supervisor import Supervisor, Target
+
+# What the stub does right now; flipped by the scenario
+BEHAVIOUR = {"delay": 0.0, "status": 200}
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if BEHAVIOUR["delay"]:
+            time.sleep(BEHAVIOUR["delay"])
+        self.send_response(BEHAVIOUR["status"])
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+class RecordingSupervisor(Supervisor):
+    """Notes when a failure is confirmed instead of restarting anything."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.healed_at = None
+
+    def heal(self, target, reason):
+        if self.healed_at is None:
+            self.healed_at = time.monotonic()
+
+def make_supervisor(name, schedule, url, process):
+    target = Target(name=name, health_url=url, schedule=schedule)
+    target.process = process
+    supervisor = RecordingSupervisor([target], verbose=False)
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+    return supervisor, target
+
+def trial(scenario, args, url, process):
+    s = args.scale
+    BEHAVIOUR.update(delay=0.0, status=200)
+    fixed = make_supervisor("fixed", ProbeSchedule(
+        config.CHECK_INTERVAL * s, max_interval=config.CHECK_INTERVAL * s,
+        burst_interval=config.CHECK_INTERVAL * s, max_retries=1), url, process)
+    adaptive = make_supervisor("adaptive", ProbeSchedule(
+        config.CHECK_INTERVAL * s, max_interval=config.MAX_CHECK_INTERVAL * s,
+        burst_interval=config.BURST_INTERVAL * s), url, process)
+
+    # Let the adaptive schedule settle, then count probes over the second half
+    time.sleep(args.steady / 2)
+    settled = {"fixed": fixed[1].schedule.probes, "adaptive": adaptive[1].schedule.probes}
+    time.sleep(args.steady / 2)
+    steady = {"fixed": fixed[1].schedule.probes - settled["fixed"],
+              "adaptive": adaptive[1].schedule.probes - settled["adaptive"]}
+
+    if scenario == "degrade":
+        ramp_started = time.monotonic()
+        while time.monotonic() - ramp_started < args.ramp:
+            progress = (time.monotonic() - ramp_started) / args.ramp
+            BEHAVIOUR["delay"] = progress * args.ramp_ms / 1000
+            time.sleep(0.01)
+    BEHAVIOUR.update(delay=0.0, status=503)
+    failed_at = time.monotonic()
+
+    deadline = failed_at + config.MAX_CHECK_INTERVAL * s * 2 + 1
+    while time.monotonic() < deadline and (fixed[0].healed_at is None or adaptive[0].healed_at is None):
+        time.sleep(0.005)
+
+    result = {}
+    for name, (supervisor, _) in (("fixed", fixed), ("adaptive", adaptive)):
+        supervisor.stop()
+        supervisor._pool.shutdown(wait=False, cancel_futures=True)
+        detect = (supervisor.healed_at - failed_at) / s if supervisor.healed_at else float("nan")
+        # Probes per minute of real-schedule time while healthy
+        result[name] = (steady[name] / (args.steady / 2 / s) * 60, detect)
+    BEHAVIOUR.update(delay=0.0, status=200)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=0.1, help="Multiply every interval by this")
+    parser.add_argument("--steady", type=float, default=20, help="Healthy seconds before the fault")
+    parser.add_argument("--ramp", type=float, default=6, help="Seconds of rising latency (degrade)")
+    parser.add_argument("--ramp-ms", type=float, default=60, help="Latency added by the end of the ramp")
+    parser.add_argument("--trials", type=int, default=3)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/health"
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+
+    print(f"{'scenario':<9} {'schedule':<9} {'probes/min':>11} {'detect_s':>9}")
+    try:
+        for scenario in ("degrade", "sudden"):
+            runs = [trial(scenario, args, url, process) for _ in range(args.trials)]
+            for name in ("fixed", "adaptive"):
+                load = sum(r[name][0] for r in runs) / len(runs)
+                detect = sum(r[name][1] for r in runs) / len(runs)
+                print(f"{scenario:<9} {name:<9} {load:>11.1f} {detect:>9.2f}")
+    finally:
+        process.kill()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+SSE Subscriber Benchmark
+Holds N dashboards' worth of /api/logs/stream connections open against each
+API server, then posts chaos events and reports:
+
+- connected     subscribers that got their stream going (of --subscribers)
+- rss_mb        the server's resident memory with all of them connected,
+                and per subscriber above the idle server
+- threads       the server's OS threads with all of them connected
+- p50/p99_ms    from POSTing /api/event to its log line reaching each
+                subscriber, over every (event, subscriber) pair
+
+Servers:
+    flask   api_server.py (Werkzeug, one thread per connection)
+    asgi    asgi_server.py under uvicorn (one event loop)
+
+Each starts in a scratch directory with the app it probes down, so the only
+log lines are the posted events. The subscribers all live on this process's
+event loop; on a small box the latencies include it reading every socket.
+
+Usage:
+    python benchmarks/bench_sse_subscribers.py --subscribers 5000 --events 20
+    python benchmarks/bench_sse_subscribers.py --servers asgi --subscribers 10000
+"""
+
+import os
+import sys
+import time
+import shutil
+import signal
+import asyncio
+import argparse
+import resource
+import tempfile
+import subprocess
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import psutil
+import requests
+
+SERVERS = {
+    "flask": "api_server.py",
+    "asgi": "asgi_server.py",
+}
+
+CONNECT_BATCH = 250  # Subscribers connecting at once
+CONNECT_TIMEOUT = 30
+
+def start_server(name, port, workdir):
+    env = dict(os.environ,
+               PORT=str(port),
+               TARGET_APP_URL="http://127.0.0.1:9",  # Nothing listens; probes fail fast
+               AXOLOT_EVENT_SOCKET=os.path.join(workdir, "events.sock"),
+               HEARTBEAT_STORE_DIR=os.path.join(workdir, "heartbeat_data"),
+               HEALER_LOG=os.path.join(workdir, "healer.log"))
+    log = open(os.path.join(workdir, f"{name}.log"), "wb")
+    process = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, SERVERS[name])],
+                               cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+                               start_new_session=True)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{SERVERS[name]} exited (see {log.name})")
+        try:
+            if requests.get(url + "/health", timeout=1).ok:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{SERVERS[name]} did not come up")
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGINT)
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    except ProcessLookupError:
+        pass
+
+def footprint(pid):
+    process = psutil.Process(pid)
+    return process.memory_info().rss / (1024 * 1024), process.num_threads()
+
+# ============================================================================
+# SUBSCRIBERS
+# ============================================================================
+
+class Subscriber:
+    """One raw-socket SSE client; notes when each awaited label shows up."""
+
+    def __init__(self, bench):
+        self.bench = bench
+        self.writer = None
+        self.seen = None  # Last label delivered here
+
+    async def connect(self, port):
+        reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+        self.writer.write(b"GET /api/logs/stream HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                          b"Accept: text/event-stream\r\n\r\n")
+        buffer = b""
+        while b"retry:" not in buffer:
+            chunk = await reader.read(65536)
+            if not chunk:
+                raise ConnectionError("closed before the stream started")
+            buffer += chunk
+        return reader
+
+    async def listen(self, reader):
+        tail = b""
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                return
+            data, tail = tail + chunk, chunk[-64:]  # A label may straddle two reads
+            label = self.bench.label
+            if label is not None and label != self.seen and label in data:
+                self.seen = label
+                self.bench.delivered(time.perf_counter())
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+class Bench:
+    """The subscribers of one run, and the label they are currently waiting for."""
+
+    def __init__(self, port):
+        self.port = port
+        self.clients = []
+        self.tasks = []
+        self.label = None
+        self.sent_at = 0.0
+        self.latencies = []
+        self.pending = 0
+        self.done = None
+
+    async def connect(self, subscribers):
+        async def join():
+            client = Subscriber(self)
+            try:
+                reader = await asyncio.wait_for(client.connect(self.port), CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                client.close()
+                return
+            self.clients.append(client)
+            self.tasks.append(asyncio.create_task(client.listen(reader)))
+
+        for start in range(0, subscribers, CONNECT_BATCH):
+            await asyncio.gather(*(join() for _ in range(min(CONNECT_BATCH, subscribers - start))))
+
+    async def publish(self, events):
+        """Posts one event at a time and waits for every subscriber to see it. Returns deliveries."""
+        loop = asyncio.get_running_loop()
+        url = f"http://127.0.0.1:{self.port}/api/event"
+        delivered = 0
+        for i in range(events):
+            label = f"bench-{os.getpid()}-{i}"
+            self.label = label.encode()
+            self.pending, self.done = len(self.clients), asyncio.Event()
+            self.sent_at = time.perf_counter()
+            await loop.run_in_executor(None, lambda: requests.post(
+                url, json={"type": "bench", "label": label}, timeout=10))
+            try:
+                await asyncio.wait_for(self.done.wait(), 10)
+            except asyncio.TimeoutError:
+                pass
+            delivered += len(self.clients) - self.pending
+            self.label = None
+            await asyncio.sleep(0.2)
+        return delivered
+
+    def delivered(self, now):
+        self.latencies.append((now - self.sent_at) * 1000)
+        self.pending -= 1
+        if self.pending == 0:
+            self.done.set()
+
+    async def close(self):
+        for client in self.clients:
+            client.close()
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else float("nan")
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def measure(name, args):
+    workdir = tempfile.mkdtemp(prefix="axolot-sse-")
+    process = start_server(name, args.port, workdir)
+    bench = Bench(args.port)
+
+    async def run():
+        await bench.connect(args.subscribers)
+        await asyncio.sleep(1)  # Let the server settle before measuring it
+        loaded = footprint(process.pid)
+        delivered = await bench.publish(args.events)
+        await bench.close()
+        return loaded, delivered
+
+    try:
+        idle_rss, _ = footprint(process.pid)
+        (rss, threads), delivered = asyncio.run(run())
+    finally:
+        stop_server(process)
+        shutil.rmtree(workdir, ignore_errors=True)
+    connected = len(bench.clients)
+    return {
+        "connected": connected,
+        "rss_mb": rss,
+        "kb_per_sub": (rss - idle_rss) * 1024 / connected if connected else float("nan"),
+        "threads": threads,
+        "p50_ms": statistics.median(bench.latencies) if bench.latencies else float("nan"),
+        "p99_ms": percentile(bench.latencies, 0.99),
+        "delivered": delivered / max(connected * args.events, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5091)
+    args = parser.parse_args()
+
+    # Every subscriber is a socket here and another in the server
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, args.subscribers + 1024)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    print(f"subscribers: {args.subscribers}, events: {args.events}")
+    print(f"{'server':<7} {'connected':>9} {'rss_mb':>8} {'kb/sub':>7} {'threads':>7} "
+          f"{'p50_ms':>8} {'p99_ms':>8} {'delivered':>9}")
+    for name in args.servers:
+        r = measure(name, args)
+        print(f"{name:<7} {r['connected']:>9} {r['rss_mb']:>8.1f} {r['kb_per_sub']:>7.1f} {r['threads']:>7} "
+              f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['delivered']:>9.1%}")
+
+if __name__ == "__main__":
+    main()
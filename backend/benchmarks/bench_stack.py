@@ -0,0 +1,456 @@
+"""
+Whole-Stack Chaos Benchmark
+Starts the real stack locally (healer.py supervising breakable_app.py, and
+api_server.py) in a scratch directory, drives HTTP load at the app, injects
+chaos scenarios one after the other, and reports as JSON:
+
+- mttd_ms / mttr_ms   per scenario: from the injection to the healer's first
+                      sign of noticing (failed probe, exit, hang, ...), and
+                      to the replacement being ready (or a worker recycled)
+- error_rate          failed load requests, overall and per scenario
+- downtime_ms         per scenario: first to last failed load request
+- probe               the healer's probe durations and rate, and what the
+                      healer and the API cost in CPU while all this runs
+- api                 /api/status throughput and latency under --api-clients
+
+Healer events are read from the API's SSE stream, like the dashboard does.
+Pass --baseline with an earlier run's JSON to flag regressions; the exit
+status is 1 if there are any.
+
+Scenarios (breakable_app endpoints):
+    hard-crash   /hard-crash once: the process dies
+    leak         /leak (10MB) every 0.5s until the healer steps in
+    cpu-burn     /cpu-burn once: CPU pinned until the sustained-CPU rule fires
+    slow         /slow once: every /health takes 5s from then on
+    freeze       /freeze once: the GIL is held, every thread stalls
+
+Usage:
+    python benchmarks/bench_stack.py --scenarios hard-crash leak slow --rounds 2 --output run.json
+    python benchmarks/bench_stack.py --baseline run.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from collections import namedtuple
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import psutil
+import requests
+
+Scenario = namedtuple("Scenario", "endpoint repeat interval timeout")
+
+SCENARIOS = {
+    "hard-crash": Scenario("/hard-crash", 1, 0, 30),
+    "leak": Scenario("/leak", 20, 0.5, 40),
+    "cpu-burn": Scenario("/cpu-burn", 1, 0, 60),
+    "slow": Scenario("/slow", 1, 0, 40),
+    "freeze": Scenario("/freeze", 1, 0, 30),
+}
+
+# Healer events (event_channel.TYPE_NAMES) that show it noticed. A failed
+# probe does too; recovery is a successful restart_finish or a worker_recycle
+DETECTED = {"exit", "hang", "restart_start", "backoff", "quarantine", "worker_recycle"}
+
+# ============================================================================
+# THE STACK
+# ============================================================================
+
+class Stack:
+    """healer.py and api_server.py, each in its own session so all they spawned can be killed."""
+
+    def __init__(self, args):
+        self.args = args
+        self.workdir = tempfile.mkdtemp(prefix="axolot-bench-")
+        self.app_url = f"http://127.0.0.1:{args.app_port}"
+        self.api_url = f"http://127.0.0.1:{args.api_port}"
+        self.healer = self.api = None
+
+    def start(self):
+        targets = os.path.join(self.workdir, "targets.json")
+        with open(targets, "w", encoding="utf-8") as f:
+            json.dump([{"name": "app", "script": os.path.join(BACKEND_DIR, "breakable_app.py"),
+                        "port": self.args.app_port, "workers": self.args.workers}], f)
+        env = dict(os.environ, PYTHONUNBUFFERED="1",
+                   AXOLOT_TARGETS=targets,
+                   AXOLOT_EVENT_SOCKET=os.path.join(self.workdir, "events.sock"),
+                   AXOLOT_HANG_REPORTS=os.path.join(self.workdir, "hang_reports"))
+        # The API first, so the healer's first events have somewhere to go
+        self.api = self._spawn("api_server.py", dict(
+            env, PORT=str(self.args.api_port), TARGET_APP_URL=self.app_url, TARGET_APP_NAME="app",
+            HEARTBEAT_STORE_DIR=os.path.join(self.workdir, "heartbeat_data"),
+            HEALER_LOG=os.path.join(self.workdir, "healer.log")))
+        wait_for(lambda: get_ok(self.api_url + "/health"), 30, "the API to come up")
+        self.healer = self._spawn("healer.py", env)
+        wait_for(lambda: get_ok(self.app_url + "/health"), 60, "the app to come up")
+        wait_for(lambda: "app" in requests.get(self.api_url + "/api/status", timeout=1).json()["healer"],
+                 30, "the healer's events to reach the API")
+
+    def _spawn(self, script, env):
+        log = open(os.path.join(self.workdir, script.replace(".py", ".out")), "wb")
+        return subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, script)], cwd=self.workdir,
+                                env=env, stdout=log, stderr=subprocess.STDOUT, start_new_session=True)
+
+    def stop(self):
+        for process in (self.healer, self.api):
+            if process is None:
+                continue
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)  # The healer stops its apps on KeyboardInterrupt
+                try:
+                    process.wait(15)
+                except subprocess.TimeoutExpired:
+                    pass
+            try:
+                os.killpg(process.pid, signal.SIGKILL)  # Whatever is left of the session
+            except OSError:
+                pass
+            process.wait()
+        if self.args.keep:
+            print(f"Logs kept in {self.workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+def get_ok(url, timeout=1):
+    try:
+        return requests.get(url, timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+def wait_for(predicate, timeout, what):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return
+        except (requests.RequestException, ValueError, KeyError):
+            pass
+        time.sleep(0.1)
+    raise SystemExit(f"Timed out waiting for {what}")
+
+# ============================================================================
+# OBSERVERS
+# ============================================================================
+
+class HealerEvents:
+    """Collects healer events from the API's SSE stream."""
+
+    def __init__(self, api_url):
+        self.url = api_url + "/api/stream"
+        self.events = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def after(self, since, types, ok=None):
+        """The first event at or after since (time.time()) of one of types."""
+        for event in list(self.events):
+            if event["timestamp"] >= since and event["type"] in types and (ok is None or event["ok"] == ok):
+                return event
+        return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with requests.get(self.url, stream=True, timeout=(2, 30)) as response:
+                    name = None
+                    for line in response.iter_lines():
+                        if self._stop.is_set():
+                            return
+                        if line.startswith(b"event: "):
+                            name = line[7:].decode()
+                        elif line.startswith(b"data: ") and name == "healer":
+                            self.events.append(json.loads(line[6:]))
+                        elif not line:
+                            name = None
+            except requests.RequestException:
+                self._stop.wait(0.5)
+
+class Load:
+    """Client threads hitting the app, a fresh connection per request like independent users."""
+
+    def __init__(self, url, clients):
+        self.url = url
+        self.results = []  # (time.time(), ok, latency_ms)
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._client, daemon=True) for _ in range(clients)]
+
+    def start(self):
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+    def _client(self):
+        while not self._stop.is_set():
+            started = time.time()
+            try:
+                ok = requests.get(self.url, timeout=2).status_code == 200
+            except requests.RequestException:
+                ok = False
+            self.results.append((started, ok, (time.time() - started) * 1000))
+            if not ok:
+                time.sleep(0.05)  # Don't spin on refusals
+
+    def window(self, start, end):
+        return [r for r in self.results if start <= r[0] < end]
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+def error_rate(results):
+    return round(sum(not ok for _, ok, _ in results) / len(results), 4) if results else None
+
+# ============================================================================
+# PHASES
+# ============================================================================
+
+def run_scenario(stack, scenario, events, load):
+    injected = time.time()
+    stop = threading.Event()
+
+    def inject():
+        for _ in range(scenario.repeat):
+            try:
+                requests.get(stack.app_url + scenario.endpoint, timeout=1)
+            except requests.RequestException:
+                pass  # Crashes don't answer, and /freeze can't
+            if stop.wait(scenario.interval):
+                return
+
+    threading.Thread(target=inject, daemon=True).start()
+    deadline = time.monotonic() + scenario.timeout
+    recovered = None
+    while time.monotonic() < deadline:
+        recovered = (events.after(injected, {"restart_finish"}, ok=True)
+                     or events.after(injected, {"worker_recycle"}))
+        if recovered:
+            break
+        time.sleep(0.05)
+    stop.set()
+
+    detected = events.after(injected, DETECTED) or events.after(injected, {"probe"}, ok=False)
+    end = (recovered["timestamp"] if recovered else time.time()) + 1.0
+    results = load.window(injected, end)
+    failures = [at for at, ok, _ in results if not ok]
+    return {
+        "recovered": recovered is not None,
+        "mttd_ms": round((detected["timestamp"] - injected) * 1000, 1) if detected else None,
+        "mttr_ms": round((recovered["timestamp"] - injected) * 1000, 1) if recovered else None,
+        "requests": len(results),
+        "error_rate": error_rate(results),
+        "downtime_ms": round((max(failures) - min(failures)) * 1000, 1) if failures else 0.0,
+    }
+
+def measure_api(url, clients, seconds):
+    """Keep-alive clients (like dashboards polling) hammering /api/status."""
+    latencies, errors = [], [0]
+    stop = threading.Event()
+
+    def client():
+        session = requests.Session()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                ok = session.get(url + "/api/status", timeout=5).status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors[0] += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return {
+        "clients": clients,
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": percentile(latencies, 0.5),
+        "p99_ms": percentile(latencies, 0.99),
+        "errors": errors[0],
+    }
+
+def cpu_seconds(pid):
+    times = psutil.Process(pid).cpu_times()
+    return times.user + times.system
+
+def summarize(runs):
+    """Medians over a scenario's rounds."""
+    def median(key):
+        values = [run[key] for run in runs if run[key] is not None]
+        return round(statistics.median(values), 4) if values else None
+    return {
+        "runs": runs,
+        "recovered": sum(run["recovered"] for run in runs),
+        "mttd_ms": median("mttd_ms"),
+        "mttr_ms": median("mttr_ms"),
+        "error_rate": median("error_rate"),
+        "downtime_ms": median("downtime_ms"),
+    }
+
+# ============================================================================
+# REGRESSIONS
+# ============================================================================
+
+# (key suffix, higher is better, smallest change worth flagging)
+COMPARED = (
+    ("mttd_ms", False, 100),
+    ("mttr_ms", False, 100),
+    ("downtime_ms", False, 100),
+    ("error_rate", False, 0.01),
+    ("p99_ms", False, 5),
+    ("cpu_percent", False, 2),
+    ("requests_per_second", True, 10),
+)
+
+def flatten(report, prefix=""):
+    for key, value in report.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+def regressions(baseline, report, tolerance):
+    old = dict(flatten(baseline))
+    found = []
+    for key, value in flatten(report):
+        rule = next((rule for rule in COMPARED if key.endswith(rule[0])), None)
+        if rule is None or old.get(key) is None:
+            continue
+        _, higher_is_better, floor = rule
+        before = old[key]
+        worse = before - value if higher_is_better else value - before
+        if worse > floor and worse > abs(before) * tolerance:
+            found.append(f"{key}: {before} -> {value}")
+    return found
+
+# ============================================================================
+# MAIN
+# ============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=["hard-crash", "leak", "slow"], choices=list(SCENARIOS))
+    parser.add_argument("--rounds", type=int, default=1, help="Times to run each scenario")
+    parser.add_argument("--clients", type=int, default=4, help="Load clients hitting the app")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Seconds of load before the first scenario")
+    parser.add_argument("--gap", type=float, default=12.0,
+                        help="Seconds of load between scenarios (past config.STABLE_AFTER, so no backoff)")
+    parser.add_argument("--api-clients", type=int, default=8)
+    parser.add_argument("--api-seconds", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=0, help="Serve the app with gunicorn workers")
+    parser.add_argument("--app-port", type=int, default=5080)
+    parser.add_argument("--api-port", type=int, default=5081)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="An earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative change that counts as a regression")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory with the services' logs")
+    args = parser.parse_args()
+
+    stack = Stack(args)
+    events = load = None
+    try:
+        stack.start()
+        events = HealerEvents(stack.api_url)
+        events.start()
+        load = Load(stack.app_url + "/", args.clients)
+
+        started = time.time()
+        cpu_before = {"healer": cpu_seconds(stack.healer.pid), "api": cpu_seconds(stack.api.pid)}
+        load.start()
+        time.sleep(args.warmup)
+
+        scenarios = {}
+        for name in args.scenarios:
+            runs = []
+            for round_ in range(args.rounds):
+                print(f"[{name}] round {round_ + 1}/{args.rounds}", file=sys.stderr)
+                runs.append(run_scenario(stack, SCENARIOS[name], events, load))
+                time.sleep(args.gap)
+            scenarios[name] = summarize(runs)
+
+        load.stop()
+        elapsed = time.time() - started
+        cpu = {name: round(100 * (cpu_seconds(process.pid) - cpu_before[name]) / elapsed, 2)
+               for name, process in (("healer", stack.healer), ("api", stack.api))}
+        api = measure_api(stack.api_url, args.api_clients, args.api_seconds)
+    finally:
+        if events is not None:
+            events.stop()
+        stack.stop()
+
+    probes = [e["duration_ms"] for e in events.events if e["type"] == "probe" and e["duration_ms"] > 0]
+    latencies = [ms for _, ok, ms in load.results if ok]
+    report = {
+        "started": datetime.fromtimestamp(started).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "scenarios": scenarios,
+        "load": {
+            "requests": len(load.results),
+            "requests_per_second": round(len(load.results) / elapsed, 1),
+            "error_rate": error_rate(load.results),
+            "p50_ms": percentile(latencies, 0.5),
+            "p99_ms": percentile(latencies, 0.99),
+        },
+        "probe": {
+            "probes": len(probes),
+            "per_second": round(len(probes) / elapsed, 2),
+            "p50_ms": percentile(probes, 0.5),
+            "p99_ms": percentile(probes, 0.99),
+            "healer_cpu_percent": cpu["healer"],
+            "api_cpu_percent": cpu["api"],
+        },
+        "api": api,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    print(f"\n{'scenario':<12} {'recovered':>9} {'mttd_ms':>9} {'mttr_ms':>9} {'errors_%':>9} {'down_ms':>9}",
+          file=sys.stderr)
+    for name, s in scenarios.items():
+        print(f"{name:<12} {s['recovered']:>5}/{args.rounds:<3} {s['mttd_ms'] or '-':>9} {s['mttr_ms'] or '-':>9} "
+              f"{100 * (s['error_rate'] or 0):>9.1f} {s['downtime_ms'] or 0:>9.0f}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(json.load(f), report, args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print("No regressions against the baseline", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Startup Benchmark
+Starts breakable_app.py repeatedly and reports its boot profile per phase
+(see readiness.py), plus how long the healer waited before it could probe
+the new process: readiness polling vs the old fixed sleeps (2s after the
+first start, 3s after every restart). Each start is done twice: as a cold
+interpreter start, and as a fork of a preloaded zygote (zygote.py).
+
+Usage:
+    python benchmarks/bench_startup.py --starts 10 --port 5055
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from readiness import wait_ready, fetch_marks, profile, PHASES
+from supervisor import Target, start_app, stop_app
+from zygote import Zygote
+
+OLD_RESTART_SLEEP = 3  # Seconds healer.py used to sleep after every restart
+
+def run(target, args):
+    profiles, polls = [], []
+    for _ in range(args.starts):
+        spawned_at = time.time()
+        process = start_app(target)
+        try:
+            result = wait_ready(target.health_url, process, args.timeout)
+            if not result.ok:
+                raise SystemExit(f"App did not come up: {result.reason}")
+            profiles.append(profile(spawned_at, result.ready_at, fetch_marks(target.startup_url)))
+            polls.append(result.polls)
+        finally:
+            stop_app(process)
+    return profiles, polls
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--starts", type=int, default=10)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    target = Target(name="startup", script=os.path.join(BACKEND_DIR, "breakable_app.py"),
+                    port=args.port, hot_spare=False)
+    results = {"cold": run(target, args)}
+    target.zygote = Zygote(target.script)
+    try:
+        results["zygote"] = run(target, args)
+    finally:
+        target.zygote.close()
+
+    print(f"{'phase':<16} {'cold_p50':>9} {'zygote_p50':>11}")
+    for phase in PHASES:
+        row = [statistics.median([p.get(phase, 0.0) for p in profiles]) for profiles, _ in results.values()]
+        print(f"{phase:<16} {row[0]:>9.1f} {row[1]:>11.1f}")
+    totals = [statistics.median([sum(p.values()) for p in profiles]) for profiles, _ in results.values()]
+    print(f"{'total':<16} {totals[0]:>9.1f} {totals[1]:>11.1f}")
+    polls = [statistics.median(polls) for _, polls in results.values()]
+    print(f"{'/health polls':<16} {polls[0]:>9.0f} {polls[1]:>11.0f}")
+    print(f"\ntime to first probe: {totals[0]:.0f}ms cold, {totals[1]:.0f}ms from the zygote, "
+          f"vs a fixed {OLD_RESTART_SLEEP * 1000}ms sleep")
+
+if __name__ == "__main__":
+    main()
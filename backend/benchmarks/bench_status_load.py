@@ -0,0 +1,103 @@
+"""
+Status Load Benchmark
+Hammers /api/status with many concurrent readers while the Mission Control
+health loop runs, and reports how steady the loop's 500 ms cadence stays.
+
+A local stub plays the target app, and the API is served in-process by
+werkzeug's threaded server, just like `python api_server.py`.
+
+Usage:
+    python benchmarks/bench_status_load.py --readers 0 16 64 --duration 10
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from werkzeug.serving import make_server
+
+class TargetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"memory_leaked_mb": 0, "cpu_stress_active": false}' if self.path == "/status" else b"OK"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def reader(url, stop, counter):
+    session = requests.Session()
+    while not stop.is_set():
+        session.get(url, timeout=5)
+        counter.append(1)
+
+def cadence(api_server, since):
+    """Intervals (ms) between consecutive health-loop heartbeats after `since`."""
+    stamps = [
+        datetime.fromisoformat(point["timestamp"]).timestamp()
+        for point in api_server.STATE.current()["heartbeat"]
+    ]
+    stamps = [t for t in stamps if t >= since]
+    return [(b - a) * 1000 for a, b in zip(stamps, stamps[1:])]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, nargs="+", default=[0, 16, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    target = StubServer(("127.0.0.1", 0), TargetHandler)
+    threading.Thread(target=target.serve_forever, daemon=True).start()
+    os.environ["TARGET_APP_URL"] = f"http://127.0.0.1:{target.server_address[1]}"
+
+    import api_server
+    from scheduling import ProbeSchedule
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    # Pin the loop to a fixed 500 ms so cadence reflects contention, not adaptive scheduling
+    api_server.HEALTH_SCHEDULE = ProbeSchedule(base_interval=0.5, max_interval=0.5)
+    api = make_server("127.0.0.1", 0, api_server.app, threaded=True)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    threading.Thread(target=api_server.health_check_loop, daemon=True).start()
+    url = f"http://127.0.0.1:{api.server_port}/api/status"
+
+    print(f"{'readers':>8} {'reads/s':>9} {'cadence_ms':>11} {'p99_ms':>8} {'max_ms':>8}")
+    for count in args.readers:
+        stop = threading.Event()
+        counter = []
+        threads = [threading.Thread(target=reader, args=(url, stop, counter), daemon=True) for _ in range(count)]
+        started = time.time()
+        for t in threads:
+            t.start()
+        time.sleep(args.duration)
+        stop.set()
+        for t in threads:
+            t.join()
+
+        intervals = cadence(api_server, started)
+        print(f"{count:>8} {len(counter) / args.duration:>9.0f} "
+              f"{sum(intervals) / len(intervals):>11.1f} "
+              f"{percentile(intervals, 99):>8.1f} {max(intervals):>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Supervisor Benchmark
+Measures probe-cycle latency as the number of supervised targets grows,
+comparing the concurrent Supervisor against the old serial healer loop.
+
+A stub HTTP server plays every target; a fraction of them hang on /health
+(like SLOW_MODE) so we can see that healthy targets are not held back.
+
+Usage:
+    python benchmarks/bench_supervisor.py --counts 1 10 50 100 200 --hung 0.05
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from monitor import check_health, check_resources
+from supervisor import Supervisor, Target
+
+HANG_SECONDS = 5
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves /<n>/health; paths under /hung/ never answer in time."""
+
+    def do_GET(self):
+        if self.path.startswith("/hung/"):
+            time.sleep(HANG_SECONDS)
+        try:
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The prober gave up on us, which is the point
+
+    def log_message(self, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Default backlog of 5 would turn bursts into SYN retries
+
+def make_targets(count, hung_ratio, port, process):
+    hung_every = int(1 / hung_ratio) if hung_ratio > 0 else 0
+    targets = []
+    for i in range(count):
+        hung = hung_every and i % hung_every == hung_every - 1
+        path = f"/hung/{i}/health" if hung else f"/{i}/health"
+        target = Target(name=f"t{i}", port=port, health_url=f"http://127.0.0.1:{port}{path}")
+        target.process = process
+        targets.append((target, bool(hung)))
+    return targets
+
+def serial_cycle(targets):
+    """What healer.main used to do: check each target one after the other."""
+    started = time.perf_counter()
+    for target, _ in targets:
+        check_health(target.health_url)
+        check_resources(target.process.pid, target.memory_limit_mb)
+    return (time.perf_counter() - started) * 1000
+
+def concurrent_cycle(targets):
+    """Time until every healthy target has been probed once."""
+    supervisor = Supervisor([t for t, _ in targets], dry_run=True, verbose=False)
+    healthy = [t for t, hung in targets if not hung]
+
+    started = time.monotonic()
+    supervisor.tick(now=started)
+    while any(t.last_probe_at < started for t in healthy):
+        time.sleep(0.001)
+    elapsed = (time.monotonic() - started) * 1000
+
+    supervisor.stop()
+    supervisor._pool.shutdown(wait=False, cancel_futures=True)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 50, 100, 200])
+    parser.add_argument("--hung", type=float, default=0.05, help="Fraction of targets that hang")
+    parser.add_argument("--skip-serial", action="store_true", help="Skip the (slow) serial baseline")
+    args = parser.parse_args()
+
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    # One long-lived process stands in for every target's PID
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3600)"])
+
+    print(f"{'targets':>8} {'hung':>5} {'serial_ms':>10} {'concurrent_ms':>14}")
+    try:
+        for count in args.counts:
+            targets = make_targets(count, args.hung, port, process)
+            hung = sum(1 for _, h in targets if h)
+            serial = "-" if args.skip_serial else f"{serial_cycle(targets):.1f}"
+            concurrent = concurrent_cycle(targets)
+            print(f"{count:>8} {hung:>5} {serial:>10} {concurrent:>14.1f}")
+    finally:
+        process.kill()
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Wire Format Benchmark
+Replays --ticks health checks against a dashboard state like a busy one's
+(--targets healer targets with resource samples, a full heartbeat window)
+and reports what one remote dashboard receives per tick, and what the
+server spends serializing it:
+
+Streams (per tick, built once however many subscribers):
+- legacy    /api/status/stream: whole status plus the last 10 heartbeats
+- full      /api/stream before wire.py: whole status plus a heartbeat dict
+- delta     /api/stream now: changed status fields plus a heartbeat row
+
+Polling /api/heartbeat (per request):
+- json      120 point dicts
+- columns   format=columns, one list per column
+- msgpack   format=columns as MessagePack
+each also gzip-compressed, as sent to a client that accepts it.
+
+Usage:
+    python benchmarks/bench_wire.py --ticks 600 --targets 3
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from types import MappingProxyType
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import wire
+from state_store import to_json, freeze
+
+HEARTBEAT_LIMIT = 120
+
+def heartbeat_point(now, up):
+    latency = round(random.uniform(2, 40), 2)
+    return {
+        "timestamp": now.isoformat(),
+        "latency": latency,
+        "actual_latency": latency,
+        "memory_mb": round(random.uniform(40, 60), 1),
+        "cpu_percent": round(random.uniform(0, 30), 1),
+        "status": "up" if up else "down",
+        "event_spike": False,
+    }
+
+def healer_target(pid):
+    return freeze({
+        "pid": pid, "updated": time.time(), "ok": True, "probe_ms": 3.2, "reason": "OK",
+        "memory_mb": 52.1, "leak_mb_per_s": 0.0, "leak_eta_s": None, "restarts": 2,
+        "ready": True, "startup_ms": 412.0, "ready_ms": 530.2,
+        "startup": freeze({"interpreter": 40.1, "imports": 210.4, "app": 161.5}),
+        "resources": freeze({"cpu_percent": 3.0, "rss_mb": 61.2, "uss_mb": 48.0, "threads": 9,
+                             "fds": 24, "read_mb": 0.0, "write_mb": 1.2, "children": 0}),
+        "sampled_at": time.time(),
+    })
+
+def replay(ticks, targets):
+    """Yields (status, heartbeat window, new point) per tick."""
+    now = datetime(2026, 1, 1)
+    healer = {f"app-{i}": healer_target(1000 + i) for i in range(targets)}
+    status = {
+        "status": "HEALTHY", "last_check": None, "uptime_start": now.isoformat(),
+        "total_crashes": 4, "total_events": 12, "last_crash": now.isoformat(), "last_heal": now.isoformat(),
+        "last_event": "Memory leak", "latency_ms": 0, "memory_mb": 0, "cpu_percent": 0,
+        "healer": freeze(healer),
+    }
+    window = [heartbeat_point(now - timedelta(seconds=HEARTBEAT_LIMIT - i), True) for i in range(HEARTBEAT_LIMIT)]
+    for tick in range(ticks):
+        now += timedelta(milliseconds=500)
+        point = heartbeat_point(now, True)
+        window = (window + [point])[-HEARTBEAT_LIMIT:]
+        # A sample from one target every tick, a probe result every few
+        name = f"app-{tick % targets}"
+        target = dict(healer[name])
+        target["resources"] = freeze({**target["resources"], "cpu_percent": round(random.uniform(0, 30), 1),
+                                      "rss_mb": round(random.uniform(55, 65), 1)})
+        target["sampled_at"] = time.time()
+        if tick % 4 == 0:
+            target["probe_ms"] = round(random.uniform(1, 9), 2)
+            target["updated"] = time.time()
+        healer[name] = freeze(target)
+        status = {**status, "last_check": now.isoformat(), "latency_ms": point["latency"],
+                  "memory_mb": point["memory_mb"], "cpu_percent": point["cpu_percent"],
+                  "healer": freeze(healer)}
+        yield MappingProxyType(status), window, point
+
+def measure(ticks, targets, encode):
+    """Mean bytes and microseconds of encode(previous status, status, window, point) per tick."""
+    total_bytes, total_s = 0, 0.0
+    previous = None
+    for status, window, point in replay(ticks, targets):
+        started = time.perf_counter()
+        body = encode(previous or status, status, window, point)
+        total_s += time.perf_counter() - started
+        total_bytes += len(body)
+        previous = status
+    return total_bytes / ticks, total_s / ticks * 1e6
+
+def gzipped(encode):
+    return lambda *state: wire.compress(encode(*state), "gzip")[0]
+
+STREAMS = {
+    "legacy": lambda old, status, window, point:
+        b"data: %s\n\n" % to_json({**status, "heartbeat": window[-10:]}),
+    "full": lambda old, status, window, point:
+        b"id: 1\nevent: heartbeat\ndata: %s\n\nid: 2\nevent: status\ndata: %s\n\n"
+        % (to_json(point), to_json(status)),
+    "delta": lambda old, status, window, point:
+        b"id: 1\nevent: heartbeat\ndata: %s\n\nid: 2\nevent: status\ndata: %s\n\n"
+        % (to_json(wire.heartbeat_row(point)), to_json(wire.diff(old, status))),
+}
+
+POLLS = {
+    "json": lambda old, status, window, point: to_json(window),
+    "columns": lambda old, status, window, point: to_json(wire.heartbeat_columns(window)),
+}
+if wire.msgpack_installed():
+    POLLS["msgpack"] = lambda old, status, window, point: wire.pack(wire.heartbeat_columns(window))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--targets", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"ticks: {args.ticks}, healer targets: {args.targets}")
+    print(f"{'stream':<10} {'bytes/tick':>10} {'us/tick':>8}")
+    for name, encode in STREAMS.items():
+        size, us = measure(args.ticks, args.targets, encode)
+        print(f"{name:<10} {size:>10.0f} {us:>8.1f}")
+
+    print()
+    print(f"{'poll':<10} {'bytes':>10} {'us':>8} {'gzip_bytes':>10} {'gzip_us':>8}")
+    for name, encode in POLLS.items():
+        size, us = measure(args.ticks, args.targets, encode)
+        gzip_size, gzip_us = measure(args.ticks, args.targets, gzipped(encode))
+        print(f"{name:<10} {size:>10.0f} {us:>8.1f} {gzip_size:>10.0f} {gzip_us:>8.1f}")
+
+if __name__ == "__main__":
+    main()
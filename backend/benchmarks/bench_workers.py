@@ -0,0 +1,127 @@
+"""
+Worker Recycling Load Benchmark
+Drives steady client load at a supervised breakable_app, makes one process
+leak past its memory limit (/leak-massive), and compares throughput and
+errors while the healer deals with it:
+
+- cold:      one process, stop/start restart
+- hot-spare: one process, handed over to a parked standby
+- gunicorn:  --workers N, only the leaking worker is recycled
+
+"during heal" runs from the leak to --after seconds past the heal, so it
+covers detection, the restart itself and the replacement warming up.
+
+Usage:
+    python benchmarks/bench_workers.py --workers 4 --clients 8 --port 5055
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import requests
+from supervisor import Supervisor, Target
+from scheduling import ProbeSchedule
+
+def client(url, stop, results):
+    """Fresh connection per request, like independent users hitting the app."""
+    while not stop.is_set():
+        try:
+            ok = requests.get(url, timeout=5).status_code == 200
+        except requests.RequestException:
+            ok = False
+        results.append((time.monotonic(), ok))
+        if not ok:
+            time.sleep(0.01)  # Don't spin on refusals
+
+def wait_for(predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+def window(results, start, end):
+    """(requests per second, failed, failed %) for results within [start, end)."""
+    outcomes = [ok for at, ok in results if start <= at < end]
+    failed = outcomes.count(False)
+    return len(outcomes) / max(end - start, 1e-9), failed, 100 * failed / max(len(outcomes), 1)
+
+def run(workers, hot_spare, args):
+    target = Target(name="load", script=os.path.join(BACKEND_DIR, "breakable_app.py"), port=args.port,
+                    memory_limit_mb=args.limit, workers=workers, hot_spare=hot_spare,
+                    # Probe at a fixed pace so every mode notices the leak equally fast
+                    schedule=ProbeSchedule(args.interval, max_interval=args.interval,
+                                           memory_limit_mb=args.limit))
+    supervisor = Supervisor([target], verbose=False)
+    threading.Thread(target=supervisor.run_forever, daemon=True).start()
+
+    base = f"http://127.0.0.1:{args.port}"
+    results = []
+    stop = threading.Event()
+    try:
+        if not wait_for(lambda: target.ready and (not hot_spare or target.standby is not None), 30):
+            raise SystemExit("App did not come up")
+        clients = [threading.Thread(target=client, args=(base + "/", stop, results), daemon=True)
+                   for _ in range(args.clients)]
+        started = time.monotonic()
+        for t in clients:
+            t.start()
+
+        time.sleep(args.before)
+        leaked_at = time.monotonic()
+        try:
+            requests.get(base + "/leak-massive", timeout=10)
+        except requests.RequestException:
+            pass  # The healer may get to it before it has answered
+        if not wait_for(lambda: target.restarts + target.workers_recycled > 0, 30):
+            raise SystemExit("The leak was never healed")
+        healed_at = time.monotonic()
+        time.sleep(args.after)
+
+        stop.set()
+        for t in clients:
+            t.join()
+        finished = time.monotonic()
+    finally:
+        supervisor.shutdown()
+
+    return {
+        "heal_ms": (healed_at - leaked_at) * 1000,
+        "overall": window(results, started, finished),
+        "healing": window(results, leaked_at, healed_at + args.after),
+        "restarts": target.restarts,
+        "recycled": target.workers_recycled,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--limit", type=float, default=80, help="Memory limit per process (MB)")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between probes")
+    parser.add_argument("--before", type=float, default=3.0, help="Seconds of load before the leak")
+    parser.add_argument("--after", type=float, default=3.0, help="Seconds of load after the heal")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print(f"{'mode':<10} {'req/s':>7} {'failed':>7} {'req/s_heal':>11} {'failed_heal':>12} "
+          f"{'failed_heal_%':>14} {'heal_ms':>8} {'restarts':>9} {'recycled':>9}")
+    for name, workers, hot_spare in (("cold", 0, False), ("hot-spare", 0, True),
+                                     ("gunicorn", args.workers, False)):
+        r = run(workers, hot_spare, args)
+        rps, failed, _ = r["overall"]
+        heal_rps, heal_failed, heal_pct = r["healing"]
+        print(f"{name:<10} {rps:>7.0f} {failed:>7} {heal_rps:>11.0f} {heal_failed:>12} "
+              f"{heal_pct:>14.1f} {r['heal_ms']:>8.0f} {r['restarts']:>9} {r['recycled']:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -2,22 +2,38 @@
 Breakable App - A deliberately vulnerable Flask application
 This app has various endpoints that simulate different types of failures
 for testing self-healing systems.
+
+Runs on its own (main) or under gunicorn as breakable_app:app (workers.py),
+where every chaos endpoint hits just the one worker that served it.
+
+Embeds the healer's watchdog (watchdog.py): a heartbeat and the requests in
+flight, in shared memory, so hangs are seen without an HTTP probe.
 """
 
 import os
 import sys
 import time
+
+# Boot phase marks (epoch seconds), served by /startup for the healer's cold-start profile
+STARTUP = {"script": time.time()}
+
 import signal
 import threading
-import multiprocessing
 from flask import Flask, Response, jsonify
 from flask_cors import CORS
+from werkzeug.serving import WSGIRequestHandler, make_server
+import watchdog
+STARTUP["imports"] = time.time()
+
+# Speak HTTP/1.1 so health probes can keep their connections alive
+WSGIRequestHandler.protocol_version = "HTTP/1.1"
 
 app = Flask(__name__)
 CORS(app, origins=[
     os.environ.get("FRONTEND_URL", "http://localhost:3000"),
     "http://localhost:3000",
 ])
+app.wsgi_app = watchdog.middleware(app.wsgi_app)
 
 # Global state for chaos
 LEAKY_BUCKET = []
@@ -42,6 +58,7 @@ def home():
             <li><a href="/slow" style="color: #f59e0b;">/slow</a> - Slow response mode</li>
             <li><a href="/error" style="color: #f97316;">/error</a> - HTTP 500</li>
             <li><a href="/timeout" style="color: #f97316;">/timeout</a> - Request timeout</li>
+            <li><a href="/freeze" style="color: #f97316;">/freeze</a> - Regex backtracking (freezes every thread)</li>
         </ul>
     </body>
     </html>
@@ -181,6 +198,15 @@ def timeout():
     time.sleep(30)
     return jsonify({"status": "finally_responded"})
 
+@app.route('/freeze')
+def freeze():
+    """Catastrophic regex backtracking: holds the GIL for seconds, so every thread stalls"""
+    import re
+    print("[FREEZE] Backtracking...")
+    started = time.time()
+    re.match(r"(a+)+$", "a" * 27 + "b")  # Doubles with every extra "a"
+    return jsonify({"status": "thawed", "frozen_s": round(time.time() - started, 2)})
+
 @app.route('/slow')
 def slow():
     """Toggle slow mode - makes health checks take 5 seconds"""
@@ -198,18 +224,67 @@ def status():
         "pid": os.getpid()
     })
 
+@app.route('/startup')
+def startup():
+    """When each boot phase finished (see readiness.py)"""
+    return jsonify(STARTUP)
+
+STARTUP["routes"] = time.time()
+
+# Under gunicorn this runs in the master, and each worker starts its own after fork
+watchdog.start()
+
 # =============================================================================
 # STARTUP
 # =============================================================================
 
-if __name__ == "__main__":
+def wait_for_promotion():
+    """
+    Hot-spare mode: everything is imported and the server is built, but we
+    don't accept connections until the healer sends SIGUSR1.
+    """
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGUSR1})
+    ready_fd = int(os.environ["AXOLOT_READY_FD"])
+    try:
+        os.write(ready_fd, b"ready")
+    except BrokenPipeError:
+        sys.exit(0)  # The healer stopped waiting for us
+    os.close(ready_fd)
+    print(f"  Standby ready (PID: {os.getpid()}), waiting to be promoted...")
+    signal.sigwait({signal.SIGUSR1})
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGUSR1})
+
+def main():
+    """Serves the app. Also the entry point for children of the zygote (zygote.py)."""
+    watchdog.start()  # A zygote's child only gets the healer's settings now
+    # Get port from environment or default to 5000
+    port = int(os.environ.get("PORT", 5000))
+    listen_fd = os.environ.get("AXOLOT_LISTEN_FD")
+
+    if listen_fd is None:
+        server = None
+    else:
+        # The healer owns the listening socket; serving from it means a restart
+        # never closes the port, so new connections wait in the backlog instead
+        # of being refused
+        server = make_server("0.0.0.0", port, app, threaded=True, fd=int(listen_fd))
+        STARTUP["bind"] = time.time()
+        if os.environ.get("AXOLOT_STANDBY") == "1":
+            wait_for_promotion()
+            STARTUP["promoted"] = time.time()
+
     print("=" * 50)
     print("  BREAKABLE APP - Chaos Engineering Target")
     print("=" * 50)
     print(f"  PID: {os.getpid()}")
-    print("  Port: 5000")
+    print(f"  Port: {port}")
     print("  Ready to be destroyed!")
     print("=" * 50)
-    # Get port from environment or default to 5000
-    port = int(os.environ.get("PORT", 5000))
-    app.run(host="0.0.0.0", port=port, threaded=True, use_reloader=False)
+    if server is None:
+        STARTUP["bind"] = time.time()  # app.run binds right away
+        app.run(host="0.0.0.0", port=port, threaded=True, use_reloader=False)
+    else:
+        server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Broadcaster - Sequenced event ring for Server-Sent Events
+Every published event gets a monotonic sequence number and is serialized
+to JSON exactly once. Subscribers keep their own cursor (the last sequence
+they saw) and are handed the pre-built frames, so the cost of an event is
+independent of how many dashboards are listening.
+
+Cursors double as SSE ids, which lets reconnecting clients resume with
+Last-Event-ID. A cursor that has fallen out of the ring is reported so the
+caller can send a fresh snapshot (see state_store.py) instead.
+
+Threads block in wait(); an asyncio server registers a listener instead
+(add_listener) and wakes all of its subscribers on its own loop.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from collections.abc import Mapping
+from itertools import islice
+
+def _jsonable(value):
+    # Frozen mappings (types.MappingProxyType) from the state store
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class EventLog:
+    """Bounded, thread-safe ring of serialized events keyed by sequence number."""
+
+    def __init__(self, capacity=2048):
+        self._ring = deque(maxlen=capacity)  # (seq, event, frame, data_frame)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._listeners = []  # Called after every publish, from the publishing thread
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def publish(self, event, payload):
+        """Serializes payload once and wakes every waiting subscriber. Returns its seq."""
+        return self.publish_many([(event, payload)])
+
+    def publish_many(self, items, on_commit=None):
+        """
+        Publishes several (event, payload) pairs as one batch. on_commit(seq) runs
+        under the ring's lock before subscribers are woken, so state swapped in
+        there is visible to anyone who sees these events. Returns the last seq.
+        """
+        encoded = [(event.encode(), json.dumps(payload, default=_jsonable).encode()) for event, payload in items]
+        with self._cond:
+            for event, data in encoded:
+                self._seq += 1
+                seq = self._seq
+                frame = b"id: %d\nevent: %s\ndata: %s\n\n" % (seq, event, data)
+                # Unnamed variant for plain EventSource.onmessage consumers
+                data_frame = b"id: %d\ndata: %s\n\n" % (seq, data)
+                self._ring.append((seq, event.decode(), frame, data_frame))
+            if on_commit is not None:
+                on_commit(self._seq)
+            self._cond.notify_all()
+        for listener in tuple(self._listeners):
+            listener()
+        return self._seq
+
+    def add_listener(self, callback):
+        """callback() runs after every publish, in the publisher's thread: keep it quick."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def covers(self, cursor):
+        """True if every event after cursor is still in the ring."""
+        with self._cond:
+            if cursor > self._seq:
+                return False  # From a previous server run
+            first = self._ring[0][0] if self._ring else self._seq + 1
+            return cursor >= first - 1
+
+    def read_since(self, cursor, events=None, named=True):
+        """Returns (frames, new_cursor) for everything published after cursor."""
+        with self._cond:
+            return self._read(cursor, events, named)
+
+    def wait(self, cursor, timeout=None, events=None, named=True):
+        """Blocks until a matching event newer than cursor is published (or timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                frames, cursor = self._read(cursor, events, named)
+                if frames:
+                    return frames, cursor
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return frames, cursor
+                self._cond.wait(remaining)
+
+    def _read(self, cursor, events, named):
+        if cursor >= self._seq:
+            return [], cursor
+        first = self._ring[0][0]
+        start = max(cursor + 1 - first, 0)
+        index = 2 if named else 3
+        frames = [
+            record[index] for record in islice(self._ring, start, None)
+            if events is None or record[1] in events
+        ]
+        return frames, self._seq
@@ -0,0 +1,301 @@
+"""
+Cgroups - Kernel-enforced limits and accounting for supervised apps (Linux, cgroup v2)
+Polling RSS finds a memory blowup after the fact, only in the processes
+psutil can still walk to, and does nothing about a /cpu-burn starving the
+host. With CGROUPS on, every app process the healer starts (and its
+standby) runs in a cgroup of its own, right under the healer's:
+
+    <healer's cgroup>/
+        healer/               the healer itself, if it had to move out of the way
+        axolot-<healer pid>/
+            <target>-<pid>/   one per process the healer starts, for as long as it runs
+
+A gunicorn master (a workers target) is one of those processes, and the
+workers it forks share its group.
+
+- the kernel enforces the limits: memory.high (reclaim and throttle) and
+  memory.max (OOM kill) at CGROUP_MEMORY_HIGH / CGROUP_MEMORY_MAX times the
+  target's memory limit, and cpu.max at CGROUP_CPU_MAX_PERCENT of one core.
+  Both are per serving process: a workers target's group gets them times
+  its number of workers, so the pool still has a core per worker. The
+  healer's own restart at the memory limit still comes first; these are
+  the backstops for what happens between two probes
+- the kernel does the accounting, for every process in the group however it
+  got there (forks, daemonized grandchildren): memory.stat, cpu.stat and
+  memory.events (oom_kill) are one pread() each, of a file kept open, in
+  place of walking the tree. Memory is memory.stat's anon, not
+  memory.current: that also counts page cache the kernel can drop, and an
+  app that reads files would look like it leaks
+- a stopped app's leftovers are killed with cgroup.kill, not hunted down
+
+A group is created per process rather than per target: v2 never moves a
+process' memory charges with it, so a promoted standby keeps its own group
+and its numbers stay right. Processes are moved in right after spawn,
+before they have had time to fork.
+
+When there is no cgroup v2 hierarchy, no write access to it, or a controller
+is missing (a hybrid v1/v2 host, say), the healer falls back to psutil for
+whatever the groups can't give it. Cgroups() raises OSError or RuntimeError
+for the first two; Cgroups.controllers says which limits are enforced.
+"""
+
+import os
+import sys
+import time
+import errno
+import signal
+import threading
+
+import config
+
+CONTROLLERS = ("memory", "cpu")
+MB = 1024 * 1024
+READ_SIZE = 16384  # Enough for memory.stat, the longest file we read
+EMPTY_TIMEOUT = 1.0  # Seconds for a killed group's processes to be gone
+
+def _mount_point():
+    """Where the cgroup v2 hierarchy is mounted, or None."""
+    with open("/proc/self/mounts", "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) > 2 and fields[2] == "cgroup2":
+                return fields[1]
+    return None
+
+def _own_group():
+    """The healer's v2 cgroup, relative to the mount point."""
+    with open("/proc/self/cgroup", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("0::"):
+                return line[3:].strip().lstrip("/")
+    return ""
+
+def _write(path, name, value):
+    with open(os.path.join(path, name), "w", encoding="utf-8") as f:
+        f.write(value)
+
+def _read(path, name):
+    with open(os.path.join(path, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+def _keyed(text):
+    """A flat-keyed cgroup file ("key value" lines) as {key: int}."""
+    pairs = (line.split() for line in text.splitlines())
+    return {pair[0]: int(pair[1]) for pair in pairs if len(pair) == 2}
+
+# ============================================================================
+# ONE GROUP
+# ============================================================================
+
+class Cgroup:
+    """One app process' cgroup: its limits, and what the kernel counts for everything in it."""
+
+    def __init__(self, path, controllers):
+        self.path = path
+        self.controllers = controllers
+        self._fds = {}  # File name -> fd kept open, re-read with pread()
+        self._cpu = None  # (time.monotonic(), usage_usec) at the last cpu_percent()
+
+    def _read(self, name):
+        """One read of a cgroup file. None if this group doesn't have it."""
+        fd = self._fds.get(name)
+        try:
+            if fd is None:
+                fd = self._fds[name] = os.open(os.path.join(self.path, name), os.O_RDONLY)
+            return os.pread(fd, READ_SIZE, 0).decode("ascii")
+        except FileNotFoundError:
+            return None
+
+    def add(self, pid):
+        _write(self.path, "cgroup.procs", str(pid))
+
+    def limit(self, memory_limit_mb, processes=1):
+        """
+        Sets memory.high, memory.max and cpu.max, for the controllers we have.
+        memory_limit_mb is per serving process, and there are processes of them.
+        """
+        if "memory" in self.controllers:
+            memory = memory_limit_mb * processes * MB
+            _write(self.path, "memory.high", str(int(memory * config.CGROUP_MEMORY_HIGH)))
+            _write(self.path, "memory.max", str(int(memory * config.CGROUP_MEMORY_MAX)))
+        if "cpu" in self.controllers and config.CGROUP_CPU_MAX_PERCENT:
+            period = config.CGROUP_CPU_PERIOD_US
+            quota = int(period * config.CGROUP_CPU_MAX_PERCENT / 100 * processes)
+            _write(self.path, "cpu.max", f"{quota} {period}")
+
+    def memory_mb(self):
+        """
+        Anonymous memory of the whole group (memory.stat's anon: heaps and
+        stacks, no page cache), or None without the memory controller.
+        """
+        anon = _keyed(self._read("memory.stat") or "").get("anon")
+        return anon / MB if anon is not None else None
+
+    def charged_mb(self):
+        """memory.current: everything charged to the group, page cache included."""
+        text = self._read("memory.current")
+        return int(text) / MB if text else None
+
+    def cpu_stat(self):
+        """cpu.stat: usage_usec always; nr_throttled, throttled_usec with the cpu controller."""
+        return _keyed(self._read("cpu.stat") or "")
+
+    def memory_events(self):
+        """memory.events: how often the group hit memory.high (high) and memory.max (max, oom_kill)."""
+        return _keyed(self._read("memory.events") or "")
+
+    def oom_kills(self):
+        return self.memory_events().get("oom_kill", 0)
+
+    def cpu_percent(self, now=None):
+        """CPU of the whole group since the previous call (100 = one core). None the first time."""
+        now = time.monotonic() if now is None else now
+        usage = self.cpu_stat().get("usage_usec")
+        if usage is None:
+            return None
+        previous, self._cpu = self._cpu, (now, usage)
+        if previous is None or now <= previous[0]:
+            return None
+        return (usage - previous[1]) / 1e6 / (now - previous[0]) * 100
+
+    def populated(self):
+        return "populated 1" in (self._read("cgroup.events") or "")
+
+    def describe(self):
+        """Limits and counters, for the control plane."""
+        cpu, events = self.cpu_stat(), self.memory_events()
+        memory_mb, charged_mb = self.memory_mb(), self.charged_mb()
+        return {
+            "path": self.path,
+            "controllers": sorted(self.controllers),
+            "memory_mb": round(memory_mb, 2) if memory_mb is not None else None,
+            "charged_mb": round(charged_mb, 2) if charged_mb is not None else None,
+            "memory_high_events": events.get("high"),
+            "memory_max_events": events.get("max"),
+            "oom_kills": events.get("oom_kill"),
+            "cpu_s": round(cpu.get("usage_usec", 0) / 1e6, 2),
+            "cpu_throttled": cpu.get("nr_throttled"),
+            "cpu_throttled_ms": round(cpu["throttled_usec"] / 1000, 1) if "throttled_usec" in cpu else None,
+        }
+
+    def kill(self):
+        """SIGKILLs everything left in the group."""
+        try:
+            _write(self.path, "cgroup.kill", "1")  # Linux 5.14+
+            return
+        except FileNotFoundError:
+            pass
+        for pid in _read(self.path, "cgroup.procs").split():
+            try:
+                os.kill(int(pid), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def remove(self):
+        """Kills whatever is left in the group and removes it."""
+        if self.populated():
+            self.kill()
+            deadline = time.monotonic() + EMPTY_TIMEOUT
+            while self.populated() and time.monotonic() < deadline:
+                time.sleep(0.01)
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+        os.rmdir(self.path)
+
+# ============================================================================
+# THE HEALER'S SUBTREE
+# ============================================================================
+
+class Cgroups:
+    """The healer's cgroup subtree, with one group per app process in it."""
+
+    def __init__(self, base=None):
+        if not sys.platform.startswith("linux"):
+            raise RuntimeError("cgroups are Linux only")
+        mount = _mount_point()
+        if mount is None:
+            raise RuntimeError("no cgroup v2 hierarchy is mounted")
+        base = base or os.path.join(mount, _own_group())
+        self.path = os.path.join(base, f"axolot-{os.getpid()}")
+        os.makedirs(self.path, exist_ok=True)  # PermissionError if it isn't ours to write
+        self.controllers = self._delegate(base, mount)
+        self.groups = {}  # pid -> Cgroup
+        self._lock = threading.Lock()
+
+    def _delegate(self, base, mount):
+        """Enables the memory and cpu controllers down to our groups. Returns the ones we got."""
+        wanted = [name for name in CONTROLLERS if name in _read(base, "cgroup.controllers").split()]
+        if not wanted:
+            return set()
+        enable = " ".join(f"+{name}" for name in wanted)
+        try:
+            _write(base, "cgroup.subtree_control", enable)
+        except OSError as e:
+            if e.errno != errno.EBUSY or os.path.samefile(base, mount):
+                return set()
+            # No internal processes: a group that has processes of its own can't hand
+            # controllers down, so the healer moves into a leaf next to our subtree first
+            leaf = os.path.join(base, "healer")
+            os.makedirs(leaf, exist_ok=True)
+            _write(leaf, "cgroup.procs", str(os.getpid()))
+            try:
+                _write(base, "cgroup.subtree_control", enable)
+            except OSError:
+                return set()  # Other processes share it: accounting only
+        try:
+            _write(self.path, "cgroup.subtree_control", enable)
+        except OSError:
+            return set()
+        return set(wanted)
+
+    def place(self, pid, name, memory_limit_mb, processes=1):
+        """
+        Moves a just-started process into a new group of its own, with limits
+        for that many serving processes (see Cgroup.limit). Returns the Cgroup.
+        """
+        path = os.path.join(self.path, f"{name}-{pid}")
+        os.mkdir(path)
+        group = Cgroup(path, self.controllers)
+        try:
+            group.limit(memory_limit_mb, processes)
+            group.add(pid)
+        except OSError:
+            os.rmdir(path)
+            raise
+        with self._lock:
+            self.groups[pid] = group
+        return group
+
+    def get(self, pid):
+        return self.groups.get(pid)
+
+    def release(self, pid):
+        """Done with a process' group: kills what's left in it and removes it."""
+        with self._lock:
+            group = self.groups.pop(pid, None)
+        if group is not None:
+            try:
+                group.remove()
+            except OSError:
+                pass  # Still busy; close() tries again
+
+    def close(self):
+        """Removes every group, then our subtree."""
+        with self._lock:
+            groups, self.groups = list(self.groups.values()), {}
+        for group in groups:
+            try:
+                group.remove()
+            except OSError:
+                pass
+        for entry in os.scandir(self.path):
+            if entry.is_dir():
+                try:
+                    Cgroup(entry.path, self.controllers).remove()
+                except OSError:
+                    pass
+        try:
+            os.rmdir(self.path)
+        except OSError:
+            pass
@@ -16,5 +16,122 @@ CHECK_INTERVAL = 3  # Seconds between checks
 MEMORY_THRESHOLD_MB = 100  # Restart if memory usage exceeds this
 MAX_RETRIES = 3 # Max retries for health check before declaring failure
 
+# Adaptive probing (see scheduling.py): stable targets are probed less and
+# less often, up to MAX_CHECK_INTERVAL; anything suspicious switches to
+# BURST_INTERVAL until the target looks clean again.
+MAX_CHECK_INTERVAL = 30  # Seconds
+BURST_INTERVAL = 0.25  # Seconds
+
+# Leak prediction (see leak_detector.py): when memory is projected to reach
+# the limit within LEAK_RESTART_HORIZON seconds, restart the app proactively,
+# LEAK_RESTART_MARGIN seconds before the projected breach.
+LEAK_RESTART_HORIZON = 60
+LEAK_RESTART_MARGIN = 15
+
+# Resource sampling (see sampler.py): every SAMPLE_INTERVAL the healer
+# samples each app's process tree (CPU, RSS/USS, threads, fds, I/O). A
+# process using CPU_LIMIT_PERCENT of a core or more for CPU_SUSTAIN_SECONDS
+# is healed (a gunicorn worker is recycled, anything else restarted).
+SAMPLE_INTERVAL = 1  # Seconds
+SAMPLE_USS = True  # USS reads the memory maps; turn off on huge processes
+CPU_LIMIT_PERCENT = 90  # Of one core
+CPU_SUSTAIN_SECONDS = 15
+
+# Watchdog (see watchdog.py): apps that embed it publish a heartbeat and
+# their in-flight requests in a shared-memory file the healer reads every
+# WATCHDOG_POLL, with no HTTP involved. A heartbeat that stays the same for
+# WATCHDOG_STALL_POLLS reads and is later than WATCHDOG_STALL_FACTOR times
+# the app's slowest recent gap between beats (and WATCHDOG_STALL) is a
+# stall: 50-100ms for an idle app, more for one whose beats GIL contention
+# already delays. A request in flight WATCHDOG_STALL is one too. Stacks are
+# captured at once. A stalled interpreter that lasts WATCHDOG_HANG_AFTER is
+# a hang, and is healed; a slow request only after
+# WATCHDOG_REQUEST_HANG_AFTER, since one slow request is not a broken app.
+# Set AXOLOT_WATCHDOG=0 to disable.
+WATCHDOG = os.environ.get("AXOLOT_WATCHDOG", "1") == "1"
+WATCHDOG_INTERVAL = 0.01  # Seconds between the app's heartbeats
+WATCHDOG_POLL = 0.02  # Seconds between the healer's reads
+WATCHDOG_STALL = 0.05  # Seconds; at least this late, for a heartbeat
+WATCHDOG_STALL_FACTOR = 3  # A heartbeat: times the slowest gap between beats the app saw lately
+WATCHDOG_STALL_POLLS = 2
+WATCHDOG_HANG_AFTER = 2.0  # Seconds
+WATCHDOG_REQUEST_HANG_AFTER = 30.0  # Seconds
+HANG_REPORT_DIR = os.environ.get("AXOLOT_HANG_REPORTS", "hang_reports")  # Stacks saved for every hang
+
+# Metrics (see metrics.py): with METRICS_PORT set, the healer serves its own
+# Prometheus/OpenMetrics endpoint at http://<host>:METRICS_PORT/metrics.
+# Mission Control always serves /metrics on its own port.
+METRICS_PORT = int(os.environ.get("AXOLOT_METRICS_PORT", 0))
+
+# Readiness (see readiness.py): a started or restarted app gets this long to
+# answer /health for the first time before it counts as failed. Polling
+# starts a few milliseconds after spawn, so fast apps are not kept waiting.
+STARTUP_TIMEOUT = 30  # Seconds
+
+# Hot-spare restarts (POSIX only): the healer holds each app's listening
+# socket and keeps a loaded standby copy parked on it, so a heal is a
+# handover rather than a stop/start. Set AXOLOT_HOT_SPARE=0 to disable.
+HOT_SPARE = os.environ.get("AXOLOT_HOT_SPARE", "1") == "1"
+
+# Recovery policy (see recovery_policy.py): restarts are budgeted, repeated
+# quick failures back off exponentially, and a target that keeps failing
+# is quarantined (not restarted) for a while instead of looping forever.
+RESTART_BUDGET = 10  # Restarts...
+RESTART_BUDGET_WINDOW = 60  # ...per this many seconds (token bucket)
+BACKOFF_BASE = 0.5  # Seconds; doubles with every failure in a streak
+BACKOFF_MAX = 30
+STABLE_AFTER = 10  # A run that lasts this long (seconds) ends a failure streak
+CRASH_LOOP_LIMIT = 3  # Same exit code at boot this many times = crash loop
+QUARANTINE_SECONDS = 300  # Before a probation restart; doubles if that fails too
+QUARANTINE_MAX_SECONDS = 3600
+
+# Multi-worker serving (see workers.py, POSIX only): with WORKERS > 0 each
+# app runs under gunicorn with that many pre-forked workers, and a worker
+# that leaks or hangs is recycled on its own instead of restarting the app.
+WORKERS = int(os.environ.get("AXOLOT_WORKERS", 0))
+WORKER_HUNG_AFTER = 10  # Seconds on one request before a worker counts as hung
+WORKER_STOP_TIMEOUT = 5  # Seconds a recycled worker gets to finish up before SIGKILL
+WORKER_TIMEOUT = 30  # gunicorn's own --timeout: the backstop if the healer is down
+
+# Fork server (see zygote.py, POSIX only): each app script is imported once
+# by a zygote process and every (re)start is a fork() of it, skipping
+# interpreter startup and imports. Set AXOLOT_FORK_SERVER=0 to disable.
+FORK_SERVER = os.environ.get("AXOLOT_FORK_SERVER", "1") == "1"
+# Log which imports each app's cold start spends its time on (python -X importtime)
+IMPORT_PROFILE = os.environ.get("AXOLOT_IMPORT_PROFILE") == "1"
+
+# cgroup v2 (see cgroups.py, Linux only): with AXOLOT_CGROUPS=1 every app
+# process runs in a cgroup of its own, where the kernel enforces its limits
+# and accounts for every process in it. memory.high (reclaim, throttle) and
+# memory.max (OOM kill) are these multiples of the target's memory limit, so
+# the healer's own restart at the limit still comes first; cpu.max caps each
+# app at CGROUP_CPU_MAX_PERCENT of one core (0 = no cap). A workers target
+# gets both times its number of workers, which share one group. Without cgroup v2
+# (or write access to it) the healer falls back to psutil.
+CGROUPS = os.environ.get("AXOLOT_CGROUPS") == "1"
+CGROUP_ROOT = os.environ.get("AXOLOT_CGROUP_ROOT")  # A delegated cgroup to use instead of the healer's own
+CGROUP_MEMORY_HIGH = 1.2
+CGROUP_MEMORY_MAX = 1.5
+CGROUP_CPU_MAX_PERCENT = 100  # Of one core
+CGROUP_CPU_PERIOD_US = 100000
+
 # Endpoints to monitor
 HEALTH_ENDPOINT = f"{APP_URL}/health"
+
+# Supervised Targets
+# Point AXOLOT_TARGETS at a JSON file with a list of targets to supervise
+# several apps from one healer, e.g.
+#   [{"name": "api", "script": "breakable_app.py", "port": 5000, "memory_limit_mb": 100}]
+# When unset, the healer supervises the single app described above.
+TARGETS_FILE = os.environ.get("AXOLOT_TARGETS")
+
+# Control plane (see control.py): with CONTROL_PORT set, the healer serves a
+# small JSON API on localhost to list its targets' live state, add and remove
+# targets, pause and resume healing, and change settings without a restart.
+# AXOLOT_CONFIG points at a JSON file of setting overrides, e.g.
+#   {"CHECK_INTERVAL": 5, "MEMORY_THRESHOLD_MB": 200}
+# which is applied at startup and again whenever it changes (checked every
+# CONFIG_POLL seconds). Only the settings in control.RELOADABLE can change live.
+CONTROL_PORT = int(os.environ.get("AXOLOT_CONTROL_PORT", 0))
+CONFIG_FILE = os.environ.get("AXOLOT_CONFIG")
+CONFIG_POLL = 1  # Seconds
@@ -0,0 +1,274 @@
+"""
+Control - The healer's control plane
+Changing what the healer does used to mean restarting it, and with it every
+app it supervises. Instead, a running healer can be steered:
+
+- a JSON API on localhost (CONTROL_PORT), served from a daemon thread like
+  metrics.serve(): every target's live state and timings, read straight
+  from the supervisor's memory; add and remove targets; pause and resume
+  healing; read and change settings
+- a settings file (CONFIG_FILE) of overrides for config.py, applied at
+  startup and again whenever it changes (checked every CONFIG_POLL). A bad
+  edit is logged and skipped, and the settings in force stay as they are
+
+Settings are written to config.py in place, so whatever reads them at call
+time has them at once, and Supervisor.reconfigure() pushes the rest into the
+targets' schedules, policies and limits. Only the settings in RELOADABLE can
+change live; ports, hot spares, the fork server and the like are fixed for
+the process' lifetime and are refused. A file change re-applies the whole
+file over config.py's defaults, so a setting changed with PATCH /config lasts
+until then.
+
+Routes:
+    GET    /targets                  every target, see Supervisor.describe()
+    POST   /targets                  add one: an AXOLOT_TARGETS entry
+    GET    /targets/<name>
+    DELETE /targets/<name>           stops its app too
+    POST   /targets/<name>/pause     checks go on, failures are only logged
+    POST   /targets/<name>/resume
+    POST   /pause, /resume           every target
+    GET    /config                   reloadable settings and their values
+    PATCH  /config                   {"CHECK_INTERVAL": 5, ...}
+    POST   /config/reload            re-read CONFIG_FILE now
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import dataclasses
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from supervisor import Target
+
+# Settings that can change while the healer runs, and their types
+RELOADABLE = {
+    # Pushed into every target by Supervisor.reconfigure()
+    "CHECK_INTERVAL": float,
+    "MAX_CHECK_INTERVAL": float,
+    "BURST_INTERVAL": float,
+    "MAX_RETRIES": int,
+    "MEMORY_THRESHOLD_MB": float,
+    "CPU_LIMIT_PERCENT": float,
+    "CPU_SUSTAIN_SECONDS": float,
+    "RESTART_BUDGET": int,
+    "RESTART_BUDGET_WINDOW": float,
+    "BACKOFF_BASE": float,
+    "BACKOFF_MAX": float,
+    "STABLE_AFTER": float,
+    "CRASH_LOOP_LIMIT": int,
+    "QUARANTINE_SECONDS": float,
+    # Read where they are used
+    "QUARANTINE_MAX_SECONDS": float,
+    "LEAK_RESTART_HORIZON": float,
+    "LEAK_RESTART_MARGIN": float,
+    "SAMPLE_INTERVAL": float,
+    "WATCHDOG_POLL": float,
+    "WATCHDOG_HANG_AFTER": float,
+    "WATCHDOG_REQUEST_HANG_AFTER": float,
+    "STARTUP_TIMEOUT": float,
+}
+ZERO_OK = {"LEAK_RESTART_MARGIN"}  # Every other setting must be positive
+
+DEFAULTS = {name: getattr(config, name) for name in RELOADABLE}
+
+# What an AXOLOT_TARGETS entry may set: the Target fields that aren't runtime state
+TARGET_FIELDS = {field.name for field in dataclasses.fields(Target) if field.repr}
+
+def current():
+    return {name: getattr(config, name) for name in RELOADABLE}
+
+def validate(settings):
+    """settings ({name: value}) checked and converted. Raises ValueError on the first bad one."""
+    if not isinstance(settings, dict):
+        raise ValueError("Settings must be a JSON object")
+    checked = {}
+    for name, value in settings.items():
+        kind = RELOADABLE.get(name)
+        if kind is None:
+            if hasattr(config, name):
+                raise ValueError(f"{name} cannot change without restarting the healer")
+            raise ValueError(f"Unknown setting {name}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (kind is int and value != int(value)):
+            raise ValueError(f"{name} must be {'an integer' if kind is int else 'a number'}, not {value!r}")
+        if value < 0 or (value == 0 and name not in ZERO_OK):
+            raise ValueError(f"{name} must be positive, not {value!r}")
+        checked[name] = int(value) if kind is int else value
+    merged = {**current(), **checked}
+    if merged["MAX_CHECK_INTERVAL"] < merged["CHECK_INTERVAL"]:
+        raise ValueError("MAX_CHECK_INTERVAL must be at least CHECK_INTERVAL")
+    return checked
+
+def new_target(entry):
+    """A Target from an AXOLOT_TARGETS-style entry. Limits it doesn't set follow the current settings."""
+    if not isinstance(entry, dict) or not entry.get("name"):
+        raise ValueError("A target needs at least a name")
+    unknown = set(entry) - TARGET_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown target fields: {', '.join(sorted(unknown))}")
+    entry = {"memory_limit_mb": config.MEMORY_THRESHOLD_MB, "cpu_limit_percent": config.CPU_LIMIT_PERCENT, **entry}
+    target = Target(**entry)
+    if not isinstance(target.port, int) or not os.path.exists(target.script):
+        raise ValueError(f"A target needs an integer port and a script that exists, got "
+                         f"{target.port!r} and {target.script!r}")
+    return target
+
+# ============================================================================
+# CONTROL PLANE
+# ============================================================================
+
+class ControlPlane:
+    """Applies settings and runs control requests against a Supervisor."""
+
+    def __init__(self, supervisor, path=config.CONFIG_FILE):
+        self.supervisor = supervisor
+        self.path = path  # Settings file, or None
+        self.reloads = 0
+        self.last_error = None  # Why the last file change was not applied
+        self._stamp = None  # (mtime, size) of the file as last read
+        self._lock = threading.Lock()
+
+    def apply(self, settings):
+        """Validates and applies settings. Returns {name: [old, new]} for those that changed."""
+        settings = validate(settings)
+        with self._lock:
+            previous = {}
+            for name, value in settings.items():
+                if getattr(config, name) != value:
+                    previous[name] = getattr(config, name)
+                    setattr(config, name, value)
+            if previous:
+                self.supervisor.reconfigure(previous)
+        changed = {name: [old, getattr(config, name)] for name, old in previous.items()}
+        if changed:
+            logging.info("🔧 Settings changed: " + ", ".join(f"{name} {old} -> {new}"
+                                                            for name, (old, new) in changed.items()))
+        return changed
+
+    def reload(self):
+        """Applies the settings file over config.py's defaults. Returns what changed."""
+        stamp = self._stat()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+            changed = self.apply({**DEFAULTS, **validate(settings)})
+        except (OSError, ValueError) as e:
+            self.last_error = str(e)
+            raise
+        finally:
+            self._stamp = stamp  # A bad file is not retried until it changes again
+        self.reloads += 1
+        self.last_error = None
+        return changed
+
+    def watch(self):
+        """Reloads the settings file from a daemon thread whenever it changes."""
+        threading.Thread(target=self._watch_loop, name="config-watch", daemon=True).start()
+
+    def _stat(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _watch_loop(self):
+        while True:
+            time.sleep(config.CONFIG_POLL)
+            try:
+                if self._stat() == self._stamp:
+                    continue
+            except OSError:
+                continue  # Gone, or being replaced: keep the settings we have
+            try:
+                changed = self.reload()
+                logging.info(f"🔄 Reloaded {self.path}" + ("" if changed else ", nothing changed"))
+            except (OSError, ValueError) as e:
+                logging.error(f"❌ Not reloading {self.path}, keeping the current settings: {e}")
+
+    # ------------------------------------------------------------------------
+    # REQUESTS
+    # ------------------------------------------------------------------------
+
+    def handle(self, method, path, body=None):
+        """One API request. Returns (HTTP status, JSON-serializable body)."""
+        parts = [part for part in path.split("/") if part]
+        try:
+            if parts == ["targets"]:
+                if method == "GET":
+                    return 200, {"targets": [self.supervisor.describe(target) for target in self.supervisor.targets]}
+                if method == "POST":
+                    target = self.supervisor.add_target(new_target(body))
+                    return 201, self.supervisor.describe(target)
+            elif len(parts) in (2, 3) and parts[0] == "targets":
+                try:
+                    target = self.supervisor.find(parts[1])
+                except KeyError:
+                    return 404, {"error": f"No target named {parts[1]!r}"}
+                if len(parts) == 2 and method == "GET":
+                    return 200, self.supervisor.describe(target)
+                if len(parts) == 2 and method == "DELETE":
+                    self.supervisor.remove_target(target.name)
+                    return 200, {"removed": target.name}
+                if len(parts) == 3 and parts[2] in ("pause", "resume") and method == "POST":
+                    getattr(self.supervisor, parts[2])(target.name)
+                    return 200, self.supervisor.describe(target)
+            elif parts in (["pause"], ["resume"]):
+                if method == "POST":
+                    targets = getattr(self.supervisor, parts[0])()
+                    return 200, {"targets": [self.supervisor.describe(target) for target in targets]}
+            elif parts == ["config"]:
+                if method == "GET":
+                    return 200, {"settings": current(), "file": self.path, "reloads": self.reloads,
+                                 "last_error": self.last_error}
+                if method == "PATCH":
+                    return 200, {"changed": self.apply(body)}
+            elif parts == ["config", "reload"]:
+                if method == "POST":
+                    if not self.path:
+                        return 400, {"error": "No settings file: set AXOLOT_CONFIG"}
+                    return 200, {"changed": self.reload()}
+            else:
+                return 404, {"error": f"No such endpoint: {path}"}
+            return 405, {"error": f"{method} is not allowed on {path}"}
+        except (ValueError, TypeError, OSError) as e:
+            return 400, {"error": str(e)}
+
+def serve(control, port, host="127.0.0.1"):
+    """Serves the control API at http://host:port from a daemon thread. Returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._respond("GET")
+
+        def do_POST(self):
+            self._respond("POST")
+
+        def do_PATCH(self):
+            self._respond("PATCH")
+
+        def do_DELETE(self):
+            self._respond("DELETE")
+
+        def _respond(self, method):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+            except ValueError as e:
+                status, payload = 400, {"error": f"Body is not JSON: {e}"}
+            else:
+                status, payload = control.handle(method, self.path.split("?")[0], body)
+            data = json.dumps(payload, indent=2).encode("utf-8") + b"\n"
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass  # The changes themselves are logged by the control plane and the supervisor
+
+    # Localhost by default: there is no authentication, and this can stop apps
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="control", daemon=True).start()
+    return server
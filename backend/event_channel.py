@@ -0,0 +1,251 @@
+"""
+Event Channel - Structured healer -> API event bus
+The healer reports what it sees and does as small typed binary records
+over a datagram socket, instead of Mission Control scraping healer.log.
+Nothing touches the disk and nothing is parsed as text on the hot path.
+
+Transport is a Unix datagram socket where available, and UDP on localhost
+otherwise (Windows). Sending never stalls the healer: if nobody is listening
+the event is dropped at once, and if the receiver's queue is full (Linux
+keeps only net.unix.max_dgram_qlen datagrams, often 10) the sender waits at
+most SEND_TIMEOUT for room before dropping it. Drops are counted.
+
+Wire format (little-endian):
+    header  <BBBBiidfHH  version, type, ok, n_values, pid, code,
+                         timestamp (epoch s), duration_ms, len(target), len(reason)
+    target  utf-8
+    reason  utf-8
+    values  n_values x float64
+"""
+
+import os
+import sys
+import time
+import errno
+import socket
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+
+VERSION = 1
+
+# Event types
+PROBE = 1  # ok, duration_ms = probe latency, reason = probe message, values = PROBE_VALUES
+EXIT = 2  # pid that exited, code = returncode (negative = signal)
+RESTART_START = 3  # pid being replaced, reason = why
+RESTART_FINISH = 4  # pid = new pid, code = restart count, duration_ms = restart time
+STARTUP = 5  # ok = answered in time, code = 1 if a promoted standby, duration_ms = spawn/promotion -> ready, values = STARTUP_VALUES
+QUARANTINE = 6  # ok=False: quarantined, duration_ms = time until probation; ok=True: released on probation
+BACKOFF = 7  # Restart delayed: code = failures in a row, duration_ms = delay, reason = why
+WORKER_RECYCLE = 8  # pid = worker recycled, code = workers recycled so far, duration_ms = time to stop it
+SAMPLE = 9  # Resource sample of the process tree: code = processes, values = SAMPLE_VALUES
+HANG = 10  # Watchdog: pid stalled (code=0) or hung (code=1, about to be healed), duration_ms = for how long
+CONTROL = 11  # Control plane (control.py): reason = CONTROL_ACTIONS entry; target is "" for all targets
+
+# PROBE values: memory (MB), leak slope (MB/s, 0 if none),
+# seconds until the memory limit (-1 if not leaking)
+PROBE_VALUES = ("memory_mb", "leak_mb_per_s", "leak_eta_s")
+
+# SAMPLE values: totals over the target's process tree (see sampler.py)
+SAMPLE_VALUES = ("cpu_percent", "rss_mb", "uss_mb", "threads", "fds", "read_mb", "write_mb", "children")
+
+# CONTROL reasons
+CONTROL_ACTIONS = ("paused", "resumed", "added", "removed", "reloaded")
+
+# STARTUP values: ms spent in each boot phase (see readiness.py), -1 if unknown
+STARTUP_VALUES = ("interpreter_ms", "imports_ms", "routes_ms", "bind_ms", "first_response_ms")
+
+TYPE_NAMES = {
+    PROBE: "probe",
+    EXIT: "exit",
+    RESTART_START: "restart_start",
+    RESTART_FINISH: "restart_finish",
+    STARTUP: "startup",
+    QUARANTINE: "quarantine",
+    BACKOFF: "backoff",
+    WORKER_RECYCLE: "worker_recycle",
+    SAMPLE: "sample",
+    HANG: "hang",
+    CONTROL: "control",
+}
+
+_HEADER = struct.Struct("<BBBBiidfHH")
+MAX_DATAGRAM = 64 * 1024
+SEND_TIMEOUT = 0.05  # Seconds to wait for room in a full receiver queue
+
+USE_UNIX = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+DEFAULT_ADDRESS = (
+    os.environ.get("AXOLOT_EVENT_SOCKET", os.path.join(tempfile.gettempdir(), "axolot-events.sock"))
+    if USE_UNIX else
+    ("127.0.0.1", int(os.environ.get("AXOLOT_EVENT_PORT", 5002)))
+)
+
+@dataclass
+class Event:
+    type: int
+    target: str
+    pid: int = 0
+    code: int = 0
+    ok: bool = True
+    timestamp: float = 0.0
+    duration_ms: float = 0.0
+    reason: str = ""
+    values: tuple = ()
+
+    @property
+    def type_name(self):
+        return TYPE_NAMES.get(self.type, str(self.type))
+
+    def to_dict(self):
+        return {
+            "type": self.type_name,
+            "target": self.target,
+            "pid": self.pid,
+            "code": self.code,
+            "ok": self.ok,
+            "timestamp": self.timestamp,
+            "duration_ms": round(self.duration_ms, 3),
+            "reason": self.reason,
+            "values": list(self.values),
+        }
+
+def encode(event):
+    target = event.target.encode("utf-8")[:0xFFFF]
+    reason = event.reason.encode("utf-8")[:0xFFFF]
+    header = _HEADER.pack(
+        VERSION, event.type, 1 if event.ok else 0, len(event.values),
+        event.pid, event.code, event.timestamp or time.time(), event.duration_ms,
+        len(target), len(reason),
+    )
+    values = struct.pack(f"<{len(event.values)}d", *event.values) if event.values else b""
+    return header + target + reason + values
+
+def decode(data):
+    (version, type_, ok, n_values, pid, code, timestamp, duration_ms,
+     target_len, reason_len) = _HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"Unsupported event version {version}")
+    offset = _HEADER.size
+    target = data[offset:offset + target_len].decode("utf-8", errors="replace")
+    offset += target_len
+    reason = data[offset:offset + reason_len].decode("utf-8", errors="replace")
+    offset += reason_len
+    values = struct.unpack_from(f"<{n_values}d", data, offset) if n_values else ()
+    return Event(type_, target, pid, code, bool(ok), timestamp, duration_ms, reason, values)
+
+def _socket():
+    return socket.socket(socket.AF_UNIX if USE_UNIX else socket.AF_INET, socket.SOCK_DGRAM)
+
+# ============================================================================
+# SENDER (healer side)
+# ============================================================================
+
+class EventEmitter:
+    """Fire-and-forget sender. Safe to share between threads."""
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.address = address
+        self.sent = 0
+        self.dropped = 0
+        self._sock = _socket()
+        self._sock.settimeout(SEND_TIMEOUT)
+
+    def emit(self, type_, target, **fields):
+        self.send(Event(type_, target, timestamp=time.time(), **fields))
+
+    def send(self, event):
+        try:
+            self._sock.sendto(encode(event), self.address)
+            self.sent += 1
+        except socket.timeout:
+            self.dropped += 1  # Receiver is stuck; don't hold up the healer
+        except OSError as e:
+            # No listener yet, or nowhere to queue it: drop rather than stall the healer
+            if e.errno not in (errno.ENOENT, errno.ECONNREFUSED, errno.EAGAIN,
+                               errno.EWOULDBLOCK, errno.ENOBUFS, errno.ECONNRESET):
+                raise
+            self.dropped += 1
+
+    def close(self):
+        self._sock.close()
+
+# ============================================================================
+# RECEIVER (API side)
+# ============================================================================
+
+class EventReceiver:
+    """Binds the channel and calls on_event(Event) for every record received."""
+
+    def __init__(self, on_event, address=DEFAULT_ADDRESS):
+        self.on_event = on_event
+        self.address = address
+        self.received = 0
+        self.errors = 0
+        self._sock = _socket()
+        if USE_UNIX:
+            try:
+                os.unlink(address)  # Left over from a previous run
+            except FileNotFoundError:
+                pass
+        self._sock.bind(address)
+        if not USE_UNIX:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+        self._stop = threading.Event()
+        self._loop = None  # Set by attach()
+
+    def run(self):
+        self._sock.settimeout(0.5)
+        while not self._stop.is_set():
+            try:
+                data = self._sock.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._stop.is_set():
+                    break
+                raise
+            self._handle(data)
+
+    def attach(self, loop):
+        """Receives on an asyncio loop instead of a thread of its own."""
+        self._sock.setblocking(False)
+        loop.add_reader(self._sock.fileno(), self._drain)
+        self._loop = loop
+
+    def _drain(self):
+        while True:
+            try:
+                data = self._sock.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            self._handle(data)
+
+    def _handle(self, data):
+        try:
+            event = decode(data)
+        except (struct.error, ValueError):
+            self.errors += 1
+            return
+        self.received += 1
+        try:
+            self.on_event(event)
+        except Exception as e:
+            self.errors += 1
+            print(f"[EVENTS] Handler failed for {event.type_name}: {e}")
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="event-receiver", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._stop.set()
+        if self._loop is not None:
+            self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        if USE_UNIX:
+            try:
+                os.unlink(self.address)
+            except FileNotFoundError:
+                pass
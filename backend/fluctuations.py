@@ -0,0 +1,113 @@
+"""
+Fluctuations - The latency overlay chaos events draw on the heartbeat chart
+Each chaos event adds a spike that plays out over a few seconds: decaying,
+waving or steady, by event type. During a /chaos storm there can be
+thousands at once, and the health loop asks for their sum on every tick:
+
+- the events live in preallocated NumPy arrays, packed at the front, so the
+  sum is a handful of vectorized operations over all of them at once
+- expiry pops a heap ordered by end time, and fills each gap with the last
+  event (swap-remove), so nothing is scanned or shifted
+- at most `capacity` events are kept; past that, the one closest to its end
+  makes room for the new one
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# Shapes
+DECAY = 0  # Starts high, fades to 20%
+WAVE = 1  # Oscillates between 50% and 100%, fading by 30%
+STEADY = 2  # Constant, fading by half
+
+FADE = np.array([0.8, 0.3, 0.5])  # Share of the spike gone by the end, per shape
+
+Pattern = namedtuple("Pattern", "base duration shape")  # ms added to latency, seconds, shape
+
+PATTERNS = {
+    'crash': Pattern(750, 10, DECAY),
+    'hard-crash': Pattern(800, 10, DECAY),
+    'nuclear': Pattern(1200, 12, DECAY),
+    'chaos': Pattern(900, 10, DECAY),
+    'leak': Pattern(300, 6, WAVE),
+    'leak-massive': Pattern(500, 8, WAVE),
+    'cpu-burn': Pattern(400, 6, WAVE),
+    'error': Pattern(250, 4, DECAY),
+    'timeout': Pattern(200, 5, STEADY),
+    'slow': Pattern(150, 4, STEADY),
+}
+DEFAULT_PATTERN = Pattern(50, 3, DECAY)
+
+CAPACITY = 16384  # Events at once
+
+class FluctuationEngine:
+    """The active spikes. Safe to add from any thread while another sums."""
+
+    def __init__(self, capacity=CAPACITY, seed=None):
+        self.capacity = capacity
+        self.count = 0  # Live events occupy [0, count)
+        self.evicted = 0  # Events dropped early to stay within capacity
+        self._start = np.zeros(capacity)
+        self._duration = np.ones(capacity)
+        self._base = np.zeros(capacity)
+        self._fade = np.zeros(capacity)
+        self._wave = np.zeros(capacity, dtype=bool)
+        self._ids = np.zeros(capacity, dtype=np.int64)  # Event id in each row
+        self._row = {}  # Event id -> row
+        self._expiry = []  # Heap of (end time, event id)
+        self._next_id = itertools.count()
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def add(self, event_type, now=None):
+        """Starts the spike for one event. Returns its pattern."""
+        pattern = PATTERNS.get(event_type, DEFAULT_PATTERN)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.count == self.capacity:
+                _, event_id = heapq.heappop(self._expiry)
+                self._remove(event_id)
+                self.evicted += 1
+            row, event_id = self.count, next(self._next_id)
+            self._start[row] = now
+            self._duration[row] = pattern.duration
+            self._base[row] = pattern.base
+            self._fade[row] = FADE[pattern.shape]
+            self._wave[row] = pattern.shape == WAVE
+            self._ids[row] = event_id
+            self._row[event_id] = row
+            self.count += 1
+            heapq.heappush(self._expiry, (now + pattern.duration, event_id))
+        return pattern
+
+    def spike(self, now=None):
+        """The summed spike of every live event right now, in ms."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                self._remove(heapq.heappop(self._expiry)[1])
+            n = self.count
+            if not n:
+                return 0
+            elapsed = now - self._start[:n]
+            progress = elapsed / self._duration[:n]
+            wave = self._wave[:n]
+            shape = np.where(wave, np.sin(elapsed * 4) * 0.25 + 0.75, 1.0)
+            spikes = self._base[:n] * shape * (1 - self._fade[:n] * progress)
+            spikes *= 0.8 + self._rng.random(n) * 0.4  # Some randomness for visual interest
+            return max(0, int(spikes.sum()))
+
+    def _remove(self, event_id):
+        """Swap-remove: the last event moves into the freed row."""
+        row = self._row.pop(event_id)
+        last = self.count - 1
+        if row != last:
+            for column in (self._start, self._duration, self._base, self._fade, self._wave, self._ids):
+                column[row] = column[last]
+            self._row[int(self._ids[row])] = row
+        self.count = last
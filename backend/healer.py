@@ -1,10 +1,10 @@
-import subprocess
-import time
 import sys
-import psutil
-import config
-from monitor import check_health, check_resources
 import logging
+import config
+from supervisor import Supervisor, load_targets
+from event_channel import EventEmitter
+from metrics import Registry, EventMetrics, serve
+from control import ControlPlane, serve as serve_control
 
 # Configure logging to file and console
 logging.basicConfig(
@@ -13,79 +13,47 @@ logging.basicConfig(
     handlers=[
         logging.FileHandler("healer.log"),
         logging.StreamHandler(sys.stdout)
-    ]
+    ],
+    # monitor.py configures logging on import; without force, healer.log is never written
+    force=True
 )
 
-def start_app():
-    """Starts the target application as a subprocess."""
-    logging.info(f"🔧 Starting {config.APP_SCRIPT}...")
-    # Use sys.executable to ensure we use the same Python interpreter
-    process = subprocess.Popen([sys.executable, config.APP_SCRIPT])
-    logging.info(f"✅ App started with PID: {process.pid}")
-    return process
-
-def stop_app(process):
-    """Stops the target application."""
-    if process and process.poll() is None:
-        logging.info(f"🛑 Stopping process {process.pid}...")
-        try:
-            parent = psutil.Process(process.pid)
-            for child in parent.children(recursive=True):
-                child.terminate()
-            parent.terminate()
-            process.wait(timeout=3)
-            print("✅ Process stopped.")
-        except psutil.NoSuchProcess:
-            print("⚠️  Process already gone.")
-        except Exception as e:
-            print(f"❌ Error stopping process: {e}")
-            print("🔨 Forcing kill...")
-            process.kill()
-
 def main():
     print("🚑 Self-Healing System Active")
     print("----------------------------")
-    
-    # 1. Start the Patient
-    target_process = start_app()
-    
-    # Give it a moment to boot
-    time.sleep(2)
 
-    try:
-        while True:
-            print("\n🔍 Cycle Check:")
-            
-            # 2. Check HTTP Health
-            is_healthy_http, http_msg = check_health(config.HEALTH_ENDPOINT)
-            print(f"   HTTP: {'✅' if is_healthy_http else '❌'} ({http_msg})")
-            
-            # 3. Check Resources (CPU/RAM)
-            # Note: We check the process we started. 
-            # If it crashed externally, target_process might be a stale object, so psutil handles validation.
-            is_healthy_res, res_msg = check_resources(target_process.pid, config.MEMORY_THRESHOLD_MB)
-            print(f"   RES : {'✅' if is_healthy_res else '❌'} ({res_msg})")
-
-            # 4. Decision Engine
-            if not is_healthy_http or not is_healthy_res:
-                print("🚨 HEALER ACTIVATED! Issue Detected.")
-                print(f"   Reason: {http_msg if not is_healthy_http else res_msg}")
-                
-                # RECOVERY ACTION: Restart
-                stop_app(target_process)
-                target_process = start_app()
-                
-                print("⏳ Waiting for stabilization...")
-                time.sleep(3) # Give it time to come up
-            
-            else:
-                print("👍 System Healthy.")
+    targets = load_targets()
+    print(f"   Supervising {len(targets)} target(s): {', '.join(t.name for t in targets)}")
+
+    # 1. Start the Patients, 2-4. Check and heal each one concurrently.
+    # Everything we see and do is also streamed to Mission Control as typed events.
+    metrics = None
+    if config.METRICS_PORT:
+        registry = Registry()
+        metrics = EventMetrics(registry)
+        serve(registry, config.METRICS_PORT)
+        print(f"   Metrics: http://localhost:{config.METRICS_PORT}/metrics")
+    supervisor = Supervisor(targets, events=EventEmitter(), metrics=metrics)
+
+    # Settings and targets can be changed from here on without restarting us
+    control = ControlPlane(supervisor)
+    if config.CONFIG_FILE:
+        try:
+            control.reload()
+        except (OSError, ValueError) as e:
+            sys.exit(f"❌ Bad settings file {config.CONFIG_FILE}: {e}")
+        control.watch()
+        print(f"   Settings: {config.CONFIG_FILE} (reloaded when it changes)")
+    if config.CONTROL_PORT:
+        serve_control(control, config.CONTROL_PORT)
+        print(f"   Control: http://127.0.0.1:{config.CONTROL_PORT}/targets")
 
-            time.sleep(config.CHECK_INTERVAL)
+    try:
+        supervisor.run_forever()
 
     except KeyboardInterrupt:
         print("\n\n🔌 Shutting down Healer...")
-        stop_app(target_process)
+        supervisor.shutdown()
         print("👋 Goodbye.")
 
 if __name__ == "__main__":
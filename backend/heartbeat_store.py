@@ -0,0 +1,244 @@
+"""
+Heartbeat Store - Persistent time series for Mission Control
+Every heartbeat is appended to on-disk column files (one file per field,
+fixed-width binary), and rolled up into 1 s / 1 min / 1 h tiers with
+min/max/avg/p99 latency. Range queries binary-search the memory-mapped
+timestamp column and read only the matching slice of each column, so
+answering a query never loads the whole history.
+
+A rollup bucket still being filled lives in memory: close() writes it out,
+and opening the store rebuilds it (and any bucket a crash left unwritten)
+from the raw rows, so a restart never splits or drops a bucket.
+
+Layout:
+    <dir>/raw/ts.q, latency.f, memory_mb.f, cpu_percent.f, up.B
+    <dir>/1s/ts.q, count.I, latency_min.f, ... down.I
+    <dir>/1m/...
+    <dir>/1h/...
+"""
+
+import os
+import math
+import mmap
+import bisect
+import threading
+from array import array
+
+RAW_COLUMNS = (
+    ("ts", "q"),  # Epoch milliseconds
+    ("latency", "f"),
+    ("memory_mb", "f"),
+    ("cpu_percent", "f"),
+    ("up", "B"),
+)
+
+ROLLUP_COLUMNS = (
+    ("ts", "q"),  # Bucket start, epoch milliseconds
+    ("count", "I"),
+    ("latency_min", "f"),
+    ("latency_max", "f"),
+    ("latency_avg", "f"),
+    ("latency_p99", "f"),
+    ("memory_avg", "f"),
+    ("memory_max", "f"),
+    ("cpu_avg", "f"),
+    ("cpu_max", "f"),
+    ("down", "I"),
+)
+
+TIERS = (("1s", 1000), ("1m", 60 * 1000), ("1h", 60 * 60 * 1000))
+RESOLUTIONS = ("raw",) + tuple(name for name, _ in TIERS)
+MAX_POINTS = 5000
+
+# ============================================================================
+# COLUMN TABLE
+# ============================================================================
+
+class ColumnTable:
+    """Append-only table stored as one fixed-width binary file per column."""
+
+    def __init__(self, directory, columns):
+        os.makedirs(directory, exist_ok=True)
+        self.columns = columns
+        self._paths = {name: os.path.join(directory, f"{name}.{code}") for name, code in columns}
+        self._sizes = {name: array(code).itemsize for name, code in columns}
+        self._files = {name: open(path, "ab") for name, path in self._paths.items()}
+
+        # A crash mid-append can leave columns of different lengths; keep the common prefix
+        self.rows = min(os.path.getsize(self._paths[name]) // self._sizes[name] for name, _ in columns)
+        for name, _ in columns:
+            self._files[name].truncate(self.rows * self._sizes[name])
+
+    def append(self, row):
+        for (name, code), value in zip(self.columns, row):
+            f = self._files[name]
+            f.write(array(code, [value]).tobytes())
+            f.flush()
+        # Only now is the row visible to readers
+        self.rows += 1
+
+    def truncate(self, rows):
+        """Drops every row from rows on."""
+        self.rows = min(self.rows, rows)
+        for name, _ in self.columns:
+            self._files[name].truncate(self.rows * self._sizes[name])
+
+    def search(self, ts, rows=None):
+        """Index of the first row with ts >= the given value."""
+        rows = self.rows if rows is None else rows
+        if rows == 0:
+            return 0
+        with self._map("ts") as view:
+            return bisect.bisect_left(view[:rows], ts)
+
+    def read(self, start, stop):
+        """Column name -> list of values for rows [start, stop)."""
+        if stop <= start:
+            return {name: [] for name, _ in self.columns}
+        result = {}
+        for name, _ in self.columns:
+            with self._map(name) as view:
+                result[name] = view[start:stop].tolist()
+        return result
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def _map(self, name):
+        return _ColumnView(self._paths[name], dict(self.columns)[name])
+
+class _ColumnView:
+    """Read-only memory map of one column file, typed as its array code."""
+
+    def __init__(self, path, code):
+        self._path = path
+        self._code = code
+
+    def __enter__(self):
+        self._file = open(self._path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._mmap).cast(self._code) if self._mmap else memoryview(array(self._code))
+        return self._view
+
+    def __exit__(self, *exc):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+# ============================================================================
+# HEARTBEAT STORE
+# ============================================================================
+
+def _p99(values):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * 0.99) - 1)]
+
+def _rollup(bucket_start, samples):
+    latencies = [s[1] for s in samples]
+    memory = [s[2] for s in samples]
+    cpu = [s[3] for s in samples]
+    count = len(samples)
+    return (
+        bucket_start, count,
+        min(latencies), max(latencies), sum(latencies) / count, _p99(latencies),
+        sum(memory) / count, max(memory),
+        sum(cpu) / count, max(cpu),
+        sum(1 for s in samples if not s[4]),
+    )
+
+class HeartbeatStore:
+    def __init__(self, directory):
+        self.raw = ColumnTable(os.path.join(directory, "raw"), RAW_COLUMNS)
+        self.tiers = {name: ColumnTable(os.path.join(directory, name), ROLLUP_COLUMNS) for name, _ in TIERS}
+        self._widths = dict(TIERS)
+        self._open = {name: (None, []) for name, _ in TIERS}  # tier -> (bucket_start, samples)
+        self._lock = threading.Lock()
+        self._closed = False
+        for name, width in TIERS:
+            self._recover(name, width)
+
+    def _recover(self, name, width):
+        """Rolls up the raw rows a tier hasn't seen yet, leaving the last bucket open."""
+        table = self.tiers[name]
+        start = 0
+        if table.rows:
+            last = table.read(table.rows - 1, table.rows)["ts"][0]
+            if self.raw.search(last + width) < self.raw.rows:
+                start = last + width  # That bucket was complete
+            else:
+                table.truncate(table.rows - 1)  # Maybe written by close() half full: rebuild it
+                start = last
+        columns = self.raw.read(self.raw.search(start), self.raw.rows)
+        for row in zip(*(columns[name] for name, _ in RAW_COLUMNS)):
+            self._roll(name, width, row)
+
+    def _roll(self, name, width, row):
+        """Adds a raw row to a tier's open bucket, writing the bucket out once the row is past it."""
+        bucket_start, samples = self._open[name]
+        current = row[0] - row[0] % width
+        if bucket_start is not None and current != bucket_start and samples:
+            self.tiers[name].append(_rollup(bucket_start, samples))
+            samples = []
+        samples.append(row)
+        self._open[name] = (current, samples)
+
+    def append(self, ts_ms, latency, memory_mb, cpu_percent, up):
+        """Persists one heartbeat and closes any rollup buckets it moves past."""
+        row = (int(ts_ms), float(latency), float(memory_mb), float(cpu_percent), 1 if up else 0)
+        with self._lock:
+            if self._closed:
+                return
+            self.raw.append(row)
+            for name, width in TIERS:
+                self._roll(name, width, row)
+
+    def query(self, start_ms, end_ms, resolution="auto", limit=MAX_POINTS):
+        """
+        Rows with start_ms <= ts < end_ms from one tier, as columns.
+        "auto" picks the finest tier that fits in `limit` points.
+        """
+        with self._lock:
+            tables = {"raw": (self.raw, self.raw.rows)}
+            tables.update({name: (table, table.rows) for name, table in self.tiers.items()})
+
+        if resolution == "auto":
+            candidates = RESOLUTIONS
+        elif resolution in RESOLUTIONS:
+            candidates = (resolution,)
+        else:
+            raise ValueError(f"resolution must be one of {', '.join(RESOLUTIONS + ('auto',))}")
+
+        for name in candidates:
+            table, rows = tables[name]
+            start = table.search(start_ms, rows)
+            stop = table.search(end_ms, rows)
+            if stop - start <= limit or name == candidates[-1]:
+                break
+
+        truncated = stop - start > limit
+        if truncated:
+            start = stop - limit  # Keep the most recent points
+
+        return {
+            "resolution": name,
+            "from": start_ms,
+            "to": end_ms,
+            "truncated": truncated,
+            "columns": table.read(start, stop),
+        }
+
+    def close(self):
+        """Writes out the open rollup buckets and closes the files. Safe to call twice."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for name, (bucket_start, samples) in self._open.items():
+                if samples:
+                    self.tiers[name].append(_rollup(bucket_start, samples))
+            self.raw.close()
+            for table in self.tiers.values():
+                table.close()
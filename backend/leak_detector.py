@@ -0,0 +1,120 @@
+"""
+Leak Detector - Memory growth trend and time-to-limit projection
+Keeps a rolling window of memory samples per process and fits a straight
+line through them (least squares, updated incrementally as samples enter
+and leave the window). A leak that started part-way through the window is
+fitted on the newest half or quarter of it instead. A steady, well-fitting upward slope is a leak; the
+line tells us when it will cross the limit, so the healer can restart the
+app on its own schedule instead of after the limit is already blown.
+
+A sudden step (like /leak-massive) is not a trend; the hard limit in
+monitor.check_resources still catches those.
+"""
+
+from collections import deque
+
+WINDOW_SECONDS = 300  # Samples older than this are forgotten
+MIN_SAMPLES = 5
+MIN_SPAN_SECONDS = 5  # Don't extrapolate from a burst of samples a moment apart
+MIN_SLOPE_MB_S = 0.05  # Slower growth than this is not worth acting on
+MIN_FIT = 0.8  # r^2 of the fit; below this the series is too noisy to trust
+
+class LeakDetector:
+    """Online linear regression of memory (MB) over time (s) for one process."""
+
+    def __init__(self, limit_mb, window_seconds=WINDOW_SECONDS):
+        self.limit_mb = limit_mb
+        self.window_seconds = window_seconds
+        self._samples = deque()
+        # Running sums, relative to the first sample's time to keep floats small
+        self._origin = None
+        self._n = 0
+        self._sx = self._sy = self._sxx = self._sxy = self._syy = 0.0
+
+    def reset(self):
+        self.__init__(self.limit_mb, self.window_seconds)
+
+    def add(self, timestamp, memory_mb):
+        if self._origin is None:
+            self._origin = timestamp
+        x, y = timestamp - self._origin, memory_mb
+        self._samples.append((x, y))
+        self._accumulate(x, y, 1)
+        cutoff = x - self.window_seconds
+        while self._samples[0][0] < cutoff:
+            self._accumulate(*self._samples.popleft(), -1)
+        if x > 10 * self.window_seconds:
+            self._rebase()
+
+    def _rebase(self):
+        """Moves the origin to the oldest sample and recomputes the sums from scratch."""
+        shift = self._samples[0][0]
+        samples = [(x - shift, y) for x, y in self._samples]
+        self._origin += shift
+        self._samples = deque()
+        self._n = 0
+        self._sx = self._sy = self._sxx = self._sxy = self._syy = 0.0
+        for x, y in samples:
+            self._samples.append((x, y))
+            self._accumulate(x, y, 1)
+
+    def _accumulate(self, x, y, sign):
+        self._n += sign
+        self._sx += sign * x
+        self._sy += sign * y
+        self._sxx += sign * x * x
+        self._sxy += sign * x * y
+        self._syy += sign * y * y
+
+    def projection(self):
+        """
+        (slope MB/s, seconds until the limit), or None when memory isn't
+        clearly leaking. Seconds is measured from the latest sample.
+        """
+        fits = [_fit(self._n, self._sx, self._sy, self._sxx, self._sxy, self._syy)]
+        if self._n >= 2 * MIN_SAMPLES:
+            # The leak may have started recently; try the newest half and quarter
+            x_last = self._samples[-1][0]
+            span = x_last - self._samples[0][0]
+            for fraction in (2, 4):
+                fits.append(_fit_samples([s for s in self._samples if s[0] >= x_last - span / fraction]))
+
+        for fit in fits:
+            if fit is None:
+                continue
+            slope, intercept, r2 = fit
+            if slope >= MIN_SLOPE_MB_S and r2 >= MIN_FIT:
+                fitted_now = intercept + slope * self._samples[-1][0]
+                return slope, max(0.0, (self.limit_mb - fitted_now) / slope)
+        return None
+
+    @property
+    def samples(self):
+        return len(self._samples)
+
+def _fit_samples(samples):
+    if len(samples) < MIN_SAMPLES or samples[-1][0] - samples[0][0] < MIN_SPAN_SECONDS:
+        return None
+    sx = sum(x for x, _ in samples)
+    sy = sum(y for _, y in samples)
+    return _fit(len(samples), sx, sy,
+                sum(x * x for x, _ in samples), sum(x * y for x, y in samples),
+                sum(y * y for _, y in samples))
+
+def _fit(n, sx, sy, sxx, sxy, syy):
+    """Least squares from running sums: (slope, intercept, r^2), or None."""
+    if n < MIN_SAMPLES:
+        return None
+    var_x = sxx - sx * sx / n
+    if var_x <= 0 or var_x / n < (MIN_SPAN_SECONDS / 4) ** 2:
+        return None  # Samples too bunched up in time to extrapolate from
+    var_y = syy - sy * sy / n
+    cov = sxy - sx * sy / n
+    slope = cov / var_x
+    r2 = cov * cov / (var_x * var_y) if var_y > 0 else 0.0
+    return slope, (sy - slope * sx) / n, r2
+
+def format_eta(seconds):
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.1f}min"
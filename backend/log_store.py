@@ -0,0 +1,218 @@
+"""
+Log Store - Persistent, searchable Mission Control log
+Every log line (API and healer alike) goes into an SQLite database in WAL
+mode, so weeks of them can be searched by type, time range and text while
+the live view keeps its last LOG_LIMIT entries in memory:
+
+- append() only queues the line; a writer thread commits the queue in
+  batches, so callers (the health loop, inside STATE.write()) never wait
+  on the disk
+- a line's id is its timestamp (epoch ms << ID_SHIFT, plus a counter), so
+  newest-first is primary key order and a time range is a rowid range;
+  timestamps are kept non-decreasing to make that hold
+- lines are indexed on (type, id), and messages go into an FTS5 full-text
+  index (LIKE scans if this SQLite lacks FTS5) that is walked in id order
+  too, so a search stops as soon as it has a page
+- queries page newest-first with an id cursor: `before` is the `next` of
+  the previous page, so a page costs the same however deep it is
+- readers get their own connection per thread; with WAL they never block
+  the writer, and the writer never blocks them
+- lines older than `retention_days` are pruned once a day
+"""
+
+import time
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+ID_SHIFT = 10  # 1024 ids per millisecond; ids stay below 2**53 (exact in JavaScript) until 2248
+BATCH_SIZE = 500  # Rows per transaction at most
+FLUSH_INTERVAL = 0.2  # Seconds a queued line waits for company at most
+RETENTION_DAYS = 30
+PRUNE_INTERVAL = 24 * 60 * 60
+PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    id INTEGER PRIMARY KEY,  -- epoch ms << ID_SHIFT, plus a counter
+    type TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS logs_type ON logs (type, id);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5 (
+    message, content='logs', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+    INSERT INTO logs_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+    INSERT INTO logs_fts (logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+def fts_available():
+    try:
+        sqlite3.connect(":memory:").execute("CREATE VIRTUAL TABLE t USING fts5 (x)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def match_expression(text):
+    """Every word of text, each as a quoted FTS5 string (so no query syntax gets through)."""
+    words = text.split()
+    return " ".join('"%s"' % word.replace('"', '""') for word in words)
+
+class LogStore:
+    def __init__(self, path, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self.fts = fts_available()
+        self.dropped = 0  # Lines that failed to commit
+        self._queue = queue.SimpleQueue()
+        self._local = threading.local()
+        self._closed = threading.Event()
+
+        db = self._connect()
+        db.executescript(SCHEMA)
+        if self.fts:
+            db.executescript(FTS_SCHEMA)
+        db.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="log-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe; only the last commits can go
+        return db
+
+    # ------------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------------
+
+    def append(self, ts_ms, log_type, message):
+        """Queues one line. Never blocks."""
+        self._queue.put((int(ts_ms), log_type, message))
+
+    def _write_loop(self):
+        db = self._connect()
+        self._last_id = db.execute("SELECT max(id) FROM logs").fetchone()[0] or 0
+        next_prune = 0
+        while not self._closed.is_set() or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=FLUSH_INTERVAL)]
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE and not isinstance(batch[-1], threading.Event):
+                try:
+                    batch.append(self._queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            flushed = [item for item in batch if isinstance(item, threading.Event)]
+            rows = [item for item in batch if not isinstance(item, threading.Event)]
+            try:
+                if rows:
+                    self._insert(db, rows)
+            except sqlite3.Error as e:
+                self.dropped += len(rows)
+                print(f"[LOGSTORE] Dropped {len(rows)} lines: {e}")
+            for done in flushed:
+                done.set()
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + PRUNE_INTERVAL
+                self.prune(db)
+        db.close()
+
+    def _insert(self, db, batch):
+        rows = []
+        for ts_ms, log_type, message in batch:
+            # A clock step back (or a line stamped late) files it right after the last one
+            self._last_id = max(ts_ms << ID_SHIFT, self._last_id + 1)
+            rows.append((self._last_id, log_type, message))
+        with db:  # The FTS index follows by trigger, in the same transaction
+            db.executemany("INSERT INTO logs (id, type, message) VALUES (?, ?, ?)", rows)
+
+    def prune(self, db=None):
+        """Deletes lines older than retention_days. Returns how many went."""
+        db = db or self._reader()
+        cutoff = int((time.time() - self.retention_days * 86400) * 1000)
+        with db:
+            return db.execute("DELETE FROM logs WHERE id < ?", (cutoff << ID_SHIFT,)).rowcount
+
+    def flush(self, timeout=5):
+        """Waits until everything queued so far is committed. Returns False on timeout."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self._closed.set()
+        self._writer.join(timeout=5)
+
+    # ------------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------------
+
+    def _reader(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    def query(self, log_type=None, start_ms=None, end_ms=None, text=None, before=None, limit=PAGE_LIMIT):
+        """
+        One page of lines, newest first, matching every filter given:
+        log_type exactly, start_ms <= ts < end_ms, every word of text. Returns
+        {"logs": [...], "next": cursor for the following page, or None}.
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_LIMIT))
+        source, id_column = "logs", "logs.id"
+        where, params = [], []
+        if text and text.split():
+            if self.fts:
+                # Bounds and order on the FTS rowid, so FTS5 walks its matches newest first
+                source, id_column = "logs_fts JOIN logs ON logs.id = logs_fts.rowid", "logs_fts.rowid"
+                where.append("logs_fts MATCH ?")
+                params.append(match_expression(text))
+            else:
+                for word in text.split():
+                    where.append("logs.message LIKE ?")
+                    params.append(f"%{word}%")
+        if log_type:
+            where.append("logs.type = ?")
+            params.append(log_type)
+        if start_ms is not None:
+            where.append(f"{id_column} >= ?")
+            params.append(int(start_ms) << ID_SHIFT)
+        if end_ms is not None:
+            where.append(f"{id_column} < ?")
+            params.append(int(end_ms) << ID_SHIFT)
+        if before is not None:
+            where.append(f"{id_column} < ?")
+            params.append(int(before))
+
+        sql = f"SELECT logs.id, logs.type, logs.message FROM {source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {id_column} DESC LIMIT ?"
+        rows = self._reader().execute(sql, params + [limit + 1]).fetchall()
+
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "logs": [{"id": row[0],
+                      "timestamp": datetime.fromtimestamp((row[0] >> ID_SHIFT) / 1000).isoformat(),
+                      "type": row[1],
+                      "message": row[2]} for row in rows],
+            "next": rows[-1][0] if more else None,
+        }
+
+    def count(self):
+        return self._reader().execute("SELECT count(*) FROM logs").fetchone()[0]
@@ -0,0 +1,296 @@
+"""
+Log Tailer - Incremental, rotation-safe file ingestion
+Follows a growing log file the way `tail -F` does, but built for volume:
+
+- Wakes on inotify events (Linux) and falls back to polling elsewhere.
+- Reads in large chunks and hands complete lines over in batches.
+- Persists the byte offset and inode of the last complete line, so a
+  restart resumes exactly where it stopped (and finishes a file that was
+  rotated away while we were down, if it is still at <path>.1).
+- Notices rename-style rotation (new inode) and copy-truncate rotation
+  (file shrank) and starts the new file from the beginning.
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import ctypes
+import asyncio
+import threading
+
+CHUNK_SIZE = 1024 * 1024  # Bytes per read
+SAVE_INTERVAL = 1.0  # Seconds between offset checkpoints
+POLL_INTERVAL = 0.5  # Fallback when inotify is unavailable
+INOTIFY_TIMEOUT = 5.0  # Safety re-check even if no event arrives
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+
+def classify(line):
+    """Log type for a healer.log line. WARN wins over ERROR, as before."""
+    # Plain substring tests are C-speed scans; a regex alternation is ~8x slower per line
+    if "HEALER ACTIVATED" in line or "Issue Detected" in line:
+        return "WARN"
+    if "Error" in line or "error" in line:
+        return "ERROR"
+    return "INFO"
+
+# ============================================================================
+# INOTIFY
+# ============================================================================
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+class _Inotify:
+    """Minimal ctypes inotify watch on a directory. Raises OSError if unsupported."""
+
+    def __init__(self, directory):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is Linux-only")
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, "inotify_add_watch failed")
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if ready:
+            self.drain()
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 64 * 1024):
+                pass  # We only care that something happened
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self.fd)
+
+# ============================================================================
+# TAILER
+# ============================================================================
+
+class LogTailer:
+    """
+    Calls on_lines(list_of_str) with every complete line appended to path.
+    state_path (optional) is where the offset/inode checkpoint lives.
+    """
+
+    def __init__(self, path, on_lines, state_path=None, chunk_size=CHUNK_SIZE, start_at_end=True):
+        self.path = path
+        self.on_lines = on_lines
+        self.state_path = state_path
+        self.chunk_size = chunk_size
+        self.start_at_end = start_at_end  # Only used when there is no checkpoint
+
+        self._fd = None
+        self._inode = None  # (st_dev, st_ino) of the open file
+        self.offset = 0  # Byte offset just past the last complete line handed over
+        self._partial = b""
+        self._last_save = 0.0
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------------
+
+    def run(self):
+        """Blocking loop: open (or resume), then drain on every wakeup."""
+        try:
+            notifier = _Inotify(os.path.dirname(os.path.abspath(self.path)))
+        except (OSError, AttributeError):
+            notifier = None
+
+        try:
+            self._resume()
+            while not self._stop.is_set():
+                self.read_available()
+                if notifier is not None:
+                    notifier.wait(INOTIFY_TIMEOUT)
+                else:
+                    self._stop.wait(POLL_INTERVAL)
+        finally:
+            self.save()
+            if notifier is not None:
+                notifier.close()
+            self._close()
+
+    async def run_async(self):
+        """run(), as an asyncio task: inotify wakes the loop instead of a blocked thread."""
+        loop = asyncio.get_running_loop()
+        woken = asyncio.Event()
+        try:
+            notifier = _Inotify(os.path.dirname(os.path.abspath(self.path)))
+            loop.add_reader(notifier.fd, woken.set)
+        except (OSError, AttributeError):
+            notifier = None
+
+        try:
+            self._resume()
+            while not self._stop.is_set():
+                woken.clear()
+                if notifier is not None:
+                    notifier.drain()
+                self.read_available()
+                try:
+                    await asyncio.wait_for(woken.wait(), INOTIFY_TIMEOUT if notifier else POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.save()
+            if notifier is not None:
+                loop.remove_reader(notifier.fd)
+                notifier.close()
+            self._close()
+
+    def stop(self):
+        self._stop.set()
+
+    def read_available(self):
+        """Reads everything currently in the file, following rotation. Returns lines read."""
+        # A file that appears after we started is new: read it from the top
+        if self._fd is None and not self._open(at_end=False):
+            return 0
+
+        total = self._drain()
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return total  # Rotated away and not recreated yet; keep the old fd
+
+        if (st.st_dev, st.st_ino) != self._inode:
+            # Rename rotation: old file is finished, start the new one from the top
+            total += self._drain()
+            self._flush_partial()
+            self._close()
+            if self._open(at_end=False):
+                total += self._drain()
+        elif st.st_size < self.offset:
+            # Copy-truncate rotation
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            self.offset = 0
+            self._partial = b""
+            total += self._drain()
+
+        if time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self.save()
+        return total
+
+    # ------------------------------------------------------------------------
+    # CHECKPOINTS
+    # ------------------------------------------------------------------------
+
+    def _has_checkpoint(self):
+        return bool(self.state_path) and os.path.exists(self.state_path)
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return (state["dev"], state["inode"]), state["offset"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None, 0
+
+    def save(self):
+        """Atomically writes the current (inode, offset) checkpoint."""
+        self._last_save = time.monotonic()
+        if not self.state_path or self._inode is None:
+            return
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dev": self._inode[0], "inode": self._inode[1], "offset": self.offset}, f)
+        os.replace(tmp, self.state_path)
+
+    def _resume(self):
+        inode, offset = self._load_checkpoint() if self._has_checkpoint() else (None, 0)
+        if inode is None:
+            self._open(at_end=self.start_at_end)
+            return
+
+        # Was the file we were reading rotated to <path>.1 while we were down?
+        rotated = f"{self.path}.1"
+        for candidate in (self.path, rotated):
+            try:
+                st = os.stat(candidate)
+            except FileNotFoundError:
+                continue
+            if (st.st_dev, st.st_ino) != inode:
+                continue
+            if offset > st.st_size:
+                offset = 0  # Truncated while we were down
+            self._open_path(candidate, offset)
+            if candidate == rotated:
+                self._drain()
+                self._flush_partial()
+                self._close()
+                self._open(at_end=False)
+            return
+
+        # Our file is gone; the current one is new to us
+        self._open(at_end=False)
+
+    # ------------------------------------------------------------------------
+    # FILE HANDLING
+    # ------------------------------------------------------------------------
+
+    def _open(self, at_end):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return False
+        return self._open_path(self.path, size if at_end else 0)
+
+    def _open_path(self, path, offset):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        st = os.fstat(fd)
+        self._fd = fd
+        self._inode = (st.st_dev, st.st_ino)
+        self.offset = offset
+        self._partial = b""
+        os.lseek(fd, offset, os.SEEK_SET)
+        return True
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _drain(self):
+        total = 0
+        while True:
+            chunk = os.read(self._fd, self.chunk_size)
+            if not chunk:
+                return total
+            data = self._partial + chunk
+            end = data.rfind(b"\n")
+            if end < 0:
+                self._partial = data
+                continue
+            self._partial = data[end + 1:]
+            self.offset += end + 1  # data starts at self.offset
+            lines = data[:end].decode("utf-8", errors="replace").splitlines()
+            total += len(lines)
+            self.on_lines(lines)
+
+    def _flush_partial(self):
+        """An unterminated last line of a finished (rotated) file still counts."""
+        if self._partial:
+            self.offset += len(self._partial)
+            self.on_lines([self._partial.decode("utf-8", errors="replace")])
+            self._partial = b""
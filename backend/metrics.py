@@ -0,0 +1,317 @@
+"""
+Metrics - Counters, histograms and gauges for Prometheus/OpenMetrics scrapers
+Recording has to stay cheap on the hot paths (the 500ms health loop, the
+healer's probes and samples) and a scrape must never hold them up:
+
+- counters and histograms hold one lock per metric, only for the update of
+  a dict entry; a scrape holds it just long enough to copy the values.
+- histogram buckets are exponential, so a few dozen cover everything from
+  sub-millisecond probes to minutes-long recoveries, and a value's bucket
+  is found by bisect before taking the lock.
+- gauges are a plain dict (last write wins), or a function called at
+  scrape time for values that already live somewhere else.
+
+EventMetrics turns the healer's events (event_channel.py) into restart,
+MTTR, hang and resource metrics, in the healer itself or in Mission
+Control. serve() exposes a registry over HTTP on its own port, for
+processes without a web server of their own.
+"""
+
+import math
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import event_channel
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+MB = 1024 * 1024
+
+def negotiate(accept):
+    """(openmetrics, content type) for a scrape's Accept header."""
+    if accept and "application/openmetrics-text" in accept:
+        return True, OPENMETRICS_CONTENT_TYPE
+    return False, CONTENT_TYPE
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+# ============================================================================
+# METRIC TYPES
+# ============================================================================
+
+class Counter:
+    """Only goes up. Exposed as <name>_total."""
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}_total{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Histogram:
+    """
+    Counts observations into count exponential buckets: the first ends at
+    start, each next one factor times further, then +Inf.
+    """
+    type = "histogram"
+
+    def __init__(self, name, help, start, factor, count, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.bounds = [float(f"{start * factor ** i:.3g}") for i in range(count)]  # Readable le="..."
+        self._counts = {}  # label values -> bucket counts, then the sum
+        self._lock = threading.Lock()
+
+    def bucket(self, value):
+        """Index of the bucket value falls in (len(bounds) for +Inf)."""
+        return bisect.bisect_left(self.bounds, value)
+
+    def observe(self, value, *labels):
+        index = self.bucket(value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.bounds) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def _copy(self):
+        with self._lock:
+            return {labels: list(counts) for labels, counts in self._counts.items()}
+
+    def snapshot(self, *labels):
+        """(bucket counts, sum) so far, not cumulative."""
+        with self._lock:
+            counts = list(self._counts.get(labels) or [0] * (len(self.bounds) + 1) + [0.0])
+        return counts[:-1], counts[-1]
+
+    def samples(self):
+        for labels, counts in sorted(self._copy().items()):
+            cumulative = 0
+            for bound, count in zip(self.bounds + [math.inf], counts):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(counts[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+class Gauge:
+    """
+    Goes up and down. Either set() from the code that knows the value, or
+    give a function returning {label values: value} to read it at scrape time.
+    """
+    type = "gauge"
+
+    def __init__(self, name, help, labelnames=(), function=None):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.function = function
+        self._values = {}
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+    def remove(self, *labels):
+        self._values.pop(labels, None)
+
+    def samples(self):
+        values = dict(self.function()) if self.function else dict(self._values)
+        for labels, value in sorted(values.items()):
+            if value is None:
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+class Registry:
+    """A set of metrics, rendered together."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, start, factor, count, labelnames=()):
+        return self.register(Histogram(name, help, start, factor, count, labelnames))
+
+    def gauge(self, name, help, labelnames=(), function=None):
+        return self.register(Gauge(name, help, labelnames, function))
+
+    def render(self, openmetrics=False):
+        """The text exposition format (Prometheus 0.0.4, or OpenMetrics 1.0)."""
+        out = []
+        for metric in list(self._metrics.values()):
+            family = metric.name
+            if metric.type == "counter" and not openmetrics:
+                family += "_total"  # What Prometheus' own clients declare
+            out.append(f"# HELP {family} {_escape(metric.help)}")
+            out.append(f"# TYPE {family} {metric.type}")
+            out.extend(metric.samples())
+        if openmetrics:
+            out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+# ============================================================================
+# HEALER EVENTS
+# ============================================================================
+
+# What a restart was for, by the words in its reason: a handful of label
+# values instead of one per PID, byte count and duration in the text
+RESTART_REASONS = (
+    ("Proactive restart", "leak"),
+    ("Probation", "probation"),
+    ("Hung", "hang"),
+    ("Sustained CPU", "cpu"),
+    ("High Memory", "memory"),
+    ("exited", "exit"),
+    ("Crashed", "exit"),
+    ("Zombie", "exit"),
+)
+
+def reason_label(reason):
+    for words, label in RESTART_REASONS:
+        if words in reason:
+            return label
+    return "unhealthy"  # Failed HTTP checks, in all their wordings
+
+class EventMetrics:
+    """Restart, recovery, hang and resource metrics, from healer events."""
+
+    def __init__(self, registry):
+        self.probe_duration = registry.histogram(
+            "axolot_healer_probe_duration_seconds", "Time the healer spent on one check of a target",
+            0.0005, 2, 16, ("target",))
+        self.probe_failures = registry.counter(
+            "axolot_healer_probe_failures", "Checks of a target that failed", ("target",))
+        self.exits = registry.counter(
+            "axolot_exits", "Unexpected exits of a target's process", ("target",))
+        self.restarts = registry.counter(
+            "axolot_restarts", "Restarts of a target, by what they were for", ("target", "reason"))
+        self.restart_duration = registry.histogram(
+            "axolot_restart_duration_seconds", "From stopping the old process to the new one being ready",
+            0.01, 2, 14, ("target",))
+        self.mttr = registry.histogram(
+            "axolot_mttr_seconds", "From the first sign of a failure to a replacement being ready",
+            0.01, 2, 16, ("target",))
+        self.worker_recycles = registry.counter(
+            "axolot_worker_recycles", "gunicorn workers recycled on their own", ("target", "reason"))
+        self.hangs = registry.counter(
+            "axolot_hangs", "Stalls (state=stalled) and hangs (state=hung) seen by the watchdog",
+            ("target", "state"))
+        self.quarantines = registry.counter(
+            "axolot_quarantines", "Times a target was quarantined", ("target",))
+        self.up = registry.gauge(
+            "axolot_target_up", "1 if the target's last check passed", ("target",))
+        self.resources = {
+            name: registry.gauge(f"axolot_target_{metric}", help, ("target",))
+            for name, metric, help in (
+                ("cpu_percent", "cpu_percent", "CPU of the target's process tree (100 = one core)"),
+                ("rss_mb", "rss_bytes", "Resident memory of the target's process tree"),
+                ("uss_mb", "uss_bytes", "Memory only the target's process tree uses"),
+                ("threads", "threads", "Threads in the target's process tree"),
+                ("fds", "open_fds", "Open file descriptors in the target's process tree"),
+                ("children", "child_processes", "Processes below the target's main process"),
+            )
+        }
+        self._failing_since = {}  # target -> event timestamp of the first sign of trouble
+
+    def record(self, event):
+        target = event.target
+        if event.type == event_channel.PROBE:
+            self.up.set(int(event.ok), target)
+            if event.duration_ms > 0:
+                self.probe_duration.observe(event.duration_ms / 1000, target)
+            if event.ok:
+                self._failing_since.pop(target, None)
+            else:
+                self.probe_failures.inc(target)
+                self._failing_since.setdefault(target, event.timestamp)
+        elif event.type == event_channel.EXIT:
+            self.exits.inc(target)
+            self.up.set(0, target)
+            self._failing_since.setdefault(target, event.timestamp)
+        elif event.type == event_channel.HANG:
+            self.hangs.inc(target, "hung" if event.code else "stalled")
+            self._failing_since.setdefault(target, event.timestamp - event.duration_ms / 1000)
+        elif event.type == event_channel.RESTART_START:
+            self.restarts.inc(target, reason_label(event.reason))
+            self._failing_since.setdefault(target, event.timestamp)
+        elif event.type == event_channel.RESTART_FINISH:
+            self.restart_duration.observe(event.duration_ms / 1000, target)
+            failing_since = self._failing_since.pop(target, None)
+            if failing_since is not None and event.ok:
+                self.mttr.observe(max(0.0, event.timestamp - failing_since), target)
+        elif event.type == event_channel.WORKER_RECYCLE:
+            self.worker_recycles.inc(target, reason_label(event.reason))
+        elif event.type == event_channel.QUARANTINE and not event.ok:
+            self.quarantines.inc(target)
+        elif event.type == event_channel.SAMPLE:
+            if len(event.values) == len(event_channel.SAMPLE_VALUES):
+                for name, value in zip(event_channel.SAMPLE_VALUES, event.values):
+                    gauge = self.resources.get(name)
+                    if gauge is not None:
+                        gauge.set(value * MB if name.endswith("_mb") else value, target)
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+def serve(registry, port, host="0.0.0.0"):
+    """Serves registry at http://host:port/metrics from a daemon thread. Returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics, content_type = negotiate(self.headers.get("Accept"))
+            body = registry.render(openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # One line per scrape would drown the healer's own log
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -1,50 +1,69 @@
-import requests
 import psutil
 import logging
+from prober import get_prober
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - [MONITOR] - %(message)s')
 
-def check_health(url):
+def check_health(url, timeout=None):
     """
     Checks if the web application is reachable and returning 200 OK.
+    Probes go through the shared keep-alive pool (see prober.py).
     Returns: True if healthy, False otherwise.
     """
-    try:
-        response = requests.get(url, timeout=2)
-        if response.status_code == 200:
-            return True, f"Status Code: {response.status_code}"
-        else:
-            return False, f"Status Code: {response.status_code}"
-    except requests.ConnectionError:
-        return False, "Connection Refused"
-    except requests.Timeout:
-        return False, "Request Timed Out"
-    except Exception as e:
-        return False, str(e)
+    is_healthy, message, _ = measure_health(url, timeout)
+    return is_healthy, message
+
+def measure_health(url, timeout=None):
+    """Same as check_health, plus the probe latency: (is_healthy, message, latency_ms)."""
+    return get_prober().probe(url, timeout=timeout)
 
 def check_resources(pid, memory_limit_mb):
     """
     Checks if the process is running and if memory usage is within limits.
     Returns: (is_healthy: bool, message: str)
     """
+    is_healthy, message, _ = measure_resources(pid, memory_limit_mb)
+    return is_healthy, message
+
+# psutil.Process handles, reused across checks instead of rebuilt every tick
+_PROCESSES = {}
+MAX_CACHED_PROCESSES = 256
+
+def get_process(pid):
+    """Cached psutil.Process for pid. Raises psutil.NoSuchProcess if it is gone."""
+    # Callers check their own live children (Popen.poll() first), so the pid
+    # can't have been reused; dead entries are dropped on NoSuchProcess.
+    process = _PROCESSES.get(pid)
+    if process is None:
+        if len(_PROCESSES) >= MAX_CACHED_PROCESSES:
+            for stale in [p for p in _PROCESSES if not psutil.pid_exists(p)]:
+                del _PROCESSES[stale]
+        process = _PROCESSES[pid] = psutil.Process(pid)
+    return process
+
+def measure_resources(pid, memory_limit_mb):
+    """Same as check_resources, plus RSS: (is_healthy, message, memory_mb or None)."""
     try:
-        process = psutil.Process(pid)
+        process = get_process(pid)
         
-        # Check if running (zombie processes are technically running but useless)
-        if process.status() == psutil.STATUS_ZOMBIE:
-            return False, "Process is Zombie"
+        # One pass over /proc for everything below
+        with process.oneshot():
+            # Check if running (zombie processes are technically running but useless)
+            if process.status() == psutil.STATUS_ZOMBIE:
+                return False, "Process is Zombie", None
 
-        # Check memory usage
-        mem_info = process.memory_info()
+            # Check memory usage
+            mem_info = process.memory_info()
         mem_mb = mem_info.rss / (1024 * 1024)  # Convert bytes to MB
         
         if mem_mb > memory_limit_mb:
-            return False, f"High Memory Usage: {mem_mb:.2f}MB > {memory_limit_mb}MB"
+            return False, f"High Memory Usage: {mem_mb:.2f}MB > {memory_limit_mb}MB", mem_mb
         
-        return True, f"Memory Usage: {mem_mb:.2f}MB"
+        return True, f"Memory Usage: {mem_mb:.2f}MB", mem_mb
         
     except psutil.NoSuchProcess:
-        return False, "Process ID not found (Crashed/Stopped)"
+        _PROCESSES.pop(pid, None)
+        return False, "Process ID not found (Crashed/Stopped)", None
     except Exception as e:
-        return False, f"Error checking resources: {str(e)}"
+        return False, f"Error checking resources: {str(e)}", None
@@ -0,0 +1,125 @@
+"""
+Prober - Pooled, keep-alive HTTP probes
+Shared by the healer (monitor.py) and Mission Control (api_server.py) so
+that probes reuse TCP connections instead of paying a handshake each time.
+
+The sync Prober is backed by a requests.Session with a sized connection
+pool. AsyncProber offers the same interface on top of httpx when it is
+installed, for callers that run an asyncio loop. httpx is only imported
+when an AsyncProber is created: the healer and the API never use it, and it
+would add tens of milliseconds to their startup.
+"""
+
+import time
+import threading
+import importlib.util
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_TIMEOUT = 2  # Seconds
+POOL_SIZE = 64  # Keep-alive connections per host
+
+def httpx_installed():
+    """Whether the optional async backend is available, without importing it."""
+    return importlib.util.find_spec("httpx") is not None
+
+def _describe(status_code):
+    return f"Status Code: {status_code}"
+
+class Prober:
+    """Thread-safe HTTP prober with connection pooling and per-target timeouts."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        self.timeout = timeout
+        self._timeouts = {}  # url -> seconds
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def set_timeout(self, url, seconds):
+        """Overrides the timeout for one target URL."""
+        self._timeouts[url] = seconds
+
+    def get(self, url, timeout=None):
+        """Plain GET over the pool. Raises requests exceptions like requests.get."""
+        if timeout is None:
+            timeout = self._timeouts.get(url, self.timeout)
+        return self.session.get(url, timeout=timeout)
+
+    def probe(self, url, timeout=None):
+        """
+        Checks that url answers 200 OK.
+        Returns: (is_healthy: bool, message: str, latency_ms: float)
+        """
+        started = time.perf_counter()
+        try:
+            response = self.get(url, timeout=timeout)
+            latency = (time.perf_counter() - started) * 1000
+            return response.status_code == 200, _describe(response.status_code), latency
+        except requests.ConnectionError:
+            return False, "Connection Refused", (time.perf_counter() - started) * 1000
+        except requests.Timeout:
+            return False, "Request Timed Out", (time.perf_counter() - started) * 1000
+        except Exception as e:
+            return False, str(e), (time.perf_counter() - started) * 1000
+
+    def close(self):
+        self.session.close()
+
+class AsyncProber:
+    """asyncio flavour of Prober, backed by an httpx.AsyncClient."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_size=POOL_SIZE):
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("AsyncProber requires httpx (pip install httpx)") from None
+        self._httpx = httpx
+        self.timeout = timeout
+        self._timeouts = {}
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    def set_timeout(self, url, seconds):
+        self._timeouts[url] = seconds
+
+    async def get(self, url, timeout=None):
+        if timeout is None:
+            timeout = self._timeouts.get(url, self.timeout)
+        return await self.client.get(url, timeout=timeout)
+
+    async def probe(self, url, timeout=None):
+        started = time.perf_counter()
+        try:
+            response = await self.get(url, timeout=timeout)
+            latency = (time.perf_counter() - started) * 1000
+            return response.status_code == 200, _describe(response.status_code), latency
+        except self._httpx.ConnectError:
+            return False, "Connection Refused", (time.perf_counter() - started) * 1000
+        except self._httpx.TimeoutException:
+            return False, "Request Timed Out", (time.perf_counter() - started) * 1000
+        except Exception as e:
+            return False, str(e), (time.perf_counter() - started) * 1000
+
+    async def close(self):
+        await self.client.aclose()
+
+# ============================================================================
+# SHARED INSTANCE
+# ============================================================================
+
+_prober = None
+_prober_lock = threading.Lock()
+
+def get_prober():
+    """Returns the process-wide Prober, creating it on first use."""
+    global _prober
+    if _prober is None:
+        with _prober_lock:
+            if _prober is None:
+                _prober = Prober()
+    return _prober
@@ -0,0 +1,151 @@
+"""
+Readiness - Wait for a freshly started app, and profile how it started
+Right after a spawn (or a standby promotion) the healer polls /health in
+tight exponential steps: the first polls are a couple of milliseconds apart,
+so a fast app is seen the moment it answers, and the gaps grow so that a
+slow one is not hammered while it boots. Nothing is counted as a failed
+probe until the app has answered once or STARTUP_TIMEOUT runs out.
+
+Apps that expose /startup (breakable_app does) report wall-clock marks for
+each boot phase. Together with the spawn time and the first good /health,
+they give a per-phase cold-start profile:
+
+    interpreter     spawn -> first line of the script runs
+    imports         Flask and friends imported
+    routes          routes registered
+    bind            server bound (or, for a standby, promoted)
+    first_response  bound -> first 200 from /health
+
+import_profile() breaks the imports phase down further, by running the
+script's imports under `python -X importtime`.
+"""
+
+import os
+import sys
+import time
+import subprocess
+from dataclasses import dataclass, field
+
+import requests
+
+from monitor import measure_health
+from prober import get_prober
+
+FIRST_STEP = 0.002  # Seconds between the first two polls
+MAX_STEP = 0.1  # Polls never get further apart than this
+STEP_FACTOR = 1.5
+MIN_POLL_TIMEOUT = 0.25  # Seconds one poll may wait for an answer, at first
+
+PHASES = ("interpreter", "imports", "routes", "bind", "first_response")
+# Marks reported by /startup, in boot order: each phase ends at its mark
+MARKS = ("script", "imports", "routes", "bind")
+
+@dataclass
+class Readiness:
+    ok: bool
+    ready_at: float  # time.time() of the first good /health, or of giving up
+    polls: int
+    reason: str = ""
+    phases: dict = field(default_factory=dict)  # phase -> ms, known phases only
+
+    @property
+    def total_ms(self):
+        return sum(self.phases.values())
+
+def wait_ready(url, process, timeout, first_step=FIRST_STEP, max_step=MAX_STEP, cancel=None):
+    """
+    Polls url until it answers 200, the process exits, timeout passes, or
+    the cancel event (a threading.Event) is set.
+    Connections the app hasn't accepted yet fail fast, or queue when the
+    healer owns the socket. A queued poll is answered the moment the app
+    starts serving, but it can't notice the app dying, so each poll may
+    take at most as long as we have already waited (MIN_POLL_TIMEOUT at
+    first): exits at boot are seen quickly and slow /health still passes.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    step = first_step
+    polls = 0
+    message = "no answer"
+    while True:
+        returncode = process.poll()
+        if returncode is not None:
+            return Readiness(False, time.time(), polls, f"Process exited with code {returncode}")
+        now = time.monotonic()
+        if now >= deadline:
+            return Readiness(False, time.time(), polls, f"Not ready after {timeout:g}s ({message})")
+        if cancel is not None and cancel.is_set():
+            return Readiness(False, time.time(), polls, "Cancelled")
+        polls += 1
+        ok, message, _ = measure_health(url, timeout=min(deadline - now, max(MIN_POLL_TIMEOUT, now - started)))
+        if ok:
+            return Readiness(True, time.time(), polls)
+        pause = min(step, max(0.0, deadline - time.monotonic()))
+        if cancel is not None:
+            cancel.wait(pause)
+        else:
+            time.sleep(pause)
+        step = min(max_step, step * STEP_FACTOR)
+
+def fetch_marks(url, timeout=1):
+    """The app's /startup marks ({mark: epoch seconds}), or {} if it has none."""
+    try:
+        response = get_prober().get(url, timeout=timeout)
+        if response.status_code != 200:
+            return {}
+        return {k: float(v) for k, v in response.json().items() if k in MARKS or k == "promoted"}
+    except (requests.RequestException, ValueError, TypeError, AttributeError):
+        return {}
+
+def profile(spawned_at, ready_at, marks):
+    """
+    Phase durations in ms from the spawn time, the app's marks and the time
+    it first answered. Phases whose marks are missing are left out; the time
+    they covered is folded into the next phase that is known.
+    """
+    phases = {}
+    previous = spawned_at
+    for phase, mark in zip(PHASES, MARKS):
+        if mark in marks:
+            phases[phase] = max(0.0, marks[mark] - previous) * 1000
+            previous = marks[mark]
+    # A standby sits bound but idle until it is promoted; that wait isn't startup
+    previous = max(previous, marks.get("promoted", 0.0))
+    phases["first_response"] = max(0.0, ready_at - previous) * 1000
+    return phases
+
+def format_phases(phases):
+    return ", ".join(f"{name.replace('_', ' ')} {ms:.0f}ms" for name, ms in phases.items())
+
+def import_profile(script, python=sys.executable, timeout=60):
+    """
+    Imports script as a module in a fresh interpreter under -X importtime.
+    Returns (total_ms, [(module, cumulative_ms), ...]) for the modules the
+    script imports directly, slowest first.
+    """
+    directory, filename = os.path.split(os.path.abspath(script))
+    name = os.path.splitext(filename)[0]
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {name}"], cwd=directory,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    # Lines look like "import time:  self_us | cumulative_us | <indent>module", and a
+    # module's own imports are listed (one level deeper) just before it
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        module = fields[2].rstrip()
+        rows.append((len(module) - len(module.lstrip()), module.strip(), int(fields[1]) / 1000))
+
+    for i, (depth, module, total_ms) in enumerate(rows):
+        if module == name:
+            direct = []
+            for child_depth, child, ms in reversed(rows[:i]):
+                if child_depth <= depth:
+                    break
+                if child_depth == depth + 2:
+                    direct.append((child, ms))
+            return total_ms, sorted(direct, key=lambda item: item[1], reverse=True)
+    raise RuntimeError(f"Could not import {name}: {result.stderr.strip().splitlines()[-1:]}")
@@ -0,0 +1,198 @@
+"""
+Recovery Policy - Whether, and when, to restart a failed target
+A restart is not always the right answer. An app that dies during boot will
+die again, and restarting it in a tight loop only burns CPU and floods the
+log. Each target gets a RecoveryPolicy that looks at how it failed and how
+often, and answers with a Decision: restart now, restart after a backoff,
+or quarantine.
+
+- Budget: restarts come out of a token bucket (RESTART_BUDGET tokens,
+  refilled over RESTART_BUDGET_WINDOW). An empty bucket quarantines.
+- Backoff: failures of a run that never got ready, or didn't last
+  STABLE_AFTER seconds, are a streak; from the second one on, restarts wait
+  BACKOFF_BASE * 2^n (capped at BACKOFF_MAX, with jitter so that targets
+  failing together don't restart in lockstep).
+- Crash loops: how the process ended matters (see classify_exit). Exiting
+  with the same status code at boot CRASH_LOOP_LIMIT times in a row is
+  deterministic (bad config, bad deploy) and quarantines straight away. A
+  crash on a fatal signal (segfault, abort) may not repeat, so it is
+  retried with backoff for as long as the budget lasts.
+- Quarantine works like an open circuit breaker: no restarts for
+  QUARANTINE_SECONDS, then one probation restart. If that run stays up for
+  STABLE_AFTER the target is back to normal; if not, the next quarantine is
+  twice as long.
+"""
+
+import time
+import random
+import signal
+from dataclasses import dataclass
+
+import config
+
+# Policy states
+ACTIVE = "active"
+QUARANTINED = "quarantined"
+PROBATION = "probation"
+
+# Decisions
+RESTART = "restart"
+QUARANTINE = "quarantine"
+
+# How a failed process ended
+CRASH = "crash"  # Fatal signal: died in native code
+KILLED = "killed"  # SIGKILL: the OOM killer or an operator
+TERMINATED = "terminated"  # Asked to stop by some other signal
+EXIT = "exit"  # Exited on its own with a status code
+UNHEALTHY = "unhealthy"  # Still running, but failed its checks
+
+FATAL_SIGNALS = {getattr(signal, name) for name in ("SIGSEGV", "SIGBUS", "SIGILL", "SIGFPE", "SIGABRT")
+                 if hasattr(signal, name)}
+
+def settings():
+    """config.py's current recovery settings, as RecoveryPolicy/configure() arguments."""
+    return dict(budget=config.RESTART_BUDGET, window=config.RESTART_BUDGET_WINDOW,
+                backoff_base=config.BACKOFF_BASE, backoff_max=config.BACKOFF_MAX,
+                stable_after=config.STABLE_AFTER, crash_loop_limit=config.CRASH_LOOP_LIMIT,
+                quarantine_seconds=config.QUARANTINE_SECONDS)
+
+def classify_exit(returncode):
+    """(kind, detail) for a Popen.returncode; None means still running."""
+    if returncode is None:
+        return UNHEALTHY, "still running"
+    if returncode >= 0:
+        return EXIT, f"exit code {returncode}"
+    try:
+        name = signal.Signals(-returncode).name
+    except ValueError:
+        name = f"signal {-returncode}"
+    if -returncode in FATAL_SIGNALS:
+        return CRASH, name
+    if hasattr(signal, "SIGKILL") and -returncode == signal.SIGKILL:
+        return KILLED, name
+    return TERMINATED, name
+
+@dataclass
+class Decision:
+    action: str  # RESTART or QUARANTINE
+    kind: str  # classify_exit kind
+    detail: str
+    delay: float = 0.0  # Seconds to wait before restarting
+    reason: str = ""  # Why we backed off or quarantined
+
+class RecoveryPolicy:
+    """Restart budget, backoff and quarantine state for one target. Not thread-safe."""
+
+    def __init__(self, budget=config.RESTART_BUDGET, window=config.RESTART_BUDGET_WINDOW,
+                 backoff_base=config.BACKOFF_BASE, backoff_max=config.BACKOFF_MAX,
+                 stable_after=config.STABLE_AFTER, crash_loop_limit=config.CRASH_LOOP_LIMIT,
+                 quarantine_seconds=config.QUARANTINE_SECONDS, now=None):
+        self.budget = budget
+        self.refill_per_second = budget / window
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.crash_loop_limit = crash_loop_limit
+        self.base_quarantine = quarantine_seconds
+
+        now = time.monotonic() if now is None else now
+        self.state = ACTIVE
+        self.tokens = float(budget)
+        self.streak = 0  # Failures in a row of runs that didn't last
+        self.started_at = now  # When the current run started
+        self.quarantine_seconds = quarantine_seconds
+        self.quarantined_until = 0.0
+        self._refilled_at = now
+        self._boot_exit = None  # (code, count) of repeated exits at boot
+
+    def configure(self, budget, window, backoff_base, backoff_max, stable_after,
+                  crash_loop_limit, quarantine_seconds):
+        """
+        New settings (a config reload). The state carries over: tokens are
+        capped at the new budget, and a quarantine under way keeps its end.
+        """
+        self.budget = budget
+        self.refill_per_second = budget / window
+        self.tokens = min(self.tokens, float(budget))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.crash_loop_limit = crash_loop_limit
+        if self.quarantine_seconds == self.base_quarantine:
+            self.quarantine_seconds = quarantine_seconds  # Not doubled by a failed probation
+        self.base_quarantine = quarantine_seconds
+
+    def on_failure(self, returncode, ready, now=None):
+        """A failure was confirmed. ready: whether the failed run ever answered /health."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        kind, detail = classify_exit(returncode)
+        short_lived = not ready or now - self.started_at < self.stable_after
+        self.streak = self.streak + 1 if short_lived else 1
+
+        if kind == EXIT and not ready:
+            code, count = self._boot_exit or (None, 0)
+            self._boot_exit = (returncode, count + 1 if code == returncode else 1)
+        else:
+            self._boot_exit = None
+
+        if self.state == PROBATION and short_lived:
+            self.quarantine_seconds = min(self.quarantine_seconds * 2, config.QUARANTINE_MAX_SECONDS)
+            return self._quarantine(now, kind, detail, f"failed again on probation ({detail})")
+        if self._boot_exit and self._boot_exit[1] >= self.crash_loop_limit:
+            return self._quarantine(now, kind, detail,
+                                    f"crash loop: {detail} at boot {self._boot_exit[1]} times in a row")
+        if self.tokens < 1:
+            return self._quarantine(now, kind, detail,
+                                    f"restart budget exhausted ({self.budget} per "
+                                    f"{self.budget / self.refill_per_second:.0f}s)")
+
+        self.tokens -= 1
+        if self.streak < 2:
+            return Decision(RESTART, kind, detail)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (self.streak - 2))
+        delay *= random.uniform(0.5, 1.0)  # Equal jitter: at least half the step
+        return Decision(RESTART, kind, detail, delay,
+                        f"{self.streak} failures in a row, last: {kind} ({detail})")
+
+    def on_restart(self, now=None):
+        """A new run has started."""
+        self.started_at = time.monotonic() if now is None else now
+
+    def on_healthy(self, now=None):
+        """
+        A probe passed. Ends probation once the run has lasted STABLE_AFTER.
+        Returns True when that happens.
+        """
+        now = time.monotonic() if now is None else now
+        if now - self.started_at < self.stable_after:
+            return False
+        self.streak = 0
+        self._boot_exit = None
+        if self.state == PROBATION:
+            self.state = ACTIVE
+            self.quarantine_seconds = self.base_quarantine
+            return True
+        return False
+
+    def probation_due(self, now=None):
+        now = time.monotonic() if now is None else now
+        return self.state == QUARANTINED and now >= self.quarantined_until
+
+    def release(self, now=None):
+        """Leave quarantine for one probation run, with a fresh budget."""
+        now = time.monotonic() if now is None else now
+        self.state = PROBATION
+        self.tokens = float(self.budget)
+        self._refilled_at = now
+
+    # ------------------------------------------------------------------------
+
+    def _quarantine(self, now, kind, detail, reason):
+        self.state = QUARANTINED
+        self.quarantined_until = now + self.quarantine_seconds
+        return Decision(QUARANTINE, kind, detail, self.quarantine_seconds, reason)
+
+    def _refill(self, now):
+        self.tokens = min(self.budget, self.tokens + (now - self._refilled_at) * self.refill_per_second)
+        self._refilled_at = now
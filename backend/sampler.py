@@ -0,0 +1,202 @@
+"""
+Sampler - What a target's process tree is actually using
+Probes say whether an app answers; the sampler says what it costs. Every
+SAMPLE_INTERVAL the healer samples each target's whole process tree (the
+app, gunicorn workers, anything they spawned) and reports, per process and
+in total:
+
+    cpu_percent      CPU time used since the previous sample / wall time (100 = one core)
+    rss_mb, uss_mb   resident memory, and the part no other process shares
+    threads, fds     thread count, open file descriptors (handles on Windows)
+    read_mb, write_mb  disk I/O since the process started
+    children         processes below the root
+
+Each process is read in a single psutil oneshot() pass, through Process
+handles that are kept from one sample to the next.
+
+SustainedRule turns a metric into a healing rule: it fires once the metric
+has stayed at or above its limit for a while, e.g. CPU pinned by /cpu-burn,
+which no HTTP probe or memory check would ever flag.
+"""
+
+import time
+from dataclasses import dataclass, field
+
+import psutil
+
+import config
+from monitor import get_process
+from event_channel import SAMPLE_VALUES
+
+MB = 1024 * 1024
+
+HAS_FDS = hasattr(psutil.Process, "num_fds")  # POSIX; Windows has num_handles
+HAS_IO = hasattr(psutil.Process, "io_counters")  # Not on macOS
+
+@dataclass
+class ProcessSample:
+    pid: int
+    name: str
+    cpu_percent: float
+    rss_mb: float
+    uss_mb: float
+    threads: int
+    fds: int
+    read_mb: float
+    write_mb: float
+
+@dataclass
+class TreeSample:
+    """One sample of a process tree: the root first, then its descendants."""
+    at: float  # time.monotonic()
+    processes: list = field(default_factory=list)
+    group_cpu_percent: float = None  # The whole cgroup's, from cpu.stat (cgroups.py), if it has one
+
+    @property
+    def cpu_percent(self):
+        if self.group_cpu_percent is not None:
+            return self.group_cpu_percent  # Also counts processes that have left the tree
+        return sum(p.cpu_percent for p in self.processes)
+
+    @property
+    def rss_mb(self):
+        return sum(p.rss_mb for p in self.processes)
+
+    @property
+    def uss_mb(self):
+        return sum(p.uss_mb for p in self.processes)
+
+    @property
+    def threads(self):
+        return sum(p.threads for p in self.processes)
+
+    @property
+    def fds(self):
+        return sum(p.fds for p in self.processes)
+
+    @property
+    def read_mb(self):
+        return sum(p.read_mb for p in self.processes)
+
+    @property
+    def write_mb(self):
+        return sum(p.write_mb for p in self.processes)
+
+    @property
+    def max_cpu_percent(self):
+        """CPU of the busiest single process: one pinned worker, not a busy tree."""
+        return max((p.cpu_percent for p in self.processes), default=0.0)
+
+    @property
+    def children(self):
+        return max(0, len(self.processes) - 1)
+
+    def busiest(self):
+        """The process using the most CPU."""
+        return max(self.processes, key=lambda p: p.cpu_percent)
+
+    def values(self):
+        """The totals, in event_channel.SAMPLE_VALUES order."""
+        return tuple(float(getattr(self, name)) for name in SAMPLE_VALUES)
+
+class ProcessSampler:
+    """Samples one target's process tree. One sample at a time."""
+
+    def __init__(self, uss=config.SAMPLE_USS):
+        self.uss = uss  # USS needs a walk of the memory maps: the priciest part
+        self._handles = {}  # pid -> psutil.Process, the tree as of the last sample
+        self._cpu = {}  # pid -> CPU seconds at the last sample
+        self._sampled_at = None  # time.time() of the last sample
+
+    def sample(self, pid):
+        """Samples pid and everything below it. Raises psutil.NoSuchProcess if pid is gone."""
+        root = get_process(pid)
+        tree = [root] + root.children(recursive=True)
+        now, wall = time.monotonic(), time.time()
+        elapsed = None if self._sampled_at is None else wall - self._sampled_at
+
+        handles, cpu = {}, {}
+        sample = TreeSample(now)
+        for found in tree:
+            # Keep our handle unless the pid now belongs to a different process
+            process = self._handles.get(found.pid)
+            if process is None or process.create_time() != found.create_time():
+                process = found
+            try:
+                result = self._read(process, elapsed, wall, cpu)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                continue  # Exited between the listing and the read
+            handles[process.pid] = process
+            sample.processes.append(result)
+
+        self._handles, self._cpu, self._sampled_at = handles, cpu, wall
+        return sample
+
+    def _read(self, process, elapsed, wall, cpu):
+        with process.oneshot():
+            times = process.cpu_times()
+            memory = process.memory_full_info() if self.uss else process.memory_info()
+            threads = process.num_threads()
+            try:
+                fds = process.num_fds() if HAS_FDS else process.num_handles()
+            except psutil.AccessDenied:
+                fds = 0
+            try:
+                io = process.io_counters() if HAS_IO else None
+            except psutil.AccessDenied:
+                io = None
+            name = process.name()
+            created = process.create_time()
+
+        used = times.user + times.system
+        cpu[process.pid] = used
+        previous = self._cpu.get(process.pid)
+        if previous is None:
+            # New since the last sample: everything it used, it used since then
+            previous = 0.0 if elapsed is not None and created >= wall - elapsed else used
+        cpu_percent = 100 * max(0.0, used - previous) / elapsed if elapsed else 0.0
+
+        return ProcessSample(
+            pid=process.pid,
+            name=name,
+            cpu_percent=cpu_percent,
+            rss_mb=memory.rss / MB,
+            uss_mb=getattr(memory, "uss", 0) / MB,
+            threads=threads,
+            fds=fds,
+            read_mb=io.read_bytes / MB if io else 0.0,
+            write_mb=io.write_bytes / MB if io else 0.0,
+        )
+
+class SustainedRule:
+    """Fires when a TreeSample metric stays at or above limit for sustain_s seconds."""
+
+    def __init__(self, metric, limit, sustain_s, label=None, unit=""):
+        self.metric = metric  # A TreeSample attribute, e.g. "max_cpu_percent"
+        self.limit = limit
+        self.sustain_s = sustain_s
+        self.label = label or metric.replace("_", " ")
+        self.unit = unit
+        self._since = None
+
+    def check(self, sample):
+        """The reason to heal, or None."""
+        value = getattr(sample, self.metric)
+        if value < self.limit:
+            self._since = None
+            return None
+        if self._since is None:
+            self._since = sample.at
+        held = sample.at - self._since
+        if held < self.sustain_s:
+            return None
+        return (f"Sustained {self.label}: {value:.0f}{self.unit} >= "
+                f"{self.limit:g}{self.unit} for {held:.0f}s")
+
+    def reset(self):
+        self._since = None
+
+def default_rules(cpu_limit_percent=config.CPU_LIMIT_PERCENT):
+    """The rules every target gets: for now, one process pinning a core."""
+    return [SustainedRule("max_cpu_percent", cpu_limit_percent, config.CPU_SUSTAIN_SECONDS,
+                          label="CPU", unit="%")]
@@ -0,0 +1,143 @@
+"""
+Scheduling - Adaptive probe intervals
+Decides when a target should be probed next, based on what recent probes saw.
+Shared by the healer's Supervisor and Mission Control's health loop.
+
+- Stable: every clean probe stretches the interval (x STRETCH_FACTOR), up to
+  max_interval, so a healthy target costs a fraction of the probes.
+- Watch: after a burst, while latency is still above its baseline, probe at
+  a quarter of the base interval instead of stretching.
+- Burst: a failed probe, latency trending up, or memory growing drops the
+  interval to burst_interval until BURST_PROBES clean probes in a row.
+- A failure is only confirmed after MAX_RETRIES consecutive failed probes.
+  In burst mode those retries take a fraction of a second.
+"""
+
+import threading
+
+import config
+
+STABLE = "stable"
+BURST = "burst"
+
+STRETCH_FACTOR = 1.5  # Interval growth per clean probe while stable
+BURST_PROBES = 8  # Clean probes in a row before leaving burst mode
+WATCH_DIVISOR = 4  # Elevated-but-clean targets are probed at base / WATCH_DIVISOR
+
+# Latency is trending up when the fast EWMA pulls away from the slow one
+LATENCY_FAST_ALPHA = 0.5
+LATENCY_SLOW_ALPHA = 0.1
+LATENCY_TREND_RATIO = 1.5
+LATENCY_SETTLED_RATIO = 1.2  # Below this the target may be probed less often again
+LATENCY_TREND_MIN_MS = 5  # Ignore jitter on very fast targets
+
+MEMORY_GROWTH_MB = 5  # Growth between two probes that counts as a leak signal
+MEMORY_WATCH_FRACTION = 0.8  # Stay in burst mode above this share of the limit
+
+class ProbeSchedule:
+    """Probe interval and failure count for one target. Thread-safe."""
+
+    def __init__(self, base_interval=config.CHECK_INTERVAL, max_interval=None,
+                 burst_interval=config.BURST_INTERVAL, max_retries=config.MAX_RETRIES,
+                 memory_limit_mb=None):
+        self.base_interval = base_interval
+        self.max_interval = max_interval or config.MAX_CHECK_INTERVAL
+        self.burst_interval = min(burst_interval, base_interval)
+        self.watch_interval = max(self.burst_interval, base_interval / WATCH_DIVISOR)
+        self.max_retries = max(1, max_retries)
+        self.memory_limit_mb = memory_limit_mb
+
+        self.mode = STABLE
+        self.reason = None  # Why we are bursting
+        self.interval = base_interval
+        self.failures = 0  # Consecutive failed probes
+        self.probes = 0
+        self._clean = 0  # Clean probes since the last burst trigger
+        self._fast = None
+        self._slow = None
+        self._memory = None
+        self._lock = threading.Lock()
+
+    def observe(self, ok, latency_ms=None, memory_mb=None):
+        """
+        Records one probe result and picks the next interval.
+        Returns True once a failure is confirmed (max_retries failed probes in a row).
+        """
+        with self._lock:
+            self.probes += 1
+            if ok:
+                self.failures = 0
+                signal = self._latency_signal(latency_ms) or self._memory_signal(memory_mb)
+            else:
+                self.failures += 1
+                signal = "probe failed"
+
+            if signal:
+                self._burst(signal)
+            elif self.mode == BURST:
+                self._clean += 1
+                if self._clean >= BURST_PROBES:
+                    self.mode, self.reason = STABLE, None
+                    self.interval = self.base_interval if self._latency_settled() else self.watch_interval
+            elif self._latency_settled():
+                self.interval = min(self.max_interval, max(self.base_interval, self.interval * STRETCH_FACTOR))
+            else:
+                self.interval = self.watch_interval
+            return self.failures >= self.max_retries
+
+    def burst(self, reason):
+        """Switch to high-frequency probing because of something seen elsewhere."""
+        with self._lock:
+            self._burst(reason)
+
+    def configure(self, base_interval, max_interval, burst_interval, max_retries):
+        """New intervals and retry count (a config reload). A stable target restarts from the new base."""
+        with self._lock:
+            self.base_interval = base_interval
+            self.max_interval = max_interval
+            self.burst_interval = min(burst_interval, base_interval)
+            self.watch_interval = max(self.burst_interval, base_interval / WATCH_DIVISOR)
+            self.max_retries = max(1, max_retries)
+            self.interval = self.burst_interval if self.mode == BURST else base_interval
+
+    def restarted(self):
+        """The target was just restarted: forget its old baselines and watch it closely."""
+        with self._lock:
+            self.failures = 0
+            self._fast = self._slow = self._memory = None
+            self._burst("restarted")
+
+    # ------------------------------------------------------------------------
+
+    def _burst(self, reason):
+        self.mode, self.reason = BURST, reason
+        self.interval = self.burst_interval
+        self._clean = 0
+
+    def _latency_signal(self, latency_ms):
+        if latency_ms is None:
+            return None
+        if self._fast is None:
+            self._fast = self._slow = latency_ms
+            return None
+        self._fast += LATENCY_FAST_ALPHA * (latency_ms - self._fast)
+        self._slow += LATENCY_SLOW_ALPHA * (latency_ms - self._slow)
+        if (self._fast > self._slow * LATENCY_TREND_RATIO
+                and self._fast - self._slow > LATENCY_TREND_MIN_MS):
+            return f"latency rising ({self._slow:.1f}ms -> {self._fast:.1f}ms)"
+        return None
+
+    def _latency_settled(self):
+        return (self._fast is None
+                or self._fast <= self._slow * LATENCY_SETTLED_RATIO
+                or self._fast - self._slow <= LATENCY_TREND_MIN_MS)
+
+    def _memory_signal(self, memory_mb):
+        if memory_mb is None:
+            return None
+        previous, self._memory = self._memory, memory_mb
+        if previous is not None and memory_mb - previous >= MEMORY_GROWTH_MB:
+            return f"memory growing ({previous:.0f}MB -> {memory_mb:.0f}MB)"
+        if self.memory_limit_mb and memory_mb >= self.memory_limit_mb * MEMORY_WATCH_FRACTION:
+            return f"memory near limit ({memory_mb:.0f}MB)"
+        return None
@@ -0,0 +1,123 @@
+"""
+State Store - Copy-on-write telemetry state
+Mission Control state is published as a chain of immutable snapshots.
+Readers grab the current snapshot with a single attribute read and never
+take a lock; writers build the next version off to the side and swap it
+in. Serialized JSON is cached on each snapshot, so however many clients
+ask for /api/status, a given version is only encoded once.
+
+Writers are serialized among themselves only. If the store has an EventLog,
+events published during a write carry sequence numbers that are recorded
+on the resulting snapshot. A snapshot plus its seq is therefore a
+consistent starting point for an SSE subscriber.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from types import MappingProxyType
+
+def freeze(mapping):
+    """Read-only view of a fresh copy of mapping."""
+    return MappingProxyType(dict(mapping))
+
+def append_bounded(items, item, maxlen):
+    """Tuple equivalent of deque(maxlen).append: returns a new tuple."""
+    items = items + (item,)
+    return items[-maxlen:] if len(items) > maxlen else items
+
+def _jsonable(value):
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def to_json(value):
+    """json.dumps that understands frozen mappings. Returns bytes."""
+    return json.dumps(value, default=_jsonable).encode()
+
+class Snapshot:
+    """One immutable version of the state. Field values must not be mutated."""
+
+    __slots__ = ("version", "seq", "_fields", "_cache")
+
+    def __init__(self, version, seq, fields):
+        self.version = version
+        self.seq = seq  # Last event seq published by the write that produced this
+        self._fields = fields
+        self._cache = {}
+
+    def __getitem__(self, name):
+        return self._fields[name]
+
+    def cached(self, key, build):
+        """Memoizes build() for this version. Concurrent first calls may both build; that's harmless."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = build()
+            return value
+
+    def json(self, name):
+        """JSON bytes of one field, encoded at most once per version."""
+        return self.cached(("json", name), lambda: to_json(self._fields[name]))
+
+class Writer:
+    """Accumulates changes for the next snapshot inside StateStore.write()."""
+
+    def __init__(self, current):
+        self.current = current
+        self._changes = {}
+        self._events = []
+
+    def get(self, name):
+        return self._changes.get(name, self.current[name])
+
+    def set(self, name, value):
+        self._changes[name] = value
+
+    def update(self, name, **changes):
+        """Shallow-merges changes into a mapping field."""
+        merged = dict(self.get(name))
+        merged.update(changes)
+        self._changes[name] = MappingProxyType(merged)
+
+    def publish(self, event, payload):
+        """Queues an event to be published when the write commits."""
+        self._events.append((event, payload))
+
+class StateStore:
+    def __init__(self, events=None, **fields):
+        self._events = events
+        self._snapshot = Snapshot(0, events.last_seq if events else 0, dict(fields))
+        self._write_lock = threading.Lock()
+
+    def current(self):
+        """The latest snapshot. Lock-free."""
+        return self._snapshot
+
+    @contextmanager
+    def write(self):
+        """
+        Opens a write. Changes become visible atomically when the block exits:
+
+            with STATE.write() as w:
+                w.update("status", status="HEALTHY")
+                w.publish("status", w.get("status"))
+        """
+        with self._write_lock:
+            writer = Writer(self._snapshot)
+            yield writer
+            if not writer._changes and not writer._events:
+                return
+
+            old = self._snapshot
+            fields = {**old._fields, **writer._changes}
+
+            def swap(seq):
+                self._snapshot = Snapshot(old.version + 1, seq, fields)
+
+            if self._events is not None and writer._events:
+                # Swap inside the publish so subscribers never see an event before its state
+                self._events.publish_many(writer._events, on_commit=swap)
+            else:
+                swap(old.seq)
@@ -0,0 +1,1142 @@
+"""
+Supervisor - Concurrent multi-target healing
+Probes and restarts any number of target apps from a single healer process.
+Every target runs on its own schedule in a shared worker pool, so one hung
+target (slow /health, /timeout, SLOW_MODE) never delays the others.
+
+Crashes are not left to polling: a watcher thread blocks on each child's
+wait() and dispatches recovery the moment it exits.
+
+In hot-spare mode (POSIX) the supervisor owns each target's listening
+socket and keeps a second, fully imported copy of the app parked on it.
+Healing promotes the spare with SIGUSR1 and then stops the old process, so
+the port never closes: connections arriving mid-heal wait in the backlog
+instead of being refused.
+
+With the fork server (zygote.py, POSIX) each target's script is imported
+once by a zygote process, and every start after that is a fork() of it, so
+restarts and spare boots skip interpreter startup and imports.
+
+Whether to restart at all is up to each target's RecoveryPolicy
+(recovery_policy.py): restarts are budgeted, quick repeated failures back
+off, and a target stuck in a crash loop is quarantined instead.
+
+With Target.workers > 0 the app runs under gunicorn instead, and each of
+its workers is checked on its own (workers.py): a worker that leaks or
+hangs is recycled while the others keep serving, and only a master that
+dies or an app that stops answering altogether is restarted. gunicorn
+pre-forks from its own preloaded master, so hot spares and the fork
+server are not used for these targets.
+
+Besides the probes, a sampler thread reads every target's process tree each
+SAMPLE_INTERVAL (sampler.py), reports it, and checks it against the
+target's rules: a process pinning a CPU core for too long is healed just
+like one that leaks. Apps that embed the watchdog (watchdog.py) are also
+read straight from shared memory every WATCHDOG_POLL: a stalled interpreter
+is seen within 50-100ms (later while GIL contention is already delaying
+its heartbeat), a wedged request once it has been in flight WATCHDOG_STALL.
+Its stacks are captured while it is still stuck, and it is healed once it
+has been stuck WATCHDOG_HANG_AFTER (a request: WATCHDOG_REQUEST_HANG_AFTER).
+
+With CGROUPS on (Linux), every app process also runs in a cgroup of its own
+(cgroups.py): the kernel caps its memory and CPU between probes, its memory
+and CPU are read from the group (every process in it, not just the tree
+psutil can walk), and whatever it leaves behind is killed with it.
+
+Every start and restart is gated on readiness (readiness.py) rather than a
+fixed sleep: a new process is not probed until it has answered /health once,
+and its boot is profiled phase by phase. The periodic probes
+remain for problems that are not exits (hangs, leaks, HTTP errors), and
+each target's ProbeSchedule (scheduling.py) spaces them out while it is
+stable and bursts them when it starts to look unwell.
+"""
+
+import os
+import sys
+import json
+import time
+import select
+import signal
+import socket
+import tempfile
+import threading
+import subprocess
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import psutil
+import config
+import event_channel
+from monitor import measure_health, measure_resources
+from scheduling import ProbeSchedule, BURST
+from leak_detector import LeakDetector, format_eta
+from zygote import Zygote
+from cgroups import Cgroups
+from workers import WorkerMonitor, WorkerCheck, WORKERS_SUPPORTED, gunicorn_command, recycle
+from sampler import ProcessSampler, default_rules
+from watchdog import WatchdogMonitor, ENV_DIR as WATCHDOG_DIR_ENV, STALLED
+from recovery_policy import RecoveryPolicy, QUARANTINE, QUARANTINED, UNHEALTHY, EXIT
+from recovery_policy import settings as recovery_settings
+from readiness import wait_ready, fetch_marks, profile, format_phases, import_profile, PHASES
+
+# How often the scheduler looks for targets that are due for a check
+SCHEDULER_TICK = 0.05
+# How long a standby may take to import and build its server
+STANDBY_BOOT_TIMEOUT = 30
+LISTEN_BACKLOG = 1024
+
+HOT_SPARE_SUPPORTED = hasattr(signal, "SIGUSR1") and hasattr(signal, "pthread_sigmask")
+FORK_SERVER_SUPPORTED = hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+# ============================================================================
+# TARGETS
+# ============================================================================
+
+@dataclass
+class Target:
+    """A supervised app plus the runtime state the supervisor keeps for it."""
+    name: str
+    script: str = config.APP_SCRIPT
+    port: int = config.APP_PORT
+    health_url: str = None
+    startup_url: str = None
+    memory_limit_mb: float = config.MEMORY_THRESHOLD_MB
+    cpu_limit_percent: float = config.CPU_LIMIT_PERCENT  # Of one core, for CPU_SUSTAIN_SECONDS
+
+    # Runtime state (owned by the supervisor)
+    process: subprocess.Popen = field(default=None, repr=False)
+    busy: bool = field(default=False, repr=False)
+    next_check: float = field(default=0.0, repr=False)
+    restarts: int = field(default=0, repr=False)
+    last_probe_at: float = field(default=0.0, repr=False)
+    last_probe_ms: float = field(default=0.0, repr=False)
+    expected_exit: subprocess.Popen = field(default=None, repr=False)
+    schedule: ProbeSchedule = field(default=None, repr=False)
+    leak: LeakDetector = field(default=None, repr=False)
+    planned_restart_at: float = field(default=0.0, repr=False)  # Proactive restart, 0 = none
+    policy: RecoveryPolicy = field(default=None, repr=False)
+    ready: bool = field(default=False, repr=False)  # Has answered /health since it was (re)started
+    spawned_at: float = field(default=0.0, repr=False)  # time.time() of the current process' spawn
+    startup: dict = field(default_factory=dict, repr=False)  # Last boot profile, phase -> ms
+    sampler: ProcessSampler = field(default=None, repr=False)
+    resources: object = field(default=None, repr=False)  # Latest sampler.TreeSample
+    rules: list = field(default=None, repr=False)  # sampler.SustainedRule, checked on every sample
+    breach: tuple = field(default=None, repr=False)  # (pid, reason, graceful) to heal next
+    paused: bool = field(default=False, repr=False)  # Checked and reported, but never healed
+    removed: bool = field(default=False, repr=False)  # Dropped through the control plane
+
+    # Watchdog: heartbeats and in-flight requests the app keeps in shared memory
+    watchdog: bool = config.WATCHDOG
+    watchdog_monitor: WatchdogMonitor = field(default=None, repr=False)
+    stalls: dict = field(default_factory=dict, repr=False)  # Stalls already seen, as of the last read
+
+    # Hot spare: a listening socket we own, and a parked copy of the app on it
+    hot_spare: bool = config.HOT_SPARE
+    listener: socket.socket = field(default=None, repr=False)
+    standby: subprocess.Popen = field(default=None, repr=False)
+    standby_spawned_at: float = field(default=0.0, repr=False)
+
+    # Fork server: a preloaded copy of the script that every start is forked from
+    fork_server: bool = config.FORK_SERVER
+    zygote: Zygote = field(default=None, repr=False)
+
+    # Multi-worker: serve with this many gunicorn workers (0 = a single process)
+    workers: int = config.WORKERS
+    worker_monitor: WorkerMonitor = field(default=None, repr=False)
+    workers_recycled: int = field(default=0, repr=False)
+
+    # Recovery timings (time.monotonic), for MTTR reporting
+    exited_at: float = field(default=0.0, repr=False)
+    restart_started_at: float = field(default=0.0, repr=False)
+    restart_finished_at: float = field(default=0.0, repr=False)
+
+    def __post_init__(self):
+        if self.health_url is None:
+            self.health_url = f"http://{config.APP_HOST}:{self.port}/health"
+        if self.startup_url is None:
+            self.startup_url = f"http://{config.APP_HOST}:{self.port}/startup"
+
+def load_targets(path=None):
+    """
+    Loads the list of targets to supervise.
+    With no file configured, returns the single app described in config.py.
+    """
+    path = path or config.TARGETS_FILE
+    if not path:
+        return [Target(name="app")]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    targets = []
+    for i, entry in enumerate(entries):
+        entry.setdefault("name", f"app-{i}")
+        targets.append(Target(**entry))
+    return targets
+
+# ============================================================================
+# PROCESS CONTROL
+# ============================================================================
+
+def listen(target):
+    """The target's listening socket, bound once and handed to every child."""
+    if target.listener is None:
+        # Same exposure as app.run(host="0.0.0.0") in breakable_app
+        sock = socket.create_server(("0.0.0.0", target.port), backlog=LISTEN_BACKLOG)
+        sock.set_inheritable(True)
+        target.listener = sock
+    return target.listener
+
+def start_app(target, standby=False, cgroups=None):
+    """
+    Starts a target application as a subprocess on its own port, in a cgroup
+    of its own if cgroups (a cgroups.Cgroups) is given.
+    With standby=True the app loads and then waits to be promoted; returns
+    (process, ready_fd), where ready_fd becomes readable once it is loaded.
+    """
+    label = "standby" if standby else "App"
+    if target.workers:
+        label = f"App ({target.workers} gunicorn workers)"
+    logging.info(f"🔧 Starting {target.script} [{target.name}] ({label}) on port {target.port}...")
+    env = os.environ.copy()
+    env["PORT"] = str(target.port)
+    if target.watchdog_monitor is not None:
+        env[WATCHDOG_DIR_ENV] = target.watchdog_monitor.directory
+    fds = {}  # Env var -> file descriptor the child gets
+    ready_r = None
+    if target.hot_spare:
+        fds["AXOLOT_LISTEN_FD"] = listen(target).fileno()
+        if standby:
+            ready_r, ready_w = os.pipe()
+            env["AXOLOT_STANDBY"] = "1"
+            fds["AXOLOT_READY_FD"] = ready_w
+
+    process = None
+    if target.workers:
+        process = subprocess.Popen(gunicorn_command(target), env=env)
+    elif target.zygote is not None:
+        try:
+            process = target.zygote.spawn(env, fds)
+        except OSError as e:
+            logging.error(f"❌ [{target.name}] Zygote failed ({e}), starting cold")
+            target.zygote.close()
+            target.zygote = None
+    if process is None:
+        env.update((name, str(fd)) for name, fd in fds.items())
+        # Use sys.executable to ensure we use the same Python interpreter
+        process = subprocess.Popen([sys.executable, target.script], env=env, pass_fds=tuple(fds.values()))
+    if cgroups is not None:
+        try:
+            # gunicorn's workers share the master's group: limits for all of them
+            cgroups.place(process.pid, target.name, target.memory_limit_mb, target.workers or 1)
+        except OSError as e:
+            logging.error(f"❌ [{target.name}] No cgroup for PID {process.pid} ({e}), watching it with psutil")
+    logging.info(f"✅ [{target.name}] {label} started with PID: {process.pid}")
+    if standby:
+        os.close(ready_w)
+        return process, ready_r
+    return process
+
+def stop_app(process):
+    """Stops a target application and everything it spawned."""
+    if process and process.poll() is None:
+        logging.info(f"🛑 Stopping process {process.pid}...")
+        try:
+            parent = psutil.Process(process.pid)
+            for child in parent.children(recursive=True):
+                child.terminate()
+            parent.terminate()
+            process.wait(timeout=3)
+            print("✅ Process stopped.")
+        except psutil.NoSuchProcess:
+            print("⚠️  Process already gone.")
+        except Exception as e:
+            print(f"❌ Error stopping process: {e}")
+            print("🔨 Forcing kill...")
+            process.kill()
+
+# ============================================================================
+# SUPERVISOR
+# ============================================================================
+
+class Supervisor:
+    """
+    Schedules health/resource checks for many targets on a thread pool.
+    A target is never checked twice at once; while one worker is stuck on a
+    slow probe or a restart, the scheduler keeps dispatching the rest.
+    """
+
+    def __init__(self, targets, check_interval=config.CHECK_INTERVAL,
+                 max_workers=None, dry_run=False, verbose=True, events=None, metrics=None):
+        self.targets = list(targets)
+        self.check_interval = check_interval
+        self.dry_run = dry_run  # Observe only, never restart
+        self.verbose = verbose
+        self.events = events  # event_channel.EventEmitter, if the API should hear about us
+        self.metrics = metrics  # metrics.EventMetrics, if we serve our own /metrics
+        # One worker per target means a hung probe can only ever stall itself
+        self.max_workers = max_workers
+        self._pool_size = max_workers or max(1, len(self.targets))
+        self._pool = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix="probe")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._booting = set()  # Targets with a standby on its way up
+        self._watchdog_loop_started = False
+        for target in self.targets:
+            self._prepare(target)
+
+        self.cgroups = None  # cgroups.Cgroups: the kernel enforces limits and does the accounting
+        if config.CGROUPS:
+            try:
+                self.cgroups = Cgroups(config.CGROUP_ROOT)
+            except (OSError, RuntimeError) as e:
+                logging.error(f"❌ No cgroups ({e}), falling back to psutil")
+            else:
+                if self.cgroups.controllers:
+                    logging.info(f"🧱 Apps run in cgroups under {self.cgroups.path}, "
+                                 f"{' and '.join(sorted(self.cgroups.controllers))} limits enforced")
+                else:
+                    logging.info(f"🧱 Apps run in cgroups under {self.cgroups.path}; no memory/cpu "
+                                 f"controller delegated there, so no limits, and memory comes from psutil")
+
+    def _prepare(self, target):
+        """Gives a target the schedule, policy, sampler and monitors it is missing."""
+        if target.workers and not WORKERS_SUPPORTED:
+            logging.error(f"❌ [{target.name}] gunicorn is not available here, serving with one process")
+            target.workers = 0
+        if target.workers:
+            # gunicorn's master is the fork server, and recycles workers itself
+            target.hot_spare = target.fork_server = False
+            if target.worker_monitor is None:
+                target.worker_monitor = WorkerMonitor(target.port, target.memory_limit_mb)
+        target.hot_spare = target.hot_spare and HOT_SPARE_SUPPORTED
+        target.fork_server = target.fork_server and FORK_SERVER_SUPPORTED
+        if target.schedule is None:
+            # Current values rather than the defaults: settings may have been reloaded since
+            target.schedule = ProbeSchedule(self.check_interval, burst_interval=config.BURST_INTERVAL,
+                                            max_retries=config.MAX_RETRIES,
+                                            memory_limit_mb=target.memory_limit_mb)
+        if target.leak is None:
+            target.leak = LeakDetector(target.memory_limit_mb)
+        if target.policy is None:
+            target.policy = RecoveryPolicy(**recovery_settings())
+        if target.sampler is None:
+            target.sampler = ProcessSampler()
+        if target.rules is None:
+            target.rules = default_rules(target.cpu_limit_percent)
+        if target.watchdog and target.watchdog_monitor is None:
+            target.watchdog_monitor = WatchdogMonitor(os.path.join(
+                tempfile.gettempdir(), "axolot-watchdog", f"{os.getpid()}-{target.name}"))
+
+    def start(self):
+        """Starts every target that is not already running."""
+        for target in self.targets:
+            self._start_target(target)
+
+    def _start_target(self, target):
+        if config.IMPORT_PROFILE:
+            threading.Thread(target=self._report_imports, args=(target,),
+                             name=f"imports-{target.name}", daemon=True).start()
+        if target.fork_server:
+            self._start_zygote(target)
+        if target.process is None:
+            self._spawn(target)
+        if target.hot_spare:
+            self._prepare_standby(target)
+        # The first check waits for readiness rather than a fixed delay
+        target.next_check = 0.0
+
+    def tick(self, now=None):
+        """Dispatches a check for every idle target that is due. Never blocks."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            for target in self.targets:
+                if target.busy or now < target.next_check:
+                    continue
+                target.busy = True
+                self._pool.submit(self._cycle, target)
+
+    def run_forever(self):
+        if any(target.process is None for target in self.targets):
+            self.start()
+        threading.Thread(target=self._sample_loop, name="sampler", daemon=True).start()
+        if any(target.watchdog_monitor is not None for target in self.targets):
+            self._start_watchdog_loop()
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(SCHEDULER_TICK)
+
+    def stop(self):
+        self._stop.set()
+
+    def shutdown(self):
+        """Stops the scheduler and every supervised app."""
+        self.stop()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for target in self.targets:
+            self._stop_target(target)
+        if self.cgroups is not None:
+            self.cgroups.close()
+
+    def _stop_target(self, target):
+        """Stops the target's app, its standby and fork server, and lets go of its socket."""
+        target.expected_exit = target.process
+        stop_app(target.process)
+        standby, target.standby = target.standby, None
+        self._discard(standby)
+        if target.listener is not None:
+            target.listener.close()
+            target.listener = None
+        if target.zygote is not None:
+            target.zygote.close()
+            target.zygote = None
+        if target.watchdog_monitor is not None:
+            target.watchdog_monitor.close()
+
+    # ------------------------------------------------------------------------
+    # CONTROL (see control.py)
+    # ------------------------------------------------------------------------
+
+    def find(self, name):
+        """The target called name. Raises KeyError."""
+        for target in self.targets:
+            if target.name == name:
+                return target
+        raise KeyError(name)
+
+    def add_target(self, target):
+        """Starts supervising one more target, without touching the others. Returns it."""
+        with self._lock:
+            if any(other.name == target.name for other in self.targets):
+                raise ValueError(f"A target named {target.name!r} already exists")
+            target.busy = True  # Not dispatched until it has started
+            # A new list, not append: the sampler and watchdog loops iterate it without the lock
+            self.targets = self.targets + [target]
+            if self.max_workers is None and len(self.targets) > self._pool_size:
+                # Still one worker per target; cycles under way finish on the old pool
+                self._pool_size = len(self.targets)
+                old, self._pool = self._pool, ThreadPoolExecutor(max_workers=self._pool_size,
+                                                                 thread_name_prefix="probe")
+                old.shutdown(wait=False)
+        try:
+            self._prepare(target)
+            self._start_target(target)
+        except Exception:
+            with self._lock:
+                self.targets = [other for other in self.targets if other is not target]
+                target.removed = True
+            raise
+        finally:
+            with self._lock:
+                target.busy = False
+                removed = target.removed
+            if removed:
+                self._stop_target(target)
+        if target.watchdog_monitor is not None:
+            self._start_watchdog_loop()
+        logging.info(f"➕ [{target.name}] Added: {target.script} on port {target.port}")
+        self._emit(event_channel.CONTROL, target, pid=target.process.pid, reason="added")
+        return target
+
+    def remove_target(self, name):
+        """Stops supervising a target and stops its app. Returns it."""
+        with self._lock:
+            target = self.find(name)
+            self.targets = [other for other in self.targets if other is not target]
+            busy = target.busy
+            target.removed = True  # Nothing is dispatched or reported for it any more
+        # Its last event, sent without the lock like every other
+        self._emit(event_channel.CONTROL, target, pid=target.process.pid if target.process else 0,
+                   reason="removed")
+        logging.info(f"➖ [{target.name}] Removed, stopping its app")
+        if not busy:
+            self._stop_target(target)  # Otherwise the check under way does, once it is done
+        return target
+
+    def pause(self, name=None):
+        """Stops healing one target (all of them without a name): checks go on, failures are only logged."""
+        return self._set_paused(name, True)
+
+    def resume(self, name=None):
+        """Heals the target(s) again, starting with anything that went wrong while paused."""
+        return self._set_paused(name, False)
+
+    def _set_paused(self, name, paused):
+        targets = [self.find(name)] if name else list(self.targets)
+        for target in targets:
+            if target.paused == paused:
+                continue
+            target.paused = paused
+            if paused:
+                logging.info(f"⏸️  [{target.name}] Healing paused")
+            else:
+                logging.info(f"▶️  [{target.name}] Healing resumed")
+            self._emit(event_channel.CONTROL, target, pid=target.process.pid if target.process else 0,
+                       reason="paused" if paused else "resumed")
+            if not paused:
+                self._check_now(target)
+        return targets
+
+    def reconfigure(self, previous):
+        """
+        Pushes config.py's current values into every target's schedule, policy
+        and limits (settings read at call time need nothing). previous: each
+        changed setting's old value; a target whose own limit still equals the
+        old default follows the new one, a limit set per target is kept.
+        """
+        if "CHECK_INTERVAL" in previous:
+            self.check_interval = config.CHECK_INTERVAL
+        for target in self.targets:
+            target.schedule.configure(self.check_interval, config.MAX_CHECK_INTERVAL,
+                                      config.BURST_INTERVAL, config.MAX_RETRIES)
+            target.policy.configure(**recovery_settings())
+            limits = {}
+            if target.memory_limit_mb == previous.get("MEMORY_THRESHOLD_MB"):
+                limits["memory_limit_mb"] = config.MEMORY_THRESHOLD_MB
+            if target.cpu_limit_percent == previous.get("CPU_LIMIT_PERCENT"):
+                limits["cpu_limit_percent"] = config.CPU_LIMIT_PERCENT
+            if limits or "CPU_SUSTAIN_SECONDS" in previous:
+                self.set_limits(target, **limits)
+            with self._lock:
+                # A shorter interval applies now, not after the long one already scheduled
+                if not target.busy and target.policy.state != QUARANTINED:
+                    target.next_check = min(target.next_check, time.monotonic() + target.schedule.interval)
+        self._emit(event_channel.CONTROL, None, reason="reloaded")
+
+    def set_limits(self, target, memory_limit_mb=None, cpu_limit_percent=None):
+        """New resource limits for a running target."""
+        if memory_limit_mb is not None:
+            target.memory_limit_mb = target.schedule.memory_limit_mb = memory_limit_mb
+            target.leak.limit_mb = memory_limit_mb
+            if target.worker_monitor is not None:
+                target.worker_monitor.memory_limit_mb = memory_limit_mb
+        if cpu_limit_percent is not None:
+            target.cpu_limit_percent = cpu_limit_percent
+        target.rules = default_rules(target.cpu_limit_percent)  # Also picks up CPU_SUSTAIN_SECONDS
+        if memory_limit_mb is not None:
+            for process in (target.process, target.standby):
+                group = self._cgroup(process)
+                if group is not None:
+                    try:
+                        group.limit(memory_limit_mb, target.workers or 1)
+                    except OSError as e:
+                        logging.error(f"❌ [{target.name}] Could not change cgroup limits: {e}")
+
+    def describe(self, target, now=None):
+        """A target's live state and timings, straight from memory."""
+        now = time.monotonic() if now is None else now
+        process, schedule, policy = target.process, target.schedule, target.policy
+        group = self._cgroup(process)
+        running = process is not None and process.poll() is None
+        restarted = target.restart_finished_at >= target.restart_started_at > 0
+        return {
+            "name": target.name,
+            "script": target.script,
+            "port": target.port,
+            "health_url": target.health_url,
+            "pid": process.pid if process else None,
+            "running": running,
+            "ready": target.ready,
+            "paused": target.paused,
+            "checking": target.busy,
+            "uptime_s": round(time.time() - target.spawned_at, 1) if running and target.spawned_at else None,
+            "restarts": target.restarts,
+            "workers": target.workers,
+            "workers_recycled": target.workers_recycled,
+            "standby_pid": target.standby.pid if target.standby else None,
+            "memory_limit_mb": target.memory_limit_mb,
+            "cpu_limit_percent": target.cpu_limit_percent,
+            "schedule": {
+                "mode": schedule.mode,
+                "reason": schedule.reason,
+                "interval_s": round(schedule.interval, 3),
+                "next_check_in_s": round(max(0.0, target.next_check - now), 3),
+                "failures": schedule.failures,
+                "max_retries": schedule.max_retries,
+                "probes": schedule.probes,
+            },
+            "last_probe_ms": round(target.last_probe_ms, 2) if target.last_probe_at else None,
+            "last_probe_age_s": round(now - target.last_probe_at, 2) if target.last_probe_at else None,
+            "policy": {
+                "state": policy.state,
+                "tokens": round(policy.tokens, 2),
+                "budget": policy.budget,
+                "streak": policy.streak,
+                "probation_in_s": (round(max(0.0, policy.quarantined_until - now), 1)
+                                   if policy.state == QUARANTINED else None),
+            },
+            # MTTR of the last restart: from the exit (if it exited) and from the decision to restart
+            "last_recovery_ms": (round((target.restart_finished_at - target.exited_at) * 1000, 1)
+                                 if restarted and target.restart_finished_at >= target.exited_at > 0 else None),
+            "last_restart_ms": (round((target.restart_finished_at - target.restart_started_at) * 1000, 1)
+                                if restarted else None),
+            "planned_restart_in_s": (round(max(0.0, target.planned_restart_at - now), 1)
+                                     if target.planned_restart_at else None),
+            "startup_ms": {phase: round(ms, 1) for phase, ms in target.startup.items()},
+            "resources": ({name: round(value, 2) for name, value
+                           in zip(event_channel.SAMPLE_VALUES, target.resources.values())}
+                          if target.resources is not None else None),
+            "cgroup": group.describe() if group is not None else None,
+        }
+
+    def _heals(self, target):
+        return not (self.dry_run or target.paused)
+
+    # ------------------------------------------------------------------------
+    # EXIT NOTIFICATION
+    # ------------------------------------------------------------------------
+
+    def _spawn(self, target, process=None):
+        """Starts (or adopts an already running) process as the target's app."""
+        if process is None:
+            target.spawned_at = time.time()
+            process = start_app(target, cgroups=self.cgroups)
+        target.process = process
+        target.ready = False
+        threading.Thread(
+            target=self._watch_exit, args=(target, process),
+            name=f"exit-{target.name}", daemon=True,
+        ).start()
+        return process
+
+    def _watch_exit(self, target, process):
+        """Blocks until the child exits, then asks for recovery straight away."""
+        returncode = process.wait()
+        group = self._cgroup(process)
+        oom_kills = group.oom_kills() if group is not None else 0
+        if group is not None:
+            self.cgroups.release(process.pid)  # Along with anything it left behind
+        if self._stop.is_set() or process is target.expected_exit:
+            return  # We stopped it on purpose
+
+        target.exited_at = time.monotonic()
+        reason = ""
+        if oom_kills:
+            reason = (f"OOM-killed by the kernel at memory.max "
+                      f"({target.memory_limit_mb * config.CGROUP_MEMORY_MAX:.0f}MB)")
+        logging.info(f"💀 [{target.name}] PID {process.pid} exited with code {returncode}"
+                     + (f": {reason}" if reason else ""))
+        self._emit(event_channel.EXIT, target, pid=process.pid, code=returncode, ok=False, reason=reason)
+        self._check_now(target)  # If a check is already running it will notice the exit itself
+
+    def _cgroup(self, process):
+        """The process' cgroup, if it has one."""
+        if self.cgroups is None or process is None:
+            return None
+        return self.cgroups.get(process.pid)
+
+    def _discard(self, process):
+        """Stops a process no exit watcher waits on (a standby), and removes its cgroup."""
+        stop_app(process)
+        if process is not None and self.cgroups is not None:
+            self.cgroups.release(process.pid)
+
+    def _check_now(self, target):
+        with self._lock:
+            target.next_check = 0.0
+            if not target.busy and not target.removed:
+                # Dispatch directly instead of waiting for the next scheduler tick
+                target.busy = True
+                self._pool.submit(self._cycle, target)
+
+    # ------------------------------------------------------------------------
+    # RESOURCE SAMPLING
+    # ------------------------------------------------------------------------
+
+    def _sample_loop(self):
+        while not self._stop.wait(config.SAMPLE_INTERVAL):
+            for target in self.targets:
+                try:
+                    self.sample(target)
+                except Exception as e:
+                    logging.error(f"❌ [{target.name}] Error while sampling: {e}")
+
+    def sample(self, target):
+        """Samples the target's process tree, reports it and checks it against its rules."""
+        process = target.process
+        if process is None or process.poll() is not None or target.policy.state == QUARANTINED:
+            return None
+        try:
+            sample = target.sampler.sample(process.pid)
+        except psutil.NoSuchProcess:
+            return None  # The exit watcher has it
+        group = self._cgroup(process)
+        if group is not None:
+            # Every process in the group, including any that left the tree
+            sample.group_cpu_percent = group.cpu_percent(sample.at)
+        target.resources = sample
+        self._emit(event_channel.SAMPLE, target, pid=process.pid, code=len(sample.processes),
+                   values=sample.values())
+
+        if not target.ready or target.breach is not None:
+            return sample  # Booting is allowed to be busy; a breach is already being handled
+        for rule in target.rules:
+            reason = rule.check(sample)
+            if reason:
+                rule.reset()
+                logging.info(f"🔥 [{target.name}] {reason} (PID {sample.busiest().pid})")
+                target.breach = (sample.busiest().pid, reason, True)
+                self._check_now(target)
+                break
+        return sample
+
+    # ------------------------------------------------------------------------
+    # WATCHDOG
+    # ------------------------------------------------------------------------
+
+    def _start_watchdog_loop(self):
+        with self._lock:
+            if self._watchdog_loop_started:
+                return
+            self._watchdog_loop_started = True
+        threading.Thread(target=self._watchdog_loop, name="watchdog", daemon=True).start()
+
+    def _watchdog_loop(self):
+        while not self._stop.wait(config.WATCHDOG_POLL):
+            for target in self.targets:
+                if target.watchdog_monitor is None:
+                    continue
+                try:
+                    self.watch(target)
+                except Exception as e:
+                    logging.error(f"❌ [{target.name}] Error while reading the watchdog: {e}")
+
+    def watch(self, target):
+        """Reads the target's heartbeats. Captures stacks for new stalls; heals hangs."""
+        process = target.process
+        if (process is None or process.poll() is not None or not target.ready
+                or target.breach is not None or target.policy.state == QUARANTINED):
+            return
+        monitor = target.watchdog_monitor
+        seen = {}  # Stall -> whether it is in one of the target's serving processes
+        for stall in monitor.check():
+            key = (stall.pid, stall.kind, stall.since)
+            if key in target.stalls:
+                seen[key] = target.stalls[key]
+            else:
+                # Only serving processes count: not a standby, or one on its way out
+                seen[key] = self._owns(target, stall.pid)
+                if seen[key]:
+                    monitor.capture(stall)  # Evidence now, while it is still stuck
+                    if stall.kind == STALLED:
+                        logging.info(f"🧊 [{target.name}] PID {stall.pid} stalled: {stall.detail}")
+                        self._emit(event_channel.HANG, target, pid=stall.pid, code=0, ok=False,
+                                   reason=stall.detail, duration_ms=stall.age * 1000)
+            # Never on first sight: a hang is a stall some earlier read already saw
+            hang_after = (config.WATCHDOG_HANG_AFTER if stall.kind == STALLED
+                          else config.WATCHDOG_REQUEST_HANG_AFTER)
+            if key in target.stalls and seen[key] and stall.age >= hang_after and target.breach is None:
+                report = monitor.report(target.name, stall)
+                logging.info(f"🧊 [{target.name}] PID {stall.pid} hung: {stall.detail}. "
+                             f"Stacks saved to {report}")
+                self._emit(event_channel.HANG, target, pid=stall.pid, code=1, ok=False,
+                           reason=f"{stall.detail} (stacks: {report})", duration_ms=stall.age * 1000)
+                target.breach = (stall.pid, f"Hung: {stall.detail}", False)
+                self._check_now(target)
+        if target.breach is not None:
+            # Reported: none of that process' stalls count again while the heal is under way
+            hung = target.breach[0]
+            seen = {key: owned and key[0] != hung for key, owned in seen.items()}
+        target.stalls = seen
+
+    @staticmethod
+    def _owns(target, pid):
+        """pid is the target's process, or (under gunicorn) one of its workers."""
+        if pid == target.process.pid:
+            return True
+        try:
+            return bool(target.workers) and psutil.Process(pid).ppid() == target.process.pid
+        except psutil.NoSuchProcess:
+            return False
+
+    # ------------------------------------------------------------------------
+
+    def probe(self, target):
+        """
+        Runs the HTTP and resource checks for one target.
+        Returns (ok, reason, confirmed): confirmed means act on it now. A dead
+        process or a resource breach always is; an HTTP failure only once it
+        has repeated MAX_RETRIES times in a row.
+        """
+        started = time.monotonic()
+
+        # 0. A dead child needs no probing
+        returncode = target.process.poll()
+        if returncode is not None:
+            reason = f"Process exited with code {returncode}"
+            self._emit(event_channel.PROBE, target, pid=target.process.pid, ok=False, reason=reason)
+            return False, reason, True
+
+        # A sampler rule fired: a worker is recycled on its own, anything else is a failure
+        breach, target.breach = target.breach, None
+        if breach is not None:
+            pid, reason, graceful = breach
+            if not (target.workers and pid != target.process.pid):
+                self._emit(event_channel.PROBE, target, pid=target.process.pid, ok=False, reason=reason)
+                return False, reason, True
+            if self._heals(target):
+                self._recycle_worker(target, WorkerCheck(pid, False, reason, hung=not graceful))
+
+        # 1. Check HTTP Health
+        is_healthy_http, http_msg, latency_ms = measure_health(target.health_url)
+
+        # 2. Check Resources (CPU/RAM)
+        # If it crashed externally, the process object may be stale; psutil handles validation.
+        if target.workers:
+            is_healthy_res, res_msg, memory_mb = self._check_workers(target)
+        else:
+            is_healthy_res, res_msg, memory_mb = self._measure_resources(target)
+
+        target.last_probe_ms = (time.monotonic() - started) * 1000
+        target.last_probe_at = time.monotonic()
+
+        # 3. Project the memory trend forward (one process' trend: workers are
+        # recycled one by one on their own limit instead)
+        projection = None
+        if memory_mb is not None and not target.workers:
+            target.leak.add(target.last_probe_at, memory_mb)
+            projection = target.leak.projection()
+            self._plan_restart(target, projection)
+
+        if self.verbose:
+            print(f"🔍 [{target.name}] "
+                  f"HTTP: {'✅' if is_healthy_http else '❌'} ({http_msg}) | "
+                  f"RES: {'✅' if is_healthy_res else '❌'} ({res_msg})")
+
+        retries_exhausted = target.schedule.observe(
+            is_healthy_http, latency_ms if is_healthy_http else None, memory_mb)
+
+        ok, reason, confirmed = True, res_msg, False
+        if not is_healthy_res:
+            ok, reason, confirmed = False, res_msg, True
+        elif not is_healthy_http:
+            ok, reason, confirmed = False, http_msg, retries_exhausted
+        elif target.planned_restart_at and time.monotonic() >= target.planned_restart_at:
+            # Healthy for now, but not for long: restart on our schedule, not the leak's
+            ok, reason, confirmed = False, (f"Proactive restart: memory projected to reach "
+                                            f"{target.memory_limit_mb}MB in {format_eta(projection[1])}"), True
+
+        slope, eta = projection if projection else (0.0, -1.0)
+        self._emit(event_channel.PROBE, target, pid=target.process.pid, ok=ok,
+                   duration_ms=target.last_probe_ms, reason=reason,
+                   values=(memory_mb or 0.0, slope, eta))
+        return ok, reason, confirmed
+
+    def _measure_resources(self, target):
+        """
+        measure_resources(), from the cgroup's anonymous memory (its every
+        process, without page cache) when there is one. Only single-process
+        targets: a workers target is checked worker by worker (_check_workers).
+        """
+        group = self._cgroup(target.process)
+        memory_mb = group.memory_mb() if group is not None else None
+        if memory_mb is None:
+            return measure_resources(target.process.pid, target.memory_limit_mb)
+        if memory_mb > target.memory_limit_mb:
+            return False, f"High Memory Usage: {memory_mb:.2f}MB > {target.memory_limit_mb}MB (cgroup)", memory_mb
+        return True, f"Memory Usage: {memory_mb:.2f}MB (cgroup)", memory_mb
+
+    def _check_workers(self, target):
+        """
+        Checks the gunicorn master, then each worker on its own, recycling any
+        that leak or hang. Only a dead master fails the target's resource check.
+        Returns (is_healthy, message, memory_mb of the largest worker).
+        """
+        is_healthy, message, _ = measure_resources(target.process.pid, target.memory_limit_mb)
+        if not is_healthy and target.process.poll() is not None:
+            return is_healthy, message, None
+
+        checks = target.worker_monitor.check(target.process.pid)
+        for check in checks:
+            if not check.ok and self._heals(target) and not self._stop.is_set():
+                self._recycle_worker(target, check)
+        memory_mb = max((check.memory_mb for check in checks), default=0.0)
+        sick = sum(not check.ok for check in checks)
+        message = f"{len(checks)} workers, largest {memory_mb:.2f}MB"
+        if sick:
+            message += f", {sick} sick"
+        return True, message, memory_mb
+
+    def _recycle_worker(self, target, check):
+        """Replaces one sick gunicorn worker; the rest keep serving."""
+        logging.info(f"♻️  [{target.name}] Recycling worker PID {check.pid}: {check.reason}")
+        stop_ms = recycle(check.pid, graceful=not check.hung)
+        target.workers_recycled += 1
+        target.schedule.burst(f"worker {check.pid} recycled")  # Watch its replacement closely
+        self._emit(event_channel.WORKER_RECYCLE, target, pid=check.pid, code=target.workers_recycled,
+                   ok=True, reason=check.reason, duration_ms=stop_ms)
+
+    def _plan_restart(self, target, projection):
+        """Schedules (or cancels) a proactive restart from the memory projection."""
+        if projection is None or projection[1] > config.LEAK_RESTART_HORIZON:
+            if target.planned_restart_at:
+                logging.info(f"✅ [{target.name}] Memory trend eased, proactive restart cancelled")
+            target.planned_restart_at = 0.0
+            return
+
+        slope, eta = projection
+        delay = max(0.0, eta - config.LEAK_RESTART_MARGIN)
+        if not target.planned_restart_at:
+            logging.info(f"📈 [{target.name}] Memory leak: +{slope:.2f}MB/s, limit in {format_eta(eta)}. "
+                         f"Restart scheduled in {format_eta(delay)}")
+        target.planned_restart_at = time.monotonic() + delay
+
+    def recover(self, target, reason):
+        """A failure is confirmed: restart, back off first, or quarantine, as the policy says."""
+        if self.dry_run:
+            self.heal(target, reason)  # Only reports
+            return
+        decision = target.policy.on_failure(target.process.poll(), target.ready)
+        if decision.kind not in (UNHEALTHY, EXIT):
+            reason = f"{reason} ({decision.detail} {decision.kind})"
+        if decision.action == QUARANTINE:
+            self._quarantine(target, reason, decision)
+            return
+        if decision.delay:
+            logging.info(f"⏸️  [{target.name}] Backing off {decision.delay:.1f}s before restarting: "
+                         f"{decision.reason}")
+            self._emit(event_channel.BACKOFF, target, pid=target.process.pid, code=target.policy.streak,
+                       ok=False, reason=decision.reason, duration_ms=decision.delay * 1000)
+            if self._stop.wait(decision.delay):
+                return
+        self.heal(target, reason)
+        self._restarted(target)
+
+    def _restarted(self, target):
+        """Fresh state for a fresh process."""
+        target.policy.on_restart()
+        target.schedule.restarted()
+        target.leak.reset()
+        target.planned_restart_at = 0.0
+        target.breach = None
+        target.stalls = {}
+        for rule in target.rules:
+            rule.reset()
+
+    def _quarantine(self, target, reason, decision):
+        """Stop restarting the target (and stop what's left of it) until probation."""
+        logging.error(f"🚫 [{target.name}] QUARANTINED after: {reason}. {decision.reason}; "
+                      f"probation restart in {format_eta(decision.delay)}")
+        target.expected_exit = target.process
+        stop_app(target.process)
+        self._discard(self._take_standby(target))
+        self._emit(event_channel.QUARANTINE, target, pid=target.process.pid, ok=False,
+                   reason=decision.reason, duration_ms=decision.delay * 1000)
+
+    def _probation(self, target):
+        target.policy.release()
+        logging.info(f"🧪 [{target.name}] Quarantine over, trying a probation restart")
+        self._emit(event_channel.QUARANTINE, target, pid=target.process.pid, ok=True,
+                   reason="probation restart")
+        self.heal(target, "Probation restart after quarantine")
+        self._restarted(target)
+
+    def heal(self, target, reason):
+        """RECOVERY ACTION: Restart the target."""
+        logging.info(f"🚨 HEALER ACTIVATED! Issue Detected. [{target.name}] Reason: {reason}")
+        if self.dry_run or self._stop.is_set() or target.removed:
+            return
+
+        target.restart_started_at = time.monotonic()
+        self._emit(event_channel.RESTART_START, target, pid=target.process.pid, ok=False, reason=reason)
+        old = target.process
+        target.expected_exit = old
+
+        standby = self._take_standby(target)
+        if standby is not None:
+            # Start the spare accepting first, then retire the old process
+            standby.send_signal(signal.SIGUSR1)
+            self._spawn(target, standby)
+            target.spawned_at = target.standby_spawned_at
+            stop_app(old)
+            print(f"🔀 [{target.name}] Promoted standby PID {standby.pid}")
+        else:
+            stop_app(old)
+            self._spawn(target)
+        target.restarts += 1
+
+        ready = self._await_ready(target, promoted=standby is not None).ok
+        target.restart_finished_at = time.monotonic()
+        self._emit(event_channel.RESTART_FINISH, target, pid=target.process.pid,
+                   code=target.restarts, ok=ready, reason=reason,
+                   duration_ms=(target.restart_finished_at - target.restart_started_at) * 1000)
+        if target.hot_spare:
+            self._prepare_standby(target)  # Brings the zygote back too, if it died
+        elif target.fork_server and target.zygote is None:
+            self._start_zygote(target)
+
+    def _await_ready(self, target, promoted=False):
+        """
+        Waits for a just-started (or just-promoted) process to answer /health,
+        then records and reports its boot profile. Returns the Readiness.
+        """
+        started = time.time()
+        result = wait_ready(target.health_url, target.process, config.STARTUP_TIMEOUT, cancel=self._stop)
+        target.ready = result.ok
+        duration_ms = (result.ready_at - started) * 1000
+        if not result.ok:
+            logging.info(f"⚠️  [{target.name}] {result.reason}")
+        else:
+            marks = fetch_marks(target.startup_url) if target.startup_url else {}
+            result.phases = profile(target.spawned_at or started, result.ready_at, marks)
+            target.startup = result.phases
+            if promoted:
+                logging.info(f"⏱️  [{target.name}] Standby answering after {duration_ms:.0f}ms "
+                             f"({result.polls} polls); its cold start: {format_phases(result.phases)}")
+            else:
+                logging.info(f"⏱️  [{target.name}] Ready in {result.total_ms:.0f}ms "
+                             f"({result.polls} polls): {format_phases(result.phases)}")
+        self._emit(event_channel.STARTUP, target, pid=target.process.pid, code=int(promoted),
+                   ok=result.ok, reason=result.reason, duration_ms=duration_ms,
+                   values=tuple(result.phases.get(phase, -1.0) for phase in PHASES))
+        return result
+
+    # ------------------------------------------------------------------------
+    # HOT SPARE
+    # ------------------------------------------------------------------------
+
+    def _prepare_standby(self, target):
+        """Boots a parked spare for the target in the background."""
+        with self._lock:
+            if target.name in self._booting or target.standby is not None:
+                return
+            self._booting.add(target.name)
+        threading.Thread(target=self._boot_standby, args=(target,),
+                         name=f"standby-{target.name}", daemon=True).start()
+
+    def _boot_standby(self, target):
+        process = None
+        try:
+            if target.fork_server and target.zygote is None:
+                self._start_zygote(target)
+            spawned_at = time.time()
+            process, ready_fd = start_app(target, standby=True, cgroups=self.cgroups)
+            try:
+                ready, _, _ = select.select([ready_fd], [], [], STANDBY_BOOT_TIMEOUT)
+                loaded = bool(ready) and os.read(ready_fd, 16) == b"ready"
+            finally:
+                os.close(ready_fd)
+
+            if not loaded or self._stop.is_set() or target.removed:
+                if not (self._stop.is_set() or target.removed):
+                    logging.error(f"❌ [{target.name}] Standby PID {process.pid} failed to load")
+                self._discard(process)
+                process.kill()
+                return
+            with self._lock:
+                target.standby = process
+                target.standby_spawned_at = spawned_at
+            logging.info(f"🅿️  [{target.name}] Standby PID {process.pid} parked and ready")
+        except Exception as e:
+            logging.error(f"❌ [{target.name}] Could not start standby: {e}")
+            if process is not None:
+                process.kill()
+                self._discard(process)
+        finally:
+            with self._lock:
+                self._booting.discard(target.name)
+
+    def _report_imports(self, target):
+        try:
+            total_ms, modules = import_profile(target.script)
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            logging.error(f"❌ [{target.name}] Import profile failed: {e}")
+            return
+        slowest = ", ".join(f"{name} {ms:.0f}ms" for name, ms in modules[:5])
+        logging.info(f"📦 [{target.name}] Imports take {total_ms:.0f}ms: {slowest}")
+
+    def _start_zygote(self, target):
+        """Preloads the target's script in a fork server. Cold starts are the fallback."""
+        with self._lock:
+            if target.zygote is not None and not target.zygote.lost:
+                return
+        try:
+            server = Zygote(target.script)
+        except (OSError, RuntimeError) as e:
+            logging.error(f"❌ [{target.name}] No fork server, starting cold: {e}")
+            return
+        with self._lock:
+            if self._stop.is_set() or target.removed:
+                server.close()
+                return
+            previous, target.zygote = target.zygote, server
+        if previous is not None:
+            previous.close()
+        logging.info(f"🧬 [{target.name}] Fork server PID {server.process.pid} preloaded "
+                     f"{os.path.basename(target.script)} in {server.preload_ms:.0f}ms")
+
+    def _take_standby(self, target):
+        """Claims the parked spare, if there is a live one."""
+        with self._lock:
+            standby, target.standby = target.standby, None
+        if standby is not None and standby.poll() is None:
+            return standby
+        return None
+
+    def _emit(self, type_, target, **fields):
+        """
+        Reports an event about target (None: about the healer as a whole).
+        Once a target is removed, only the event saying so goes out.
+        """
+        if self.events is None and self.metrics is None:
+            return
+        if (target is not None and target.removed
+                and (type_ != event_channel.CONTROL or fields.get("reason") != "removed")):
+            return
+        event = event_channel.Event(type_, target.name if target else "", timestamp=time.time(), **fields)
+        if self.events is not None:
+            self.events.send(event)
+        if self.metrics is not None:
+            self.metrics.record(event)
+
+    def _cycle(self, target):
+        mode = target.schedule.mode
+        try:
+            if self._stop.is_set() or target.removed:
+                return
+            if target.policy.state == QUARANTINED:
+                if target.policy.probation_due() and not target.paused:
+                    self._probation(target)
+                return
+            if target.ready:
+                healthy, reason, confirmed = self.probe(target)
+            else:
+                # Started but never answered yet: give it the whole startup window
+                readiness = self._await_ready(target)
+                healthy, reason, confirmed = readiness.ok, readiness.reason, not readiness.ok
+            if target.schedule.mode != mode and self.verbose:
+                if target.schedule.mode == BURST:
+                    print(f"📈 [{target.name}] Burst probing: {target.schedule.reason}")
+                else:
+                    print(f"📉 [{target.name}] Stable again, easing off probes")
+            if confirmed and target.paused:
+                logging.info(f"⏸️  [{target.name}] Healing paused, not acting on: {reason}")
+            elif confirmed:
+                self.recover(target, reason)
+            elif not healthy:
+                logging.info(f"⚠️  [{target.name}] Check failed "
+                             f"({target.schedule.failures}/{target.schedule.max_retries}): {reason}")
+            elif target.policy.on_healthy():
+                logging.info(f"✅ [{target.name}] Stable after probation, back to normal")
+        except Exception as e:
+            logging.error(f"❌ [{target.name}] Error during check: {e}")
+        finally:
+            delay = target.schedule.interval
+            if target.planned_restart_at:
+                delay = min(delay, max(0.0, target.planned_restart_at - time.monotonic()))
+            with self._lock:
+                if target.paused:
+                    target.next_check = time.monotonic() + delay  # Even if it is down: nothing to do about it
+                elif target.policy.state == QUARANTINED:
+                    target.next_check = target.policy.quarantined_until
+                elif target.breach is not None:
+                    target.next_check = 0.0  # Came in while we were busy
+                elif target.process.poll() is None:
+                    target.next_check = time.monotonic() + delay
+                else:
+                    target.next_check = 0.0  # Exited while we were busy
+                target.busy = False
+                removed = target.removed
+            if removed:
+                self._stop_target(target)  # Removed while we were busy: our turn to clean up
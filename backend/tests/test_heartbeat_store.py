@@ -0,0 +1,76 @@
+"""
+Heartbeat store rollups (heartbeat_store.py) across a restart, clean or not.
+
+Usage:
+    python -m pytest tests/test_heartbeat_store.py
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from heartbeat_store import HeartbeatStore
+
+HOUR = 60 * 60 * 1000
+START = 1000 * HOUR  # On an hour boundary, so both minutes fall in one 1h bucket
+INTERVAL = 500  # ms between heartbeats, as the health loop runs
+
+class RestartTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def fill(self, store, first_ms, latency):
+        """A minute of heartbeats from first_ms, every one at latency."""
+        for i in range(60 * 1000 // INTERVAL):
+            store.append(first_ms + i * INTERVAL, latency, 50.0, 5.0, True)
+
+    def restart(self, clean):
+        store = HeartbeatStore(self.directory)
+        self.fill(store, START, 10.0)
+        if clean:
+            store.close()
+        # Otherwise a crash: every row is already on disk, the open buckets are not
+        store = HeartbeatStore(self.directory)
+        self.fill(store, START + 60 * 1000, 20.0)
+        store.close()
+        return store
+
+    def check(self, store):
+        """The rollups close() left on disk."""
+        rollups = lambda resolution: store.query(START, START + HOUR, resolution)["columns"]
+        hours = rollups("1h")
+        self.assertEqual(hours["ts"], [START])
+        self.assertEqual(hours["count"], [240])
+        self.assertAlmostEqual(hours["latency_avg"][0], 15.0)
+
+        minutes = rollups("1m")
+        self.assertEqual(minutes["ts"], [START, START + 60 * 1000])
+        self.assertEqual(minutes["count"], [120, 120])
+        self.assertEqual([round(avg, 3) for avg in minutes["latency_avg"]], [10.0, 20.0])
+
+        seconds = rollups("1s")
+        self.assertEqual(len(seconds["ts"]), 120)
+        self.assertEqual(set(seconds["count"]), {2})
+
+    def test_clean_restart_keeps_open_buckets(self):
+        self.check(self.restart(clean=True))
+
+    def test_crash_keeps_open_buckets(self):
+        self.check(self.restart(clean=False))
+
+    def test_reopening_twice_does_not_duplicate_buckets(self):
+        self.restart(clean=True)
+        store = HeartbeatStore(self.directory)
+        store.close()
+        self.check(store)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Watchdog stall detection (watchdog.py), on its own and across a hot-spare
+promotion in a real Supervisor.
+
+Usage:
+    python -m pytest tests/test_watchdog.py
+"""
+
+import os
+import sys
+import time
+import socket
+import shutil
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import config
+import event_channel
+import watchdog
+from watchdog import WatchdogMonitor, HeartbeatReader, STALLED, _BEAT, _BEAT_OFFSET
+from supervisor import Supervisor, Target, HOT_SPARE_SUPPORTED
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class Recorder:
+    """Stands in for an EventEmitter: keeps what the supervisor sends."""
+
+    def __init__(self):
+        self.events = []
+
+    def send(self, event):
+        self.events.append(event)
+
+class MonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.heartbeat = watchdog.Heartbeat(self.directory)
+        self.monitor = WatchdogMonitor(self.directory, stall=0.05, polls=3)
+
+    def tearDown(self):
+        self.monitor.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stalled(self, now):
+        return [stall for stall in self.monitor.check(now) if stall.kind == STALLED]
+
+    def test_zeroed_beat_is_not_a_stall(self):
+        _BEAT.pack_into(self.heartbeat._map, _BEAT_OFFSET, 0, 0.0)
+        now = time.monotonic() + 3600
+        for _ in range(10):
+            self.assertEqual(self.stalled(now), [])
+
+    def test_stall_needs_the_same_beat_across_polls(self):
+        self.heartbeat.beat()
+        now = time.monotonic() + 1
+        self.assertEqual(self.stalled(now), [])  # First sight
+        self.assertEqual(self.stalled(now), [])
+        self.assertEqual(self.stalled(now), [])
+        self.assertEqual(len(self.stalled(now)), 1)
+        self.heartbeat.beat()
+        self.assertEqual(self.stalled(now), [])  # It moved: start over
+
+    def test_beat_before_the_reader_counts_from_the_reader(self):
+        self.heartbeat.beat()
+        time.sleep(0.1)
+        self.monitor.check()  # Opens the reader, well after that beat
+        reader = self.monitor._readers[os.getpid()]
+        for _ in range(3):
+            self.monitor.check(reader.opened + 0.01)
+        # Stale by 100ms against the beat, but only 10ms since we started watching
+        self.assertEqual(self.stalled(reader.opened + 0.01), [])
+        stalls = self.stalled(reader.opened + 0.06)
+        self.assertEqual([stall.since for stall in stalls], [reader.opened])
+
+    def test_deadline_follows_the_beat_cadence(self):
+        self.heartbeat.beat()
+        self.monitor.check()
+        reader = self.monitor._readers[os.getpid()]
+        self.assertEqual(self.monitor.deadline(reader), 0.05)  # No gap seen yet: the floor
+        time.sleep(0.1)  # A beat held up, as GIL contention does
+        self.heartbeat.beat()
+        self.assertGreaterEqual(self.monitor.deadline(reader), self.monitor.factor * 0.1)
+        now = self.heartbeat._last + 0.1  # Late by the gap the app just saw: not a stall yet
+        for _ in range(5):
+            self.assertEqual(self.stalled(now), [])
+        self.assertEqual(len(self.stalled(now + self.monitor.deadline(reader))), 1)
+
+    def test_half_built_file_is_never_mapped(self):
+        self.assertEqual(sorted(os.listdir(self.directory)), [f"{os.getpid()}.hb"])
+        reader = HeartbeatReader(watchdog.heartbeat_path(self.directory, os.getpid()))
+        self.assertEqual(reader.pid, os.getpid())
+        self.assertGreater(reader.last_beat(), 0)
+        reader.close()
+
+@unittest.skipUnless(HOT_SPARE_SUPPORTED, "hot spares need SIGUSR1 and pthread_sigmask")
+class PromotionTest(unittest.TestCase):
+    WATCH_FOR = 3.0  # Seconds, many times WATCHDOG_STALL
+
+    def setUp(self):
+        self._cgroups, config.CGROUPS = config.CGROUPS, False
+        self.recorder = Recorder()
+        self.target = Target(name="promotion", port=free_port(),
+                             script=os.path.join(BACKEND_DIR, "breakable_app.py"),
+                             hot_spare=True, fork_server=True, watchdog=True, workers=0)
+        self.supervisor = Supervisor([self.target], events=self.recorder)
+
+    def tearDown(self):
+        self.supervisor.shutdown()
+        config.CGROUPS = self._cgroups
+
+    def test_promoted_standby_is_not_stalled(self):
+        target = self.target
+        self.supervisor.start()
+        self.assertTrue(self.supervisor._await_ready(target).ok)
+        deadline = time.monotonic() + config.STARTUP_TIMEOUT
+        while target.standby is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertIsNotNone(target.standby, "standby never parked")
+        standby = target.standby.pid
+
+        self.supervisor.heal(target, "test promotion")
+        self.assertEqual(target.process.pid, standby)
+        self.assertTrue(target.ready)
+
+        stalled = []
+        monitor, check = target.watchdog_monitor, target.watchdog_monitor.check
+
+        def recording_check(now=None):
+            stalls = check(now)
+            stalled.extend(stall for stall in stalls if stall.pid == standby and stall.kind == STALLED)
+            return stalls
+
+        monitor.check = recording_check
+        deadline = time.monotonic() + self.WATCH_FOR
+        while time.monotonic() < deadline:
+            self.supervisor.watch(target)
+            time.sleep(config.WATCHDOG_POLL)
+        self.assertEqual(stalled, [])
+        self.assertIsNone(target.breach)
+        hangs = [event for event in self.recorder.events
+                 if event.type == event_channel.HANG and event.pid == standby]
+        self.assertEqual(hangs, [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,460 @@
+"""
+Watchdog - Hang detection without HTTP
+An app that embeds the watchdog (breakable_app does) keeps a small shared-
+memory file per process that the healer reads directly, with no request
+and no round trip:
+
+    heartbeat   a counter and timestamp a watchdog thread bumps every
+                WATCHDOG_INTERVAL, and the slowest gap between two beats
+                lately. If it stops, the whole interpreter is stuck (a C
+                call holding the GIL, a deadlock, SIGSTOP).
+    slots       one per request in flight: the serving thread, when the
+                request started, and its method and path. A request that
+                stays in flight is a wedged handler, even while other
+                threads still answer /health.
+
+The beat comes from a thread of its own rather than the serving loop:
+werkzeug's loop sleeps in select() for up to half a second between
+connections, and a stuck interpreter stops every thread alike.
+
+A heartbeat is a stall once it is older than WATCHDOG_STALL_FACTOR times
+the slowest gap the app has seen lately, and at least WATCHDOG_STALL, and
+has stayed the same for WATCHDOG_STALL_POLLS reads in a row. An idle app
+beats every 10ms, so a stuck one is seen in 50-100ms; one whose threads
+are fighting over the GIL (a CPU-bound request) sees its beats delayed by
+up to a couple of hundred ms, and is judged against that instead of being
+called stalled every few beats. A request is a stall once it has been in
+flight WATCHDOG_STALL. Either way the healer captures evidence on the
+spot, before any restart can destroy it:
+
+- the app's own watchdog thread samples the stacks of its slow requests
+  (sys._current_frames) every tick, into <pid>.profile
+- for a stalled interpreter, where no Python code can run, the healer sends
+  DUMP_SIGNAL and faulthandler writes every thread's stack from C into
+  <pid>.stacks
+
+A stall that lasts WATCHDOG_HANG_AFTER (a slow request:
+WATCHDOG_REQUEST_HANG_AFTER) is a hang, and is healed; the evidence is
+saved under HANG_REPORT_DIR.
+
+Layout of <pid>.hb (little-endian):
+    header  <4sHHiQdf magic, version, n_slots, pid, beats, last beat (time.monotonic),
+                      slowest recent gap between beats (seconds)
+    slots   n_slots x <IIQd48s  seq (odd while written), unused, thread ident,
+                                started (time.monotonic, 0 = free), request
+time.monotonic() is system-wide (CLOCK_MONOTONIC), so both sides share it.
+"""
+
+import os
+import sys
+import math
+import mmap
+import time
+import glob
+import signal
+import struct
+import shutil
+import threading
+import traceback
+import faulthandler
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+
+import psutil
+
+import config
+
+ENV_DIR = "AXOLOT_WATCHDOG_DIR"  # Set by the healer: where this target's files go
+
+MAGIC = b"AXWD"
+VERSION = 2
+SLOTS = 64  # Requests tracked at once; more than that go untracked
+REQUEST_BYTES = 48
+_HEADER = struct.Struct("<4sHHiQd")
+_BEAT = struct.Struct("<Qd")
+_BEAT_OFFSET = 12
+_CADENCE = struct.Struct("<f")
+_CADENCE_OFFSET = 28
+_SLOT_SEQ = struct.Struct("<I")
+_SLOT_DATA = struct.Struct("<IQd48s")  # Everything after seq
+_SLOT_SIZE = _SLOT_SEQ.size + _SLOT_DATA.size
+_HEADER_SIZE = 32
+
+# Not SIGUSR1/2: a process without the handler ignores SIGURG instead of
+# dying, and gunicorn workers don't reset it
+DUMP_SIGNAL = getattr(signal, "SIGURG", None)
+DUMP_WAIT = 0.2  # Seconds to wait for faulthandler's dump
+PROFILE_WRITE_INTERVAL = 0.1  # Seconds between rewrites of <pid>.profile
+STACK_DEPTH = 16  # Innermost frames kept per sample
+CADENCE_WINDOW = 5.0  # Seconds for a slow gap between beats to be mostly forgotten
+
+# Kinds of stall
+STALLED = "stalled"  # No heartbeat
+SLOW_REQUEST = "slow request"  # A request in flight for too long
+
+def heartbeat_path(directory, pid):
+    return os.path.join(directory, f"{pid}.hb")
+
+def profile_path(directory, pid):
+    return os.path.join(directory, f"{pid}.profile")
+
+def stacks_path(directory, pid):
+    return os.path.join(directory, f"{pid}.stacks")
+
+# ============================================================================
+# APP SIDE
+# ============================================================================
+
+class Heartbeat:
+    """This process' shared page: the heartbeat and the request slots."""
+
+    def __init__(self, directory, slots=SLOTS):
+        self.pid = os.getpid()
+        self.directory = directory
+        size = _HEADER_SIZE + slots * _SLOT_SIZE
+        # Built under another name and renamed into place: the healer never maps
+        # a file whose header isn't written yet, and one it still has mapped (a
+        # previous process with this pid) is never truncated under it
+        path = heartbeat_path(directory, self.pid)
+        temporary = path + ".tmp"
+        fd = os.open(temporary, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self.beats = 0
+        self.cadence = 0.0  # Slowest recent gap between beats, seconds
+        self._last = 0.0
+        self.in_flight = {}  # slot -> (thread ident, started, request), for our own profiler
+        self._free = list(range(slots - 1, -1, -1))
+        self._lock = threading.Lock()
+        self.stacks = None  # File faulthandler dumps into
+        _HEADER.pack_into(self._map, 0, MAGIC, VERSION, slots, self.pid, 0, time.monotonic())
+        os.replace(temporary, path)
+
+    def beat(self):
+        now = time.monotonic()
+        if self.beats:
+            # The slowest gap lately, forgotten exponentially as time goes by
+            gap = now - self._last
+            self.cadence = max(gap, self.cadence * math.exp(-gap / CADENCE_WINDOW))
+            _CADENCE.pack_into(self._map, _CADENCE_OFFSET, self.cadence)
+        self.beats += 1
+        self._last = now
+        _BEAT.pack_into(self._map, _BEAT_OFFSET, self.beats, now)
+
+    def begin(self, request):
+        """Marks a request as in flight on this thread. Returns its slot (-1 if none was free)."""
+        with self._lock:
+            if not self._free:
+                return -1
+            slot = self._free.pop()
+        ident, started = threading.get_ident(), time.monotonic()
+        self.in_flight[slot] = (ident, started, request)
+        self._write_slot(slot, ident, started, request)
+        return slot
+
+    def end(self, slot):
+        if slot < 0:
+            return
+        self.in_flight.pop(slot, None)
+        self._write_slot(slot, 0, 0.0, "")
+        with self._lock:
+            self._free.append(slot)
+
+    def _write_slot(self, slot, ident, started, request):
+        # Seqlock: an odd seq tells the reader the slot is being rewritten
+        offset = _HEADER_SIZE + slot * _SLOT_SIZE
+        seq = _SLOT_SEQ.unpack_from(self._map, offset)[0]
+        _SLOT_SEQ.pack_into(self._map, offset, (seq + 1) & 0xFFFFFFFF)
+        _SLOT_DATA.pack_into(self._map, offset + _SLOT_SEQ.size, 0, ident, started,
+                             request.encode("utf-8", "replace")[:REQUEST_BYTES])
+        _SLOT_SEQ.pack_into(self._map, offset, (seq + 2) & 0xFFFFFFFF)
+
+class StallProfiler:
+    """
+    Samples the stacks of requests that have been in flight for WATCHDOG_STALL
+    or longer. Costs nothing while every request is quick.
+    """
+
+    def __init__(self, heartbeat):
+        self.heartbeat = heartbeat
+        self.path = profile_path(heartbeat.directory, heartbeat.pid)
+        self.samples = {}  # (slot, started) -> (request, Counter of stacks)
+        self._written_at = 0.0
+        self._dirty = False
+
+    def sample(self, now):
+        slow = {(slot, started): (ident, request)
+                for slot, (ident, started, request) in list(self.heartbeat.in_flight.items())
+                if now - started >= config.WATCHDOG_STALL}
+        for key in [key for key in self.samples if key not in slow]:
+            del self.samples[key]  # Finished after all; keep the last write as it was
+        if slow:
+            frames = sys._current_frames()
+            for key, (ident, request) in slow.items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = traceback.StackSummary.extract(traceback.walk_stack(frame), limit=STACK_DEPTH,
+                                                       lookup_lines=False)
+                lines = tuple(f"{os.path.basename(f.filename)}:{f.lineno} in {f.name}" for f in reversed(stack))
+                self.samples.setdefault(key, (request, Counter()))[1][lines] += 1
+            self._dirty = True
+        if self._dirty and now - self._written_at >= PROFILE_WRITE_INTERVAL:
+            self._write(now)
+
+    def _write(self, now):
+        out = [f"PID {self.heartbeat.pid}: {len(self.samples)} slow request(s) at {datetime.now().isoformat()}"]
+        for (slot, started), (request, stacks) in self.samples.items():
+            total = sum(stacks.values())
+            out.append(f"\n{request}: in flight {now - started:.2f}s, {total} samples")
+            for stack, count in stacks.most_common(3):
+                out.append(f"  {count}/{total} samples, innermost last:")
+                out.extend(f"    {line}" for line in stack)
+        temporary = self.path + ".tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                f.write("\n".join(out) + "\n")
+            os.replace(temporary, self.path)
+        except OSError:
+            pass  # The healer cleared the directory on its way out
+        self._written_at = now
+        self._dirty = False
+
+_ACTIVE = None  # This process' Heartbeat
+
+def start(directory=None):
+    """
+    Starts this process' heartbeat, if the healer asked for one (ENV_DIR).
+    Safe to call more than once; forked children get their own.
+    """
+    global _ACTIVE
+    directory = directory or os.environ.get(ENV_DIR)
+    if not directory or (_ACTIVE is not None and _ACTIVE.pid == os.getpid()):
+        return _ACTIVE
+    try:
+        heartbeat = Heartbeat(directory)
+        if DUMP_SIGNAL is not None:
+            heartbeat.stacks = open(stacks_path(directory, heartbeat.pid), "w", encoding="utf-8")
+            faulthandler.register(DUMP_SIGNAL, file=heartbeat.stacks, all_threads=True)
+    except OSError as e:
+        print(f"[WATCHDOG] Disabled: {e}")  # Never worth failing the app over
+        return None
+    _ACTIVE = heartbeat
+    threading.Thread(target=_run, args=(heartbeat,), name="watchdog", daemon=True).start()
+    return heartbeat
+
+def _run(heartbeat):
+    profiler = StallProfiler(heartbeat)
+    while heartbeat is _ACTIVE:
+        heartbeat.beat()
+        profiler.sample(time.monotonic())
+        time.sleep(config.WATCHDOG_INTERVAL)
+
+def _after_fork():
+    # The watchdog thread didn't come along, and the pid is new: start over
+    global _ACTIVE
+    if _ACTIVE is not None:
+        directory, _ACTIVE = _ACTIVE.directory, None
+        start(directory)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+def middleware(wsgi_app):
+    """Wraps a WSGI app so every request holds a slot while its handler runs."""
+    def tracked(environ, start_response):
+        heartbeat = _ACTIVE
+        if heartbeat is None or heartbeat.pid != os.getpid():
+            return wsgi_app(environ, start_response)
+        slot = heartbeat.begin(f"{environ.get('REQUEST_METHOD', '')} {environ.get('PATH_INFO', '')}")
+        try:
+            return wsgi_app(environ, start_response)
+        finally:
+            heartbeat.end(slot)
+    return tracked
+
+# ============================================================================
+# HEALER SIDE
+# ============================================================================
+
+@dataclass
+class Stall:
+    pid: int
+    kind: str  # STALLED or SLOW_REQUEST
+    since: float  # time.monotonic() of the last heartbeat, or of the request's start
+    age: float  # Seconds
+    detail: str
+
+class HeartbeatReader:
+    """Read-only view of one process' heartbeat file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.slots, self.pid, _, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} heartbeat file")
+        self.opened = time.monotonic()
+        self.unchanged = 0  # Consecutive check()s that found the same beat
+        self._beat = None
+
+    def beat(self):
+        """(beats, last beat) as the app last wrote them."""
+        return _BEAT.unpack_from(self._map, _BEAT_OFFSET)
+
+    def last_beat(self):
+        return self.beat()[1]
+
+    def cadence(self):
+        """The slowest gap between two beats the app has seen lately, in seconds."""
+        return _CADENCE.unpack_from(self._map, _CADENCE_OFFSET)[0]
+
+    def still(self):
+        """
+        The last beat, if it is the same one as at the previous call, or None.
+        A beat that was never written (0) never counts, and one from before we
+        started watching counts from then.
+        """
+        beat, previous = self.beat(), self._beat
+        self._beat = beat
+        if not beat[0] or not beat[1] or beat != previous:
+            self.unchanged = 0
+            return None
+        self.unchanged += 1
+        return max(beat[1], self.opened)
+
+    def requests(self):
+        """[(thread ident, started, request)] for every request in flight."""
+        found = []
+        for slot in range(self.slots):
+            offset = _HEADER_SIZE + slot * _SLOT_SIZE
+            for _ in range(3):  # Retry a slot caught mid-write
+                seq = _SLOT_SEQ.unpack_from(self._map, offset)[0]
+                _, ident, started, request = _SLOT_DATA.unpack_from(self._map, offset + _SLOT_SEQ.size)
+                if seq % 2 == 0 and _SLOT_SEQ.unpack_from(self._map, offset)[0] == seq:
+                    if started:
+                        found.append((ident, started, request.rstrip(b"\0").decode("utf-8", "replace")))
+                    break
+        return found
+
+    def close(self):
+        self._map.close()
+
+class WatchdogMonitor:
+    """The healer's side, for one target: every heartbeat file in its directory."""
+
+    RESCAN_INTERVAL = 0.5  # Seconds between looks for new processes' files
+
+    def __init__(self, directory, stall=config.WATCHDOG_STALL, polls=config.WATCHDOG_STALL_POLLS,
+                 factor=config.WATCHDOG_STALL_FACTOR):
+        self.directory = directory
+        self.stall = stall  # The least a heartbeat must be late by
+        self.polls = polls  # Checks in a row the heartbeat must not move in
+        self.factor = factor  # Times the slowest recent gap between beats
+        os.makedirs(directory, exist_ok=True)
+        self._readers = {}  # pid -> HeartbeatReader
+        self._scanned_at = 0.0
+
+    def deadline(self, reader):
+        """How old the process' heartbeat may get before it is a stall."""
+        return max(self.stall, self.factor * reader.cadence())
+
+    def check(self, now=None):
+        """Every stall in the target's live processes right now."""
+        now = time.monotonic() if now is None else now
+        if now - self._scanned_at >= self.RESCAN_INTERVAL:
+            self._rescan()
+            self._scanned_at = now
+
+        stalls = []
+        for pid, reader in list(self._readers.items()):
+            last_beat = reader.still()
+            if (last_beat is not None and reader.unchanged >= self.polls
+                    and now - last_beat >= self.deadline(reader)):
+                stalls.append(Stall(pid, STALLED, last_beat, now - last_beat,
+                                    f"no heartbeat for {(now - last_beat) * 1000:.0f}ms"))
+            for _, started, request in reader.requests():
+                if now - started >= self.stall:
+                    stalls.append(Stall(pid, SLOW_REQUEST, started, now - started,
+                                        f"{request} in flight for {now - started:.2f}s"))
+        return stalls
+
+    def capture(self, stall):
+        """
+        Asks a stalled interpreter for its stacks (faulthandler). Slow requests
+        are already being profiled by the app itself.
+        """
+        if stall.kind != STALLED or DUMP_SIGNAL is None:
+            return
+        path = stacks_path(self.directory, stall.pid)
+        try:
+            size = os.path.getsize(path)
+            os.kill(stall.pid, DUMP_SIGNAL)
+        except OSError:
+            return
+        deadline = time.monotonic() + DUMP_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+            try:
+                if os.path.getsize(path) > size:
+                    return
+            except OSError:
+                return
+
+    def evidence(self, pid):
+        """What the process left behind: its slow-request profile and faulthandler dumps."""
+        parts = []
+        for title, path in (("Slow request profile", profile_path(self.directory, pid)),
+                            ("Thread stacks (faulthandler)", stacks_path(self.directory, pid))):
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    text = f.read().strip()
+            except OSError:
+                continue
+            if text:
+                parts.append(f"== {title} ==\n{text}")
+        return "\n\n".join(parts)
+
+    def report(self, name, stall, directory=config.HANG_REPORT_DIR):
+        """Saves the evidence for a hang. Returns the report's path, or None."""
+        evidence = self.evidence(stall.pid)
+        path = os.path.join(directory, f"{name}-{stall.pid}-{datetime.now():%Y%m%d-%H%M%S}.txt")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"[{name}] PID {stall.pid} hung: {stall.detail}\n\n{evidence or 'No evidence captured'}\n")
+        except OSError:
+            return None
+        return path
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _rescan(self):
+        for path in glob.glob(os.path.join(self.directory, "*.hb")):
+            try:
+                pid = int(os.path.basename(path)[:-3])
+            except ValueError:
+                continue
+            if pid in self._readers:
+                continue
+            try:
+                self._readers[pid] = HeartbeatReader(path)
+            except (OSError, ValueError):
+                continue  # Still being created; next time
+        for pid in [pid for pid in self._readers if not psutil.pid_exists(pid)]:
+            self._readers.pop(pid).close()
+            for path in (heartbeat_path(self.directory, pid), profile_path(self.directory, pid),
+                         stacks_path(self.directory, pid)):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
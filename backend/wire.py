@@ -0,0 +1,135 @@
+"""
+Wire - Compact encodings of Mission Control state for the dashboards
+Remote dashboards pay for every byte, so what goes out is trimmed to what
+the client doesn't already have:
+
+- status events carry only the fields that changed since the previous one
+  (diff); a subscriber starts from a snapshot and merges them in order
+- heartbeat samples go out as rows of numbers (epoch-ms timestamps, 0/1
+  flags) under HEARTBEAT_COLUMNS, and a window of them as one list per
+  column instead of a list of dicts repeating every key
+- REST responses are gzip (or brotli, when installed) compressed, and can
+  be MessagePack instead of JSON for clients that ask (msgpack optional)
+
+Deltas are computed once per change and shared by every subscriber, like
+any other event in the EventLog.
+"""
+
+import gzip
+from collections.abc import Mapping
+from datetime import datetime
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+
+HEARTBEAT_COLUMNS = ("ts", "latency", "actual_latency", "memory_mb", "cpu_percent", "up", "spike")
+
+COMPRESS_MIN_BYTES = 512  # Smaller bodies aren't worth the headers and CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# ============================================================================
+# DELTAS
+# ============================================================================
+
+def diff(old, new):
+    """
+    The fields of new that differ from old. Nested mappings are diffed in turn;
+    a field that is gone comes back as None.
+    """
+    delta = {}
+    for key, value in new.items():
+        before = old.get(key)
+        if before == value:
+            continue
+        if isinstance(value, Mapping) and isinstance(before, Mapping):
+            delta[key] = diff(before, value)
+        else:
+            delta[key] = value
+    for key in old.keys() - new.keys():
+        delta[key] = None
+    return delta
+
+def merge(old, delta):
+    """Applies a diff(); the inverse the dashboard runs on its side."""
+    merged = dict(old)
+    for key, value in delta.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), Mapping):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+# ============================================================================
+# HEARTBEAT
+# ============================================================================
+
+def epoch_ms(timestamp):
+    return int(datetime.fromisoformat(timestamp).timestamp() * 1000)
+
+def heartbeat_row(point):
+    """One heartbeat point as numbers, in HEARTBEAT_COLUMNS order."""
+    return [
+        epoch_ms(point["timestamp"]),
+        point["latency"],
+        point["actual_latency"],
+        point["memory_mb"],
+        point["cpu_percent"],
+        1 if point["status"] == "up" else 0,
+        1 if point["event_spike"] else 0,
+    ]
+
+def heartbeat_columns(points):
+    """A window of heartbeat points as one list per column."""
+    rows = [heartbeat_row(point) for point in points]
+    return {name: [row[i] for row in rows] for i, name in enumerate(HEARTBEAT_COLUMNS)}
+
+# ============================================================================
+# CONTENT NEGOTIATION
+# ============================================================================
+
+def msgpack_installed():
+    return msgpack is not None
+
+def content_type(accept):
+    """MSGPACK if the client asks for it and msgpack is installed, else JSON."""
+    if msgpack is not None and accept and MSGPACK in accept:
+        return MSGPACK
+    return JSON
+
+def _packable(value):
+    # Frozen mappings (types.MappingProxyType) from the state store
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not MessagePack serializable")
+
+def pack(value):
+    """MessagePack bytes; understands frozen mappings like to_json does."""
+    return msgpack.packb(value, default=_packable)
+
+def content_encoding(accept_encoding):
+    """The best compression both sides support ("br", "gzip"), or None."""
+    accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def compress(body, encoding):
+    """body compressed with content_encoding()'s choice. Returns (body, encoding actually used)."""
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY), "br"
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
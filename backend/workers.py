@@ -0,0 +1,122 @@
+"""
+Workers - Per-worker checks for apps served by gunicorn
+With Target.workers > 0 the app runs under gunicorn instead of app.run: a
+master process that imports the app once (--preload) and pre-forks that many
+sync workers, all accepting on the same port. /health is answered by
+whichever worker is free, so a probe can't tell one sick worker from the
+rest. Instead every worker is checked on its own:
+
+- memory: check_resources() on the worker's PID, against the target's limit
+- hangs: a sync worker serves one connection at a time and closes it when
+  it is done, so a worker that holds the same client connection for longer
+  than WORKER_HUNG_AFTER is stuck in a request
+
+A sick worker is recycled on its own (SIGTERM, then SIGKILL if it hasn't
+gone within WORKER_STOP_TIMEOUT) and the master forks a fresh one from the
+preloaded app, while the other workers keep serving. Only when the app as a
+whole stops answering, or the master dies, is the whole tree restarted.
+"""
+
+import os
+import sys
+import time
+import importlib.util
+from dataclasses import dataclass
+
+import psutil
+
+import config
+from monitor import get_process, measure_resources
+
+WORKERS_SUPPORTED = hasattr(os, "fork") and importlib.util.find_spec("gunicorn") is not None
+
+def gunicorn_command(target):
+    """argv that serves target.script's `app` with target.workers gunicorn workers."""
+    directory, filename = os.path.split(os.path.abspath(target.script))
+    module = os.path.splitext(filename)[0]
+    return [
+        sys.executable, "-m", "gunicorn",
+        "--chdir", directory,
+        "--bind", f"0.0.0.0:{target.port}",  # Same exposure as app.run in breakable_app
+        "--workers", str(target.workers),
+        "--worker-class", "sync",  # One request per worker: what the hang check relies on
+        "--preload",  # Import once in the master; a replacement worker is just a fork
+        "--timeout", str(config.WORKER_TIMEOUT),
+        f"{module}:app",
+    ]
+
+@dataclass
+class WorkerCheck:
+    pid: int
+    ok: bool
+    reason: str
+    memory_mb: float = 0.0
+    hung: bool = False
+
+class WorkerMonitor:
+    """Checks every worker of one gunicorn master. One check at a time."""
+
+    def __init__(self, port, memory_limit_mb, hung_after=config.WORKER_HUNG_AFTER):
+        self.port = port
+        self.memory_limit_mb = memory_limit_mb
+        self.hung_after = hung_after
+        self._busy = {}  # (worker pid, client address) -> when we first saw it open
+
+    def check(self, master_pid, now=None):
+        """A WorkerCheck per live worker of master_pid ([] if the master is gone)."""
+        now = time.monotonic() if now is None else now
+        try:
+            workers = get_process(master_pid).children()
+        except psutil.NoSuchProcess:
+            return []
+
+        seen = {}
+        results = []
+        for worker in workers:
+            ok, reason, memory_mb = measure_resources(worker.pid, self.memory_limit_mb)
+            hung = False
+            if ok:
+                busy_for = self._busy_for(worker, now, seen)
+                if busy_for >= self.hung_after:
+                    ok, reason, hung = False, f"Hung: on one request for {busy_for:.0f}s", True
+            results.append(WorkerCheck(worker.pid, ok, reason, memory_mb or 0.0, hung))
+        self._busy = seen  # Connections that closed are forgotten
+        return results
+
+    def _busy_for(self, worker, now, seen):
+        """How long the worker has been holding its oldest client connection."""
+        try:
+            connections = worker.net_connections(kind="tcp")
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0.0
+        longest = 0.0
+        for connection in connections:
+            if (connection.status != psutil.CONN_ESTABLISHED or not connection.raddr
+                    or connection.laddr.port != self.port):
+                continue
+            key = (worker.pid, tuple(connection.raddr))
+            first_seen = seen[key] = self._busy.get(key, now)
+            longest = max(longest, now - first_seen)
+        return longest
+
+def recycle(pid, graceful=True, timeout=config.WORKER_STOP_TIMEOUT):
+    """
+    Stops one worker; its master forks the replacement. graceful lets it
+    finish the request it is on first (pointless for a hung one).
+    Returns how long it took to go, in ms.
+    """
+    started = time.monotonic()
+    try:
+        worker = psutil.Process(pid)
+        if graceful:
+            worker.terminate()
+            try:
+                worker.wait(timeout)
+                return (time.monotonic() - started) * 1000
+            except psutil.TimeoutExpired:
+                pass
+        worker.kill()
+        worker.wait(timeout)
+    except (psutil.NoSuchProcess, psutil.TimeoutExpired):
+        pass
+    return (time.monotonic() - started) * 1000
@@ -0,0 +1,316 @@
+"""
+Zygote - Fork server for fast app (re)starts
+A cold start of breakable_app spends most of its time before the first line
+of app code runs: starting the interpreter and importing Flask. The zygote
+pays that once. It imports the target script (running everything at module
+level: imports, app creation, route registration) and then waits. Each start
+is a request over a control socket, and the zygote answers it with a fork();
+the child calls the script's main() with the environment and file
+descriptors (listening socket, readiness pipe) that came with the request.
+
+The script must keep its serving code in a main() function, behind the
+usual `if __name__ == "__main__":` guard. The zygote keeps the code it
+preloaded: restart it (or the healer) to pick up edits to the script.
+
+The zygote reaps its children and reports every exit, so the healer gets a
+ForkedProcess with the parts of the subprocess.Popen interface it uses
+(pid, poll, wait, send_signal, terminate, kill, returncode).
+
+Control protocol: a SOCK_SEQPACKET socketpair, one JSON message per packet.
+    zygote -> healer  {"ready": pid, "preload_ms": ms} or {"error": "..."}
+    healer -> zygote  {"env": {...}, "fds": [env var, ...]} + fds (SCM_RIGHTS)
+    zygote -> healer  {"pid": pid} or {"error": "..."}
+    zygote -> healer  {"exit": pid, "code": returncode}   (any time)
+
+POSIX only.
+"""
+
+import os
+import sys
+import json
+import time
+import errno
+import select
+import signal
+import socket
+import threading
+import traceback
+import subprocess
+import importlib.util
+
+MAX_MESSAGE = 64 * 1024
+MAX_FDS = 8
+PRELOAD_TIMEOUT = 30  # Seconds the zygote may take to import the script
+SPAWN_TIMEOUT = 5
+
+# ============================================================================
+# HEALER SIDE
+# ============================================================================
+
+class ForkedProcess:
+    """A child of the zygote, driven like a subprocess.Popen."""
+
+    def __init__(self, pid, zygote):
+        self.pid = pid
+        self.returncode = None
+        self._zygote = zygote
+        self._exited = threading.Event()
+
+    def _set_exited(self, returncode):
+        self.returncode = returncode
+        self._exited.set()
+
+    def poll(self):
+        if self.returncode is None and self._zygote.lost:
+            self._check_orphan()
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._exited.is_set():
+            if self._zygote.lost:
+                self._check_orphan()
+                if self._exited.is_set():
+                    break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout)
+            self._exited.wait(0.1 if remaining is None else min(0.1, remaining))
+        return self.returncode
+
+    def _check_orphan(self):
+        """With the zygote gone nobody reports exits; look for the pid ourselves."""
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            self._set_exited(-signal.SIGKILL)  # Exit status is lost with the zygote
+        except PermissionError:
+            pass
+
+    def send_signal(self, sig):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+class Zygote:
+    """Starts a zygote for one script and forks children from it on demand."""
+
+    def __init__(self, script):
+        self.script = os.path.abspath(script)
+        self.lost = False  # The zygote died or was closed
+        self.preload_ms = 0.0
+        self._children = {}  # pid -> ForkedProcess
+        self._replies = []
+        self._reply_ready = threading.Condition()
+        self._spawn_lock = threading.Lock()
+
+        self._sock, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        env = os.environ.copy()
+        env["AXOLOT_ZYGOTE_FD"] = str(theirs.fileno())
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), self.script],
+            env=env, pass_fds=(theirs.fileno(),),
+        )
+        theirs.close()
+
+        self._sock.settimeout(PRELOAD_TIMEOUT)
+        try:
+            hello = json.loads(self._sock.recv(MAX_MESSAGE) or b"{}")
+        except (OSError, ValueError) as e:
+            hello = {"error": f"no answer ({e})"}
+        if "ready" not in hello:
+            self.close()
+            raise RuntimeError(f"Zygote could not preload {script}: {hello.get('error', 'exited')}")
+        self.preload_ms = hello.get("preload_ms", 0.0)
+        self._sock.settimeout(None)
+        threading.Thread(target=self._read, name="zygote-reader", daemon=True).start()
+
+    def spawn(self, env, fds=None):
+        """
+        Forks a child that runs the script's main() with env as its environment.
+        fds maps env var names to file descriptors to hand over; the child finds
+        its copy of each under the same env var. Returns a ForkedProcess.
+        """
+        fds = fds or {}
+        names = list(fds)
+        request = json.dumps({"env": env, "fds": names}).encode("utf-8")
+        with self._spawn_lock:
+            if self.lost:
+                raise OSError(errno.EPIPE, "Zygote is gone")
+            socket.send_fds(self._sock, [request], [fds[name] for name in names])
+            with self._reply_ready:
+                if not self._reply_ready.wait_for(lambda: self._replies or self.lost, SPAWN_TIMEOUT):
+                    self.close()  # A late reply would be taken for the next request's
+                    raise OSError(errno.ETIMEDOUT, "Zygote did not answer")
+                if not self._replies:
+                    raise OSError(errno.EPIPE, "Zygote is gone")
+                reply = self._replies.pop(0)
+        if "pid" not in reply:
+            raise OSError(errno.ECHILD, f"Zygote could not fork: {reply.get('error')}")
+        return reply["process"]
+
+    def _read(self):
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE)
+            except OSError:
+                data = b""
+            if not data:
+                break
+            message = json.loads(data)
+            if "exit" in message:
+                child = self._children.pop(message["exit"], None)
+                if child is not None:
+                    child._set_exited(message["code"])
+                continue
+            if "pid" in message:
+                # Registered before anyone can wait on it, so its exit is never missed
+                message["process"] = self._children[message["pid"]] = ForkedProcess(message["pid"], self)
+            with self._reply_ready:
+                self._replies.append(message)
+                self._reply_ready.notify_all()
+        with self._reply_ready:
+            self.lost = True
+            self._reply_ready.notify_all()
+
+    def close(self):
+        """Stops the zygote. Children it already forked keep running."""
+        self.lost = True
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+# ============================================================================
+# ZYGOTE SIDE
+# ============================================================================
+
+def _send(control, message):
+    control.send(json.dumps(message).encode("utf-8"))
+
+def _preload(script):
+    """Imports the script as a module (not as __main__, so it doesn't serve yet)."""
+    sys.path.insert(0, os.path.dirname(script))
+    sys.argv = [script]
+    name = os.path.splitext(os.path.basename(script))[0]
+    spec = importlib.util.spec_from_file_location(name, script)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "main", None)):
+        raise RuntimeError(f"{script} has no main() to run in forked children")
+    return module
+
+def _child(module, request, fds, control, wakeup):
+    """Runs in the forked child. Never returns."""
+    code = 1
+    try:
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        for fd in wakeup:
+            os.close(fd)
+        control.close()
+
+        env = dict(request["env"])
+        for name, fd in zip(request["fds"], fds):
+            env[name] = str(fd)
+        os.environ.clear()
+        os.environ.update(env)
+
+        # Imports and routes came with the fork; restart the boot clock (see readiness.py)
+        marks = getattr(module, "STARTUP", None)
+        if isinstance(marks, dict):
+            now = time.time()
+            marks.clear()
+            marks.update(script=now, imports=now, routes=now)
+
+        module.main()
+        code = 0
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+def _reap(control):
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        _send(control, {"exit": pid, "code": os.waitstatus_to_exitcode(status)})
+
+def serve(script, control):
+    started = time.perf_counter()
+    try:
+        module = _preload(script)
+    except BaseException as e:
+        traceback.print_exc()
+        _send(control, {"error": f"{type(e).__name__}: {e}"})
+        return 1
+    _send(control, {"ready": os.getpid(), "preload_ms": (time.perf_counter() - started) * 1000})
+
+    # SIGCHLD wakes the select loop so exits are reported straight away
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+
+    while True:
+        readable, _, _ = select.select([control, wake_r], [], [])
+        if wake_r in readable:
+            try:
+                while os.read(wake_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+            _reap(control)
+        if control not in readable:
+            continue
+
+        message, fds, _, _ = socket.recv_fds(control, MAX_MESSAGE, MAX_FDS)
+        if not message:
+            return 0  # The healer is gone
+        try:
+            request = json.loads(message)
+            sys.stdout.flush()  # Or the child inherits (and repeats) our buffered output
+            sys.stderr.flush()
+            pid = os.fork()
+            if pid == 0:
+                _child(module, request, fds, control, (wake_r, wake_w))
+            _send(control, {"pid": pid})
+        except Exception as e:
+            _send(control, {"error": f"{type(e).__name__}: {e}"})
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+if __name__ == "__main__":
+    # Ctrl+C reaches the whole process group; stay up to report our children's
+    # exits while the healer shuts them down, then it closes us
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    control = socket.socket(fileno=int(os.environ.pop("AXOLOT_ZYGOTE_FD")))
+    sys.exit(serve(os.path.abspath(sys.argv[1]), control))
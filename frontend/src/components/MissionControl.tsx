@@ -12,6 +12,7 @@ import {
     RefreshCw,
     Wifi,
     WifiOff,
+    ShieldOff,
 } from "lucide-react";
 import {
     XAxis,
@@ -24,14 +25,45 @@ import {
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001";
 
+// Match the server-side buffers in api_server.py
+const MAX_HEARTBEAT_POINTS = 120;
+const MAX_LOG_ENTRIES = 100;
+
 interface SystemStatus {
-    status: "HEALTHY" | "CRITICAL" | "HEALING" | "UNKNOWN";
+    status: "HEALTHY" | "CRITICAL" | "HEALING" | "QUARANTINED" | "UNKNOWN";
     last_check: string | null;
     uptime_start: string;
     total_crashes: number;
     last_crash: string | null;
     last_heal: string | null;
     latency_ms: number;
+    healer?: Record<string, HealerTarget | null>; // null: removed (see mergeDelta)
+}
+
+// Per-target view reported by the healer (see handle_healer_event)
+interface HealerTarget {
+    pid: number;
+    ok?: boolean;
+    restarts?: number;
+    memory_mb?: number;
+    leak_mb_per_s?: number;
+    leak_eta_s?: number | null;
+    quarantined?: boolean;
+    workers_recycled?: number;
+    hung?: boolean; // Set by the watchdog's hang events
+    paused?: boolean; // Healing paused through the healer's control plane
+    // Process-tree totals from the healer's sampler (see sampler.py)
+    resources?: {
+        cpu_percent: number;
+        rss_mb: number;
+        uss_mb: number;
+        threads: number;
+        fds: number;
+        read_mb: number;
+        write_mb: number;
+        children: number;
+    };
+    backoff_s?: number;
 }
 
 interface HeartbeatPoint {
@@ -50,6 +82,60 @@ interface LogEntry {
     message: string;
 }
 
+// Compact wire format (see backend/wire.py): heartbeats arrive as rows of
+// numbers in HEARTBEAT_COLUMNS order, or one array per column in snapshots,
+// and status events only carry the fields that changed
+type HeartbeatRow = [number, number, number, number, number, number, number];
+
+interface HeartbeatColumns {
+    ts: number[];
+    latency: number[];
+    actual_latency: number[];
+    memory_mb: number[];
+    cpu_percent: number[];
+    up: number[];
+    spike: number[];
+}
+
+function fromRow([ts, latency, actual_latency, memory_mb, cpu_percent, up, spike]: HeartbeatRow): HeartbeatPoint {
+    return {
+        timestamp: new Date(ts).toISOString(),
+        latency,
+        actual_latency,
+        memory_mb,
+        cpu_percent,
+        status: up ? "up" : "down",
+        event_spike: spike === 1,
+    };
+}
+
+function fromColumns(columns: HeartbeatColumns): HeartbeatPoint[] {
+    return columns.ts.map((ts, i) => fromRow([
+        ts,
+        columns.latency[i],
+        columns.actual_latency[i],
+        columns.memory_mb[i],
+        columns.cpu_percent[i],
+        columns.up[i],
+        columns.spike[i],
+    ]));
+}
+
+function isObject(value: unknown): value is Record<string, unknown> {
+    return typeof value === "object" && value !== null && !Array.isArray(value);
+}
+
+// Inverse of wire.diff: nested objects merge, anything else replaces
+function mergeDelta<T>(base: T, delta: Record<string, unknown>): T {
+    const merged: Record<string, unknown> = { ...(base as Record<string, unknown>) };
+    for (const [key, value] of Object.entries(delta)) {
+        merged[key] = isObject(value) && isObject(merged[key])
+            ? mergeDelta(merged[key], value)
+            : value;
+    }
+    return merged as T;
+}
+
 // ============================================================================
 // STATUS HUD COMPONENT
 // ============================================================================
@@ -77,6 +163,13 @@ function StatusHUD({ status, connected }: { status: SystemStatus; connected: boo
             icon: RefreshCw,
             label: "HEALING",
         },
+        QUARANTINED: {
+            color: "text-rose-400",
+            bg: "bg-rose-500/20",
+            border: "border-rose-500/50",
+            icon: ShieldOff,
+            label: "QUARANTINED",
+        },
         UNKNOWN: {
             color: "text-zinc-400",
             bg: "bg-zinc-500/20",
@@ -188,6 +281,37 @@ function StatusHUD({ status, connected }: { status: SystemStatus; connected: boo
                         </p>
                     </div>
                 </div>
+
+                {/* Targets whose healing is paused */}
+                {Object.entries(status.healer || {})
+                    .filter(([, target]) => target?.paused)
+                    .map(([name]) => (
+                        <div
+                            key={`paused-${name}`}
+                            className="mt-4 p-3 rounded-xl bg-zinc-500/10 border border-zinc-500/20 flex items-center gap-2"
+                        >
+                            <AlertTriangle size={14} className="text-zinc-400" />
+                            <span className="text-xs text-zinc-300 font-mono">
+                                {name}: healing paused, failures are only reported
+                            </span>
+                        </div>
+                    ))}
+
+                {/* Leak projections from the healer */}
+                {Object.entries(status.healer || {})
+                    .filter((entry): entry is [string, HealerTarget] => entry[1]?.leak_eta_s != null)
+                    .map(([name, target]) => (
+                        <div
+                            key={name}
+                            className="mt-4 p-3 rounded-xl bg-amber-500/10 border border-amber-500/20 flex items-center gap-2"
+                        >
+                            <AlertTriangle size={14} className="text-amber-400" />
+                            <span className="text-xs text-amber-300 font-mono">
+                                {name}: memory +{target.leak_mb_per_s?.toFixed(2)}MB/s,
+                                limit in {Math.round(target.leak_eta_s as number)}s
+                            </span>
+                        </div>
+                    ))}
             </div>
         </div>
     );
@@ -416,55 +540,56 @@ export default function MissionControl() {
     const [connected, setConnected] = useState(false);
     const [retryCount, setRetryCount] = useState(0);
 
-    // Fetch all data from API
-    const fetchAllData = useCallback(async () => {
-        try {
-            const [statusRes, heartbeatRes, logsRes] = await Promise.all([
-                fetch(`${API_URL}/api/status`, { cache: 'no-store' }),
-                fetch(`${API_URL}/api/heartbeat`, { cache: 'no-store' }),
-                fetch(`${API_URL}/api/logs`, { cache: 'no-store' }),
-            ]);
-
-            if (statusRes.ok) {
-                const statusData = await statusRes.json();
-                setStatus(statusData);
-                setConnected(true);
-                setRetryCount(0);
-            }
-
-            if (heartbeatRes.ok) {
-                const heartbeatData = await heartbeatRes.json();
-                setHeartbeat(heartbeatData);
-            }
-
-            if (logsRes.ok) {
-                const logsData = await logsRes.json();
-                setLogs(logsData);
-            }
-
-            return true;
-        } catch (error) {
-            console.error("Failed to fetch data:", error);
+    const sourceRef = useRef<EventSource | null>(null);
+
+    // Subscribe to the push stream. The server sends a full snapshot first,
+    // then incremental status/heartbeat/log events; EventSource reconnects
+    // on its own and resumes from the last event id it saw, so every delta
+    // applies on top of state this component already has.
+    const connect = useCallback(() => {
+        sourceRef.current?.close();
+        const source = new EventSource(`${API_URL}/api/stream`);
+        sourceRef.current = source;
+
+        source.onopen = () => {
+            setConnected(true);
+            setRetryCount(0);
+        };
+
+        source.onerror = () => {
             setConnected(false);
             setRetryCount(prev => prev + 1);
-            return false;
-        }
+        };
+
+        source.addEventListener("snapshot", (e) => {
+            const snapshot = JSON.parse((e as MessageEvent).data);
+            setStatus(snapshot.status);
+            setHeartbeat(fromColumns(snapshot.heartbeat));
+            setLogs(snapshot.logs);
+        });
+
+        source.addEventListener("status", (e) => {
+            const delta = JSON.parse((e as MessageEvent).data);
+            setStatus(prev => mergeDelta(prev, delta));
+        });
+
+        source.addEventListener("heartbeat", (e) => {
+            const point = fromRow(JSON.parse((e as MessageEvent).data));
+            setHeartbeat(prev => [...prev, point].slice(-MAX_HEARTBEAT_POINTS));
+        });
+
+        source.addEventListener("log", (e) => {
+            const entry: LogEntry = JSON.parse((e as MessageEvent).data);
+            setLogs(prev => [...prev, entry].slice(-MAX_LOG_ENTRIES));
+        });
     }, []);
 
-    // Initial fetch and polling
     useEffect(() => {
-        // Initial fetch
-        fetchAllData();
-
-        // Poll every 1 second for real-time updates
-        const pollInterval = setInterval(() => {
-            fetchAllData();
-        }, 1000);
-
+        connect();
         return () => {
-            clearInterval(pollInterval);
+            sourceRef.current?.close();
         };
-    }, [fetchAllData]);
+    }, [connect]);
 
     // Not connected state
     if (!connected && retryCount > 2) {
@@ -486,7 +611,7 @@ export default function MissionControl() {
                 <button
                     onClick={() => {
                         setRetryCount(0);
-                        fetchAllData();
+                        connect();
                     }}
                     className="mt-4 px-4 py-2 rounded-lg bg-red-500/20 border border-red-500/50 text-red-400 hover:bg-red-500/30 transition-colors"
                 >